@@ -0,0 +1,339 @@
+"""Measure the framework overhead of the agent runnables with scripted models.
+
+Run from the repository root:
+
+    python -m benchmarks.agent_benchmark --agents openai_agent --tool-calls 2
+
+`ChatOpenAI` and `ChatZhipuAI` are swapped for a chat model that answers
+with a fixed number of tool calls and then a final answer, each after
+`--model-latency`. Chat history is kept in memory instead of Xata, and the
+search tools run against the stand-ins of `benchmarks.fake_upstreams`.
+Overhead is the time of a turn not spent in the model or in tools: prompt
+formatting, scratchpad rebuilding, history load and save, output parsing
+and the executor itself.
+"""
+
+import argparse
+import asyncio
+import contextlib
+import gc
+import io
+import json
+import statistics
+import time
+import tracemalloc
+import uuid
+from typing import Any, Callable, Dict, List, Type
+from unittest import mock
+
+from langchain.tools import BaseTool
+from langchain_community.chat_message_histories import ChatMessageHistory
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import (
+    AIMessage,
+    BaseMessage,
+    FunctionMessage,
+    HumanMessage,
+    ToolMessage,
+)
+from langchain_core.outputs import ChatGeneration, ChatResult
+from pydantic import BaseModel
+
+from benchmarks.fake_upstreams import Latency, install
+from src.models.models import PlainSearchRequest
+
+ANSWER = "Based on the search results, " + "the findings are consistent. " * 30
+SEARCH_RESULTS = str(
+    [{"content": ANSWER, "source": "[Example](https://example.com)"}] * 5
+)
+
+
+class ScriptedChatModel(BaseChatModel):
+    """Chat model replying with `tool_calls` tool calls, then a final answer.
+
+    The reply depends only on how many tool results follow the last human
+    message, so one instance can serve concurrent sessions. `style` picks the
+    format the agent parses: OpenAI tool calls, function calls or ReAct text.
+    """
+
+    style: str = "tools"
+    tool: str = "search_academic_db_tool"
+    tool_calls: int = 2
+    latency: Any = None
+
+    @property
+    def _llm_type(self) -> str:
+        return "scripted"
+
+    def bind_tools(self, tools, **kwargs):
+        return self.bind(tools=tools, **kwargs)
+
+    def bind_functions(self, functions, **kwargs):
+        return self.bind(functions=functions, **kwargs)
+
+    def _step(self, messages: List[BaseMessage]) -> int:
+        last_human = max(
+            i for i, message in enumerate(messages) if isinstance(message, HumanMessage)
+        )
+        results = sum(
+            isinstance(message, (ToolMessage, FunctionMessage))
+            for message in messages[last_human:]
+        )
+        return results + str(messages[last_human].content).count("Observation:")
+
+    def _reply(self, messages: List[BaseMessage]) -> AIMessage:
+        step = self._step(messages)
+        if step >= self.tool_calls:
+            if self.style == "react":
+                return AIMessage(
+                    content=f"I now know the final answer\nFinal Answer: {ANSWER}"
+                )
+            return AIMessage(content=ANSWER)
+
+        query = f"carbon footprint of steel {step}"
+        if self.style == "react":
+            return AIMessage(
+                content=f"I should search.\nAction: {self.tool}\nAction Input: {query}"
+            )
+        arguments = json.dumps({"query": query})
+        if self.style == "functions":
+            return AIMessage(
+                content="",
+                additional_kwargs={
+                    "function_call": {"name": self.tool, "arguments": arguments}
+                },
+            )
+        return AIMessage(
+            content="",
+            additional_kwargs={
+                "tool_calls": [
+                    {
+                        "id": f"call_{uuid.uuid4().hex[:24]}",
+                        "type": "function",
+                        "function": {"name": self.tool, "arguments": arguments},
+                    }
+                ]
+            },
+        )
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        time.sleep(self.latency.sample())
+        return ChatResult(generations=[ChatGeneration(message=self._reply(messages))])
+
+    async def _agenerate(
+        self, messages, stop=None, run_manager=None, **kwargs
+    ) -> ChatResult:
+        await asyncio.sleep(self.latency.sample())
+        return ChatResult(generations=[ChatGeneration(message=self._reply(messages))])
+
+
+class ScriptedSearchInternet(BaseTool):
+    """Stand-in for the internet search tool, returning fixed results."""
+
+    name = "search_internet_tool"
+    description = "Search the internet for the up-to-date information."
+    args_schema: Type[BaseModel] = PlainSearchRequest
+    latency: Any = None
+
+    def _run(self, query: str, run_manager=None) -> str:
+        time.sleep(self.latency.sample())
+        return SEARCH_RESULTS
+
+    async def _arun(self, query: str, run_manager=None) -> str:
+        await asyncio.sleep(self.latency.sample())
+        return SEARCH_RESULTS
+
+
+def build(name: str, args) -> Callable[[str, str], Any]:
+    """Build an agent runnable with scripted models and return a turn runner."""
+    latency = Latency.parse(args.model_latency)
+    histories: Dict[str, ChatMessageHistory] = {}
+
+    def history(session_id: str) -> ChatMessageHistory:
+        return histories.setdefault(session_id, ChatMessageHistory())
+
+    def model(style: str, tool: str):
+        return lambda **kwargs: ScriptedChatModel(
+            style=style, tool=tool, tool_calls=args.tool_calls, latency=latency
+        )
+
+    if name == "openai_graph":
+        from src.services.lc.graphs import openai_gragh
+
+        tool_latency = Latency.parse(args.upstream_latency)
+        with mock.patch.object(
+            openai_gragh, "ChatOpenAI", model("functions", "search_internet_tool")
+        ), mock.patch.object(
+            openai_gragh,
+            "SearchInternet",
+            lambda: ScriptedSearchInternet(latency=tool_latency),
+        ):
+            runnable = openai_gragh.openai_graph_runnable()
+
+        async def turn(session_id: str, query: str):
+            return await runnable.ainvoke({"messages": [HumanMessage(content=query)]})
+
+        return turn
+
+    if name == "openai_agent":
+        from src.services.lc.agents import openai_agent as module
+
+        llm = mock.patch.object(module, "ChatOpenAI", model("tools", args.tool))
+    else:
+        from src.services.lc.agents import zhipuai_agent as module
+
+        llm = mock.patch.object(module, "ChatZhipuAI", model("react", args.tool))
+
+    with llm, mock.patch.object(module, "init_chat_history", history):
+        runnable = getattr(module, f"{name}_runnable")()
+
+    async def turn(session_id: str, query: str):
+        return await runnable.ainvoke(
+            {"input": query}, config={"configurable": {"session_id": session_id}}
+        )
+
+    return turn
+
+
+async def timed_turn(turn, session_id: str, query: str) -> Dict[str, float]:
+    from src.services import timing
+
+    with timing.collect() as timings:
+        started = time.perf_counter()
+        await turn(session_id, query)
+        total = time.perf_counter() - started
+    stages = timings.breakdown()["stages"]
+    llm = stages.get("llm", {"ms": 0.0, "count": 0})
+    tool = stages.get("tool", {"ms": 0.0, "count": 0})
+    overhead = total * 1000 - llm["ms"] - tool["ms"]
+    return {
+        "total_ms": total * 1000,
+        "llm_ms": llm["ms"],
+        "tool_ms": tool["ms"],
+        "overhead_ms": overhead,
+        "overhead_per_step_ms": overhead / max(llm["count"], 1),
+        "steps": llm["count"],
+    }
+
+
+def summarize(values: List[float]) -> Dict[str, float]:
+    values = sorted(values)
+    return {
+        "p50": round(statistics.median(values), 2),
+        "p95": round(values[min(int(0.95 * len(values)), len(values) - 1)], 2),
+        "mean": round(statistics.fmean(values), 2),
+    }
+
+
+async def run_agent(name: str, args) -> dict:
+    turn = build(name, args)
+    for _ in range(3):
+        await timed_turn(turn, "warmup", "warm up")
+
+    # Sequential turns in one session, so history grows as in a conversation.
+    turns = [
+        await timed_turn(turn, "sequential", f"question {i}")
+        for i in range(args.iterations)
+    ]
+    result = {
+        key: summarize([t[key] for t in turns])
+        for key in (
+            "total_ms",
+            "llm_ms",
+            "tool_ms",
+            "overhead_ms",
+            "overhead_per_step_ms",
+        )
+    }
+    result["steps_per_turn"] = turns[-1]["steps"]
+
+    gc.collect()
+    tracemalloc.start()
+    memory = []
+    for i in range(args.iterations):
+        await turn("memory", f"question {i}")
+        gc.collect()
+        memory.append(tracemalloc.get_traced_memory()[0])
+    tracemalloc.stop()
+    result["memory"] = {
+        "start_kb": round(memory[0] / 1024, 1),
+        "end_kb": round(memory[-1] / 1024, 1),
+        "growth_per_turn_kb": round(
+            (memory[-1] - memory[0]) / 1024 / (len(memory) - 1), 2
+        )
+        if len(memory) > 1
+        else 0.0,
+    }
+
+    latencies = []
+
+    async def session(n: int):
+        for i in range(args.turns):
+            started = time.perf_counter()
+            await turn(f"session-{n}", f"question {i}")
+            latencies.append((time.perf_counter() - started) * 1000)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(session(n) for n in range(args.sessions)))
+    elapsed = time.perf_counter() - started
+    result["concurrent"] = {
+        "sessions": args.sessions,
+        "turns_per_s": round(args.sessions * args.turns / elapsed, 2),
+        "latency_ms": summarize(latencies),
+    }
+    return result
+
+
+async def run(args) -> dict:
+    from src.services.clients import close_clients, get_clients
+    from src.services.lc.callbacks import register_stage_timing
+
+    register_stage_timing()
+    upstream = Latency.parse(args.upstream_latency)
+    install(get_clients(), upstream, upstream, openai=upstream)
+
+    results = {}
+    for name in args.agents:
+        # The executors are built with verbose=True and print every step.
+        with contextlib.redirect_stdout(io.StringIO()):
+            result = await run_agent(name, args)
+        results[name] = result
+        overhead = result["overhead_per_step_ms"]
+        print(
+            f"{name:>16}: overhead {overhead['p50']:7.2f} ms/step "
+            f"(turn p50 {result['total_ms']['p50']:8.1f} ms, "
+            f"{result['steps_per_turn']} steps), "
+            f"memory {result['memory']['growth_per_turn_kb']:+.1f} KB/turn, "
+            f"{result['concurrent']['turns_per_s']:.1f} turns/s "
+            f"with {args.sessions} sessions"
+        )
+    await close_clients()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--agents",
+        nargs="+",
+        choices=("openai_agent", "zhipuai_agent", "openai_graph"),
+        default=("openai_agent", "zhipuai_agent", "openai_graph"),
+    )
+    parser.add_argument("--tool", default="search_academic_db_tool")
+    parser.add_argument("--tool-calls", type=int, default=2)
+    parser.add_argument("--model-latency", default="0", help="median,p99 in ms")
+    parser.add_argument("--upstream-latency", default="0", help="median,p99 in ms")
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--sessions", type=int, default=16)
+    parser.add_argument("--turns", type=int, default=5)
+    parser.add_argument("--output", help="write the results to this JSON file")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"args": vars(args), "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,437 @@
+"""Local stand-ins for OpenAI, Pinecone, Xata and Redis, for offline benchmarks.
+
+OpenAI is served over HTTP by `serve_openai`, so requests go through the real
+SDK clients and carry full-size payloads. Pinecone and Xata are replaced on
+the shared clients by objects that block like their SDKs do, and Redis by an
+in-memory store. Every stand-in waits for a log-normal delay given by its
+median and 99th percentile.
+"""
+
+import asyncio
+import base64
+import json
+import math
+import random
+import time
+import uuid
+import zlib
+from contextlib import asynccontextmanager, contextmanager
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from src.config.config import (
+    PINECONE_NAMESPACE_PATENT,
+    PINECONE_NAMESPACE_SCI,
+    XATA_DOCS_DB_URL,
+)
+
+WORDS = (
+    "life cycle assessment carbon footprint emission factor steel cement "
+    "inventory allocation system boundary functional unit impact category "
+    "electricity grid mix recycling end-of-life transport scenario "
+    "生命周期评价 环境管理 碳排放 清单分析 功能单位"
+).split()
+
+CHUNKS_PER_DOCUMENT = 40
+
+
+class Latency:
+    """Log-normal delay with the given median and 99th percentile, in ms."""
+
+    def __init__(self, median_ms: float, p99_ms: Optional[float] = None):
+        self.median_ms = median_ms
+        self.p99_ms = p99_ms or median_ms
+        # The 99th percentile of a standard normal.
+        self.sigma = math.log(self.p99_ms / median_ms) / 2.326 if median_ms else 0.0
+
+    @classmethod
+    def parse(cls, text: str) -> "Latency":
+        """Read `median` or `median,p99`, in milliseconds."""
+        median, _, p99 = text.partition(",")
+        return cls(float(median), float(p99) if p99 else None)
+
+    def sample(self) -> float:
+        """Return one delay, in seconds."""
+        if not self.median_ms:
+            return 0.0
+        return random.lognormvariate(math.log(self.median_ms), self.sigma) / 1000
+
+    def __str__(self) -> str:
+        return f"{self.median_ms:g},{self.p99_ms:g}"
+
+
+def make_text(rng: random.Random, chars: int) -> str:
+    words = []
+    length = 0
+    while length < chars:
+        word = rng.choice(WORDS)
+        words.append(word)
+        length += len(word) + 1
+    return " ".join(words)
+
+
+def fake_embedding(text: str, dim: int) -> np.ndarray:
+    rng = np.random.default_rng(zlib.crc32(text.encode("utf-8")))
+    vector = rng.standard_normal(dim).astype(np.float32)
+    return vector / np.linalg.norm(vector)
+
+
+def openai_app(
+    embedding_latency: Latency,
+    chat_latency: Latency,
+    token_ms: float = 5.0,
+    answer_tokens: int = 200,
+    dim: int = 1536,
+):
+    """A Starlette app answering the OpenAI embeddings and chat endpoints."""
+    from starlette.applications import Starlette
+    from starlette.responses import JSONResponse, StreamingResponse
+    from starlette.routing import Route
+
+    rng = random.Random(0)
+    answer = [f"{word} " for word in make_text(rng, answer_tokens * 8).split()]
+    answer = answer[:answer_tokens]
+
+    async def embeddings(request):
+        payload = await request.json()
+        texts = payload["input"]
+        texts = texts if isinstance(texts, list) else [texts]
+        await asyncio.sleep(embedding_latency.sample())
+
+        data = []
+        for index, text in enumerate(texts):
+            vector = fake_embedding(str(text), dim)
+            if payload.get("encoding_format") == "base64":
+                embedding = base64.b64encode(vector.tobytes()).decode()
+            else:
+                embedding = vector.tolist()
+            data.append({"object": "embedding", "index": index, "embedding": embedding})
+        tokens = sum(len(str(text).split()) for text in texts)
+        return JSONResponse(
+            {
+                "object": "list",
+                "data": data,
+                "model": payload["model"],
+                "usage": {"prompt_tokens": tokens, "total_tokens": tokens},
+            },
+            headers={"x-request-id": f"req_{uuid.uuid4().hex}"},
+        )
+
+    def _completion(payload: dict, id: str) -> dict:
+        return {
+            "id": id,
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": payload["model"],
+            "choices": [
+                {
+                    "index": 0,
+                    "message": {"role": "assistant", "content": "".join(answer)},
+                    "finish_reason": "stop",
+                }
+            ],
+            "usage": {
+                "prompt_tokens": 100,
+                "completion_tokens": len(answer),
+                "total_tokens": 100 + len(answer),
+            },
+        }
+
+    def _chunk(payload: dict, id: str, delta: dict, finish: Optional[str]) -> str:
+        chunk = {
+            "id": id,
+            "object": "chat.completion.chunk",
+            "created": int(time.time()),
+            "model": payload["model"],
+            "choices": [{"index": 0, "delta": delta, "finish_reason": finish}],
+        }
+        return f"data: {json.dumps(chunk)}\n\n"
+
+    async def chat_completions(request):
+        payload = await request.json()
+        id = f"chatcmpl-{uuid.uuid4().hex}"
+        headers = {"x-request-id": f"req_{uuid.uuid4().hex}"}
+        await asyncio.sleep(chat_latency.sample())
+        if not payload.get("stream"):
+            await asyncio.sleep(token_ms * len(answer) / 1000)
+            return JSONResponse(_completion(payload, id), headers=headers)
+
+        async def events():
+            yield _chunk(payload, id, {"role": "assistant", "content": ""}, None)
+            for token in answer:
+                await asyncio.sleep(token_ms / 1000)
+                yield _chunk(payload, id, {"content": token}, None)
+            yield _chunk(payload, id, {}, "stop")
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(
+            events(), media_type="text/event-stream", headers=headers
+        )
+
+    async def health(request):
+        return JSONResponse({"status": "ok"})
+
+    return Starlette(
+        routes=[
+            Route("/v1/embeddings", embeddings, methods=["POST"]),
+            Route("/v1/chat/completions", chat_completions, methods=["POST"]),
+            Route("/health", health),
+        ]
+    )
+
+
+def serve_openai(port: int, embedding_latency: str, chat_latency: str, token_ms: float):
+    """Run the fake OpenAI API on localhost, for use as a subprocess target."""
+    import uvicorn
+
+    app = openai_app(
+        Latency.parse(embedding_latency), Latency.parse(chat_latency), token_ms
+    )
+    uvicorn.run(app, host="127.0.0.1", port=port, log_level="warning")
+
+
+class Record(dict):
+    """A dict whose keys also read as attributes, like Pinecone SDK models."""
+
+    def __getattr__(self, name):
+        try:
+            return self[name]
+        except KeyError:
+            raise AttributeError(name) from None
+
+
+class FakeIndex:
+    """Pinecone index returning `top_k` pseudo-random chunks of a fixed corpus.
+
+    Hits depend only on the query vector, so repeated queries return the same
+    ids, and the corpus has `documents` documents per namespace.
+    """
+
+    def __init__(self, latency: Latency, documents: int = 20000, chars: int = 1000):
+        self.latency = latency
+        self.documents = documents
+        rng = random.Random(0)
+        self._texts = [make_text(rng, chars) for _ in range(256)]
+
+    def _metadata(self, namespace: str, id: str) -> dict:
+        text = self._texts[zlib.crc32(id.encode()) % len(self._texts)]
+        if namespace == PINECONE_NAMESPACE_PATENT:
+            return {
+                "abstract": text,
+                "title": text[:80],
+                "country": "CN",
+                "publication_date": 1700000000.0,
+                "url": f"https://patents.example.com/{id}",
+            }
+        if namespace == PINECONE_NAMESPACE_SCI:
+            return {"text": text, "date": 1700000000.0, "journal": "Journal"}
+        return {"text": text}
+
+    def _id(self, namespace: str, doc: int, chunk: int) -> str:
+        if namespace == PINECONE_NAMESPACE_PATENT:
+            return f"CN{doc:09d}A"
+        if namespace == PINECONE_NAMESPACE_SCI:
+            return f"10.1016/fake.{doc}_{chunk}"
+        return f"std{doc:06d}_{chunk}"
+
+    def query(self, namespace: str, vector, top_k: int, **kwargs):
+        time.sleep(self.latency.sample())
+        rng = random.Random(zlib.crc32(np.asarray(vector, np.float32).tobytes()))
+        matches = []
+        for rank in range(top_k):
+            id = self._id(
+                namespace,
+                rng.randrange(self.documents),
+                rng.randrange(CHUNKS_PER_DOCUMENT),
+            )
+            matches.append(
+                Record(
+                    id=id,
+                    score=0.9 - rank / 1000,
+                    metadata=self._metadata(namespace, id),
+                )
+            )
+        return Record(matches=matches, namespace=namespace)
+
+    def fetch(self, ids: List[str], namespace: str, **kwargs):
+        time.sleep(self.latency.sample())
+        vectors = {}
+        for id in ids:
+            _, _, chunk = id.rpartition("_")
+            if not chunk.isdigit() or int(chunk) < CHUNKS_PER_DOCUMENT:
+                vectors[id] = Record(id=id, metadata=self._metadata(namespace, id))
+        return Record(vectors=vectors, namespace=namespace)
+
+    def list(self, prefix: str = "", namespace: str = "", **kwargs):
+        time.sleep(self.latency.sample())
+        yield [f"{prefix}{chunk}" for chunk in range(CHUNKS_PER_DOCUMENT)]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+class FakeEmbeddings:
+    """In-process stand-in for `AsyncOpenAI().embeddings`."""
+
+    def __init__(self, latency: Latency, dim: int = 1536):
+        self.latency = latency
+        self.dim = dim
+
+    async def create(self, input, model: str, **kwargs):
+        await asyncio.sleep(self.latency.sample())
+        texts = input if isinstance(input, list) else [input]
+        return Record(
+            data=[
+                Record(index=index, embedding=fake_embedding(text, self.dim).tolist())
+                for index, text in enumerate(texts)
+            ]
+        )
+
+
+class FakeAsyncOpenAI:
+    def __init__(self, latency: Latency):
+        self.embeddings = FakeEmbeddings(latency)
+
+    async def close(self):
+        pass
+
+
+class FakeXataResponse(dict):
+    def __init__(self, records: List[dict]):
+        super().__init__(records=records, meta={"page": {"more": False}})
+        self.headers = {"x-request-id": uuid.uuid4().hex}
+
+
+class FakeXata:
+    """Xata client answering `data().query()` with a record for every id."""
+
+    def __init__(self, latency: Latency):
+        self.latency = latency
+
+    def data(self):
+        return self
+
+    @property
+    def session(self):
+        return self
+
+    def close(self):
+        pass
+
+    def query(self, table: str, payload: dict) -> FakeXataResponse:
+        time.sleep(self.latency.sample())
+        ((key, condition),) = payload["filter"].items()
+        return FakeXataResponse([self._record(table, id) for id in condition["$any"]])
+
+    @staticmethod
+    def _record(table: str, id: str) -> dict:
+        if table == "journals":
+            return {
+                "id": id,
+                "doi": id,
+                "title": f"A study of {id}",
+                "authors": ["Zhang San", "Li Si", "Wang Wu"],
+            }
+        return {
+            "id": id,
+            "standard_number": f"GB/T {zlib.crc32(id.encode()) % 100000}-2020",
+            "standard_title": f"Standard {id}",
+            "issuing_organization": ["SAC"],
+            "release_date": "2020-01-01T00:00:00Z",
+            "url": f"https://standards.example.com/{id}",
+        }
+
+
+class FakeRedis:
+    """In-memory Redis with the calls the caches make."""
+
+    def __init__(self, data: Optional[Dict[str, bytes]] = None):
+        self._data = {} if data is None else data
+
+    def mget(self, keys):
+        return [self._data.get(key) for key in keys]
+
+    def hgetall(self, key):
+        return dict(self._data.get(key, {}))
+
+    @contextmanager
+    def pipeline(self, transaction: bool = True):
+        yield _Pipeline(self._data)
+
+    def close(self):
+        pass
+
+
+class FakeAsyncRedis(FakeRedis):
+    async def mget(self, keys):
+        return super().mget(keys)
+
+    async def hgetall(self, key):
+        return super().hgetall(key)
+
+    @asynccontextmanager
+    async def pipeline(self, transaction: bool = True):
+        yield _AsyncPipeline(self._data)
+
+    async def aclose(self):
+        pass
+
+
+class _Pipeline:
+    def __init__(self, data: Dict[str, bytes]):
+        self._data = data
+        self._commands = []
+
+    def set(self, key, value, ex=None):
+        self._commands.append((self._set, key, value))
+
+    def hset(self, key, mapping):
+        self._commands.append((self._hset, key, mapping))
+
+    def expire(self, key, seconds):
+        pass
+
+    def _set(self, key, value):
+        self._data[key] = value.encode() if isinstance(value, str) else value
+
+    def _hset(self, key, mapping):
+        fields = self._data.setdefault(key, {})
+        for field, value in mapping.items():
+            fields[field.encode()] = str(value).encode()
+
+    def execute(self):
+        for command, key, value in self._commands:
+            command(key, value)
+        self._commands = []
+
+
+class _AsyncPipeline(_Pipeline):
+    async def execute(self):
+        super().execute()
+
+
+def install(
+    clients,
+    pinecone: Latency,
+    xata: Latency,
+    redis: bool = True,
+    openai: Optional[Latency] = None,
+):
+    """Point the shared clients at the Pinecone and Xata stand-ins.
+
+    With `redis`, the caches use an in-memory store instead of REDIS.URL. With
+    `openai`, embeddings come from an in-process stand-in instead of the
+    OpenAI base URL.
+    """
+    clients._index = FakeIndex(pinecone)
+    if openai is not None:
+        clients.openai = FakeAsyncOpenAI(openai)
+    clients._xata[XATA_DOCS_DB_URL] = FakeXata(xata)
+    if redis:
+        clients.redis = FakeAsyncRedis()
+        clients._redis_sync = FakeRedis(clients.redis._data)
+    return clients
@@ -0,0 +1,214 @@
+"""Measure document ingestion throughput in pages per second.
+
+Run from the repository root:
+
+    python -m benchmarks.ingestion_benchmark --pages 200 --files 4 --processes 2
+
+Synthetic plain text and DOCX files (and PDF files when pypdf can write
+them) are ingested into a temporary session store. Embeddings come from the
+in-process stand-in of `benchmarks.fake_upstreams`, each call taking
+`--embedding-latency`. Extraction is timed alone in the process pool, then
+`--files` files per format are ingested concurrently end to end, then
+ingested again in another session, reusing the stored indexes.
+"""
+
+import argparse
+import asyncio
+import hashlib
+import io
+import os
+import random
+import tempfile
+import time
+import zipfile
+from unittest import mock
+
+from benchmarks.fake_upstreams import Latency, fake_embedding, install, make_text
+from src.services import extraction, ingestion, upload_store
+
+try:
+    import pypdf
+except ImportError:
+    pypdf = None
+
+DOCX_TYPES = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">
+<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>
+<Default Extension="xml" ContentType="application/xml"/>
+<Override PartName="/word/document.xml" ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>
+</Types>"""
+
+DOCX_RELS = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">
+<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="word/document.xml"/>
+</Relationships>"""
+
+PAGE_BREAK = '<w:p><w:r><w:br w:type="page"/></w:r></w:p>'
+
+
+def make_pages(rng: random.Random, pages: int, chars: int) -> list:
+    return [
+        "\n".join(make_text(rng, 300) for _ in range(max(1, chars // 300)))
+        for _ in range(pages)
+    ]
+
+
+def write_txt(path: str, pages: list):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("\f".join(pages))
+
+
+def write_docx(path: str, pages: list):
+    body = PAGE_BREAK.join(
+        "".join(
+            f"<w:p><w:r><w:t>{paragraph}</w:t></w:r></w:p>"
+            for paragraph in page.split("\n")
+        )
+        for page in pages
+    )
+    document = (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<w:document xmlns:w="http://schemas.openxmlformats.org/'
+        f'wordprocessingml/2006/main"><w:body>{body}</w:body></w:document>'
+    )
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("[Content_Types].xml", DOCX_TYPES)
+        archive.writestr("_rels/.rels", DOCX_RELS)
+        archive.writestr("word/document.xml", document)
+
+
+def write_pdf(path: str, pages: list):
+    # pypdf cannot lay out text, so the pages are blank and only the parsing
+    # cost is measured.
+    writer = pypdf.PdfWriter()
+    for _ in pages:
+        writer.add_blank_page(width=595, height=842)
+    buffer = io.BytesIO()
+    writer.write(buffer)
+    with open(path, "wb") as f:
+        f.write(buffer.getvalue())
+
+
+async def ingest_all(session_id: str, paths: list) -> float:
+    started = time.perf_counter()
+    jobs = [
+        (await ingestion.create_job(session_id, path), path, sha256)
+        for path, sha256 in paths
+    ]
+    progress = await asyncio.gather(
+        *(
+            ingestion.ingest(job_id, session_id, path, sha256)
+            for job_id, path, sha256 in jobs
+        )
+    )
+    seconds = time.perf_counter() - started
+    failed = [p["error"] for p in progress if p["status"] != "done"]
+    if failed:
+        raise SystemExit(f"{session_id} ingestion failed: {failed[0]}")
+    return seconds
+
+
+async def run(args, directory: str):
+    rng = random.Random(0)
+    writers = {".txt": write_txt, ".docx": write_docx}
+    if pypdf is not None:
+        writers[".pdf"] = write_pdf
+
+    files = {}
+    for extension, write in writers.items():
+        files[extension] = []
+        for i in range(args.files):
+            # Distinct files, since identical ones would reuse one index.
+            path = os.path.join(directory, f"document_{i}{extension}")
+            write(path, make_pages(rng, args.pages, args.chars))
+            with open(path, "rb") as f:
+                files[extension].append((path, hashlib.sha256(f.read()).hexdigest()))
+
+    loop = asyncio.get_running_loop()
+    # Start the pool workers and their imports before timing anything.
+    warm = os.path.join(directory, "warm.txt")
+    write_txt(warm, make_pages(rng, 1, args.chars))
+    await asyncio.gather(
+        *(
+            loop.run_in_executor(
+                ingestion.pool(), extraction.extract_chunks, warm, 1000, 0
+            )
+            for _ in range(args.processes * 2)
+        )
+    )
+
+    total_pages = args.pages * args.files
+    print(
+        f"{args.files} files x {args.pages} pages x {args.chars} chars, "
+        f"{args.processes} processes, embedding latency {args.embedding_latency}"
+    )
+    for extension, paths in files.items():
+        started = time.perf_counter()
+        results = await asyncio.gather(
+            *(
+                loop.run_in_executor(
+                    ingestion.pool(),
+                    extraction.extract_chunks,
+                    path,
+                    args.chunk_size,
+                    args.chunk_overlap,
+                )
+                for path, _ in paths
+            )
+        )
+        extract_seconds = time.perf_counter() - started
+        chunks = sum(len(result["chunks"]) for result in results)
+
+        total_seconds = await ingest_all(extension[1:], paths)
+        reused_seconds = await ingest_all(f"{extension[1:]}-again", paths)
+
+        started = time.perf_counter()
+        for _ in range(args.searches):
+            vector = fake_embedding(make_text(rng, 50), 1536)
+            ingestion.search_session(extension[1:], vector, 16)
+        search_ms = (time.perf_counter() - started) * 1000 / args.searches
+
+        print(
+            f"{extension:6} {chunks:6d} chunks  "
+            f"extract {total_pages / extract_seconds:8.0f} pages/s  "
+            f"end to end {total_pages / total_seconds:8.0f} pages/s  "
+            f"reused {total_pages / reused_seconds:8.0f} pages/s  "
+            f"search {search_ms:6.2f} ms"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", type=int, default=200)
+    parser.add_argument("--chars", type=int, default=2000, help="per page")
+    parser.add_argument("--files", type=int, default=4, help="per format")
+    parser.add_argument("--processes", type=int, default=2)
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    parser.add_argument("--chunk-overlap", type=int, default=200)
+    parser.add_argument("--embedding-latency", default="200,800")
+    parser.add_argument("--searches", type=int, default=50)
+    args = parser.parse_args()
+
+    from src.services.clients import get_clients
+
+    install(
+        get_clients(),
+        Latency(0),
+        Latency(0),
+        openai=Latency.parse(args.embedding_latency),
+    )
+    with tempfile.TemporaryDirectory() as directory, mock.patch.multiple(
+        ingestion,
+        INGEST_DIR=os.path.join(directory, "sessions"),
+        INGEST_PROCESSES=args.processes,
+        INGEST_CHUNK_SIZE=args.chunk_size,
+        INGEST_CHUNK_OVERLAP=args.chunk_overlap,
+    ), mock.patch.object(upload_store, "UPLOAD_DIR", os.path.join(directory, "store")):
+        try:
+            asyncio.run(run(args, directory))
+        finally:
+            ingestion.shutdown_pool()
+
+
+if __name__ == "__main__":
+    main()
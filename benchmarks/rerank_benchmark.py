@@ -0,0 +1,64 @@
+"""Time the BM25 re-ranking stage on synthetic search candidates.
+
+Run from the repository root:
+
+    python -m benchmarks.rerank_benchmark --candidates 100 --chars 1000
+"""
+
+import argparse
+import random
+import statistics
+import time
+
+from src.services.rerank import rerank_hits
+
+WORDS = (
+    "life cycle assessment carbon footprint emission factor steel cement "
+    "GB/T 24040-2008 ISO 14044 1,2-dichloroethane benzene toluene process "
+    "inventory allocation system boundary functional unit impact category"
+).split()
+CJK_TEXT = "生命周期评价环境管理碳排放因子清单分析系统边界功能单位影响类别"
+
+
+def make_text(rng: random.Random, chars: int) -> str:
+    parts = []
+    length = 0
+    while length < chars:
+        if rng.random() < 0.3:
+            start = rng.randrange(len(CJK_TEXT) - 8)
+            part = CJK_TEXT[start : start + rng.randint(4, 8)]
+        else:
+            part = rng.choice(WORDS)
+        parts.append(part)
+        length += len(part) + 1
+    return " ".join(parts)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--candidates", type=int, default=100)
+    parser.add_argument("--chars", type=int, default=1000)
+    parser.add_argument("--top-k", type=int, default=16)
+    parser.add_argument("--runs", type=int, default=200)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    hits = [make_text(rng, args.chars) for _ in range(args.candidates)]
+    query = "GB/T 24040 生命周期评价 carbon footprint"
+
+    timings = []
+    for _ in range(args.runs):
+        started = time.perf_counter()
+        rerank_hits(query, hits, str, args.top_k)
+        timings.append((time.perf_counter() - started) * 1000)
+
+    timings.sort()
+    print(
+        f"{args.candidates} candidates x {args.chars} chars: "
+        f"p50 {statistics.median(timings):.2f} ms, "
+        f"p95 {timings[int(len(timings) * 0.95) - 1]:.2f} ms"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""Compare response encodings of the search APIs on synthetic results.
+
+Run from the repository root:
+
+    python -m benchmarks.serialization_benchmark --queries 1 --top-k 16
+"""
+
+import argparse
+import gzip
+import json
+import random
+import time
+
+import orjson
+from fastapi.encoders import jsonable_encoder
+
+from src.config.config import RESPONSE_BROTLI_QUALITY, RESPONSE_GZIP_LEVEL
+from src.models.models import BatchSearchResponse, SearchResponse
+from src.routers.encoding import brotli, msgpack
+
+WORDS = (
+    "life cycle assessment carbon footprint emission factor steel cement "
+    "inventory allocation system boundary functional unit impact category "
+    "生命周期评价 环境管理 碳排放 清单分析"
+).split()
+
+
+def make_hit(rng: random.Random, rank: int) -> dict:
+    doi = f"10.1016/j.jclepro.2024.{rng.randrange(100000, 999999)}"
+    title = " ".join(rng.choices(WORDS, k=10))
+    authors = [f"Author {i}" for i in range(rng.randint(2, 8))]
+    url = f"https://doi.org/{doi}"
+    return {
+        "id": f"{doi}_{rng.randrange(40)}",
+        "content": " ".join(rng.choices(WORDS, k=150)),
+        "source": f"[{title}. Journal. {', '.join(authors)}. 2024-01.]({url})",
+        "title": title,
+        "authors": authors,
+        "date": "2024-01-15",
+        "url": url,
+        "score": 0.9 - rank / 100,
+    }
+
+
+def fastapi_default(model) -> bytes:
+    """What a FastAPI route returning `model` sends with the default encoder."""
+    return json.dumps(
+        jsonable_encoder(model),
+        ensure_ascii=False,
+        allow_nan=False,
+        indent=None,
+        separators=(",", ":"),
+    ).encode("utf-8")
+
+
+def timed(func, runs: int):
+    func()
+    started = time.perf_counter()
+    for _ in range(runs):
+        result = func()
+    return (time.perf_counter() - started) / runs * 1000, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--queries", type=int, default=1)
+    parser.add_argument("--top-k", type=int, default=16)
+    parser.add_argument("--runs", type=int, default=200)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    results = [
+        [make_hit(rng, rank) for rank in range(args.top_k)] for _ in range(args.queries)
+    ]
+    if args.queries == 1:
+        model = SearchResponse(result=results[0])
+    else:
+        model = BatchSearchResponse(
+            results=[SearchResponse(result=result) for result in results]
+        )
+
+    encoders = {
+        "fastapi json": lambda: fastapi_default(model),
+        "orjson": lambda: orjson.dumps(model.model_dump(exclude_unset=True)),
+    }
+    if msgpack is not None:
+        encoders["msgpack"] = lambda: msgpack.packb(
+            model.model_dump(exclude_unset=True), use_bin_type=True
+        )
+
+    print(f"{args.queries} x {args.top_k} hits")
+    for name, encode in encoders.items():
+        ms, body = timed(encode, args.runs)
+        print(f"{name:>14}: {ms:7.3f} ms {len(body):>9} bytes")
+
+    body = orjson.dumps(model.model_dump(exclude_unset=True))
+    compressors = {
+        "orjson+gzip": lambda: gzip.compress(body, compresslevel=RESPONSE_GZIP_LEVEL),
+    }
+    if brotli is not None:
+        compressors["orjson+br"] = lambda: brotli.compress(
+            body, quality=RESPONSE_BROTLI_QUALITY
+        )
+    for name, compress in compressors.items():
+        ms, compressed = timed(compress, args.runs)
+        print(f"{name:>14}: {ms:7.3f} ms {len(compressed):>9} bytes")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,279 @@
+"""Load-test the server offline, against local stand-ins for its upstreams.
+
+Run from the repository root:
+
+    python -m benchmarks.server_benchmark --concurrency 1 8 32 --output baseline.json
+    python -m benchmarks.server_benchmark --compare baseline.json
+
+Requests go to the app in process. OpenAI calls go to a fake API served from
+a subprocess, and Pinecone, Xata and Redis are replaced on the shared clients,
+all with the latencies given on the command line. Caches stay warm across
+runs, as in a long-running server; `--unique-queries` sets how often queries
+repeat.
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import platform
+import random
+import subprocess
+import time
+from typing import Callable, Dict, List
+
+import httpx
+
+from benchmarks.fake_upstreams import Latency, install, serve_openai
+
+WORDS = (
+    "carbon footprint steel cement emission factor recycling electricity "
+    "transport allocation inventory impact water land use 生命周期 碳排放"
+).split()
+
+SCENARIOS = (
+    "search_academic_db",
+    "search_patent_db",
+    "search_standard_db",
+    "upload_file",
+    "openai_chain_invoke",
+)
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    index = min(int(q * len(sorted_values)), len(sorted_values) - 1)
+    return sorted_values[index]
+
+
+def make_requests(args) -> Dict[str, Callable[[random.Random], dict]]:
+    """Map each scenario to a function building the kwargs of one request."""
+    rng = random.Random(args.seed)
+    queries = [
+        " ".join(rng.choices(WORDS, k=4)) + f" {i}" for i in range(args.unique_queries)
+    ]
+    upload = os.urandom(args.upload_kb * 1024)
+
+    def search(path):
+        return lambda rng: {
+            "method": "POST",
+            "url": path,
+            "json": {"query": rng.choice(queries), "top_k": args.top_k},
+        }
+
+    return {
+        "search_academic_db": search("/search_academic_db"),
+        "search_patent_db": search("/search_patent_db"),
+        "search_standard_db": search("/search_standard_db"),
+        "upload_file": lambda rng: {
+            "method": "POST",
+            "url": "/upload_file",
+            "files": {"file": ("benchmark.pdf", upload, "application/pdf")},
+            "data": {"session_id": "benchmark"},
+        },
+        "openai_chain_invoke": lambda rng: {
+            "method": "POST",
+            "url": "/openai_chain/invoke",
+            "json": {"input": rng.choice(queries)},
+        },
+    }
+
+
+def cleanup(response: httpx.Response):
+    """Remove the files written by upload requests."""
+    if response.request.url.path == "/upload_file" and response.is_success:
+        from src.services import upload_store
+
+        stored = response.json()
+        for path in (stored["file_path"], upload_store.blob_path(stored["sha256"])):
+            if os.path.exists(path):
+                os.remove(path)
+
+
+async def run_level(
+    client: httpx.AsyncClient,
+    build: Callable[[random.Random], dict],
+    concurrency: int,
+    requests: int,
+    rng: random.Random,
+) -> dict:
+    latencies = []
+    errors = 0
+    remaining = requests
+
+    async def worker():
+        nonlocal remaining, errors
+        while remaining > 0:
+            remaining -= 1
+            kwargs = build(rng)
+            started = time.perf_counter()
+            try:
+                response = await client.request(**kwargs)
+                ok = response.is_success
+            except httpx.HTTPError:
+                response, ok = None, False
+            latencies.append(time.perf_counter() - started)
+            if not ok:
+                errors += 1
+            elif response is not None:
+                cleanup(response)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "requests": requests,
+        "errors": errors,
+        "rps": round(requests / elapsed, 2),
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 2),
+    }
+
+
+def start_openai(args) -> multiprocessing.Process:
+    process = multiprocessing.get_context("spawn").Process(
+        target=serve_openai,
+        args=(args.port, args.embedding_latency, args.chat_latency, args.token_ms),
+        daemon=True,
+    )
+    process.start()
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            httpx.get(f"http://127.0.0.1:{args.port}/health").raise_for_status()
+            return process
+        except httpx.HTTPError:
+            time.sleep(0.1)
+    process.terminate()
+    raise RuntimeError("The fake OpenAI API did not start")
+
+
+async def run(args) -> dict:
+    # The OpenAI clients read the base URL when they are created.
+    os.environ["OPENAI_BASE_URL"] = f"http://127.0.0.1:{args.port}/v1"
+    os.environ["OPENAI_API_BASE"] = os.environ["OPENAI_BASE_URL"]
+
+    from src.config.config import FASTAPI_BEARER_TOKEN
+    from src.main import app
+    from src.services.clients import close_clients, get_clients
+
+    install(
+        get_clients(),
+        Latency.parse(args.pinecone_latency),
+        Latency.parse(args.xata_latency),
+        redis=not args.redis,
+    )
+    builders = make_requests(args)
+    rng = random.Random(args.seed)
+    random.seed(args.seed)
+
+    results = {}
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app),
+        base_url="http://benchmark",
+        headers={"Authorization": f"Bearer {FASTAPI_BEARER_TOKEN}"},
+        timeout=None,
+    ) as client:
+        for scenario in args.scenarios:
+            build = builders[scenario]
+            results[scenario] = {}
+            for concurrency in args.concurrency:
+                await run_level(client, build, concurrency, concurrency, rng)
+                result = await run_level(client, build, concurrency, args.requests, rng)
+                results[scenario][str(concurrency)] = result
+                print(
+                    f"{scenario:>20} c={concurrency:<4} "
+                    f"p50 {result['p50_ms']:8.1f} ms  p95 {result['p95_ms']:8.1f} ms  "
+                    f"p99 {result['p99_ms']:8.1f} ms  {result['rps']:8.1f} req/s  "
+                    f"{result['errors']} errors"
+                )
+    await close_clients()
+    return results
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def compare(results: dict, baseline_path: str):
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    print(f"\nCompared with {baseline_path} ({baseline['meta'].get('revision')}):")
+    for scenario, levels in results.items():
+        for concurrency, result in levels.items():
+            before = baseline["results"].get(scenario, {}).get(concurrency)
+            if not before:
+                continue
+            changes = "  ".join(
+                f"{key} {(result[key] - before[key]) / before[key] * 100:+6.1f}%"
+                for key in ("p50_ms", "p95_ms", "p99_ms", "rps")
+                if before[key]
+            )
+            print(f"{scenario:>20} c={concurrency:<4} {changes}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=SCENARIOS)
+    parser.add_argument("--concurrency", nargs="+", type=int, default=[1, 8, 32])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--top-k", type=int, default=16)
+    parser.add_argument("--unique-queries", type=int, default=500)
+    parser.add_argument("--upload-kb", type=int, default=256)
+    parser.add_argument(
+        "--embedding-latency", default="120,500", help="median,p99 in ms"
+    )
+    parser.add_argument("--chat-latency", default="400,1500", help="median,p99 in ms")
+    parser.add_argument("--token-ms", type=float, default=5.0)
+    parser.add_argument("--pinecone-latency", default="40,200", help="median,p99 in ms")
+    parser.add_argument("--xata-latency", default="60,300", help="median,p99 in ms")
+    parser.add_argument(
+        "--redis",
+        action="store_true",
+        help="use REDIS.URL instead of an in-memory store",
+    )
+    parser.add_argument("--port", type=int, default=18765)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument("--compare", help="print changes from this JSON baseline")
+    args = parser.parse_args()
+
+    process = start_openai(args)
+    try:
+        results = asyncio.run(run(args))
+    finally:
+        process.terminate()
+
+    report = {
+        "meta": {
+            "revision": git_revision(),
+            "python": platform.python_version(),
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "args": {
+                key: value
+                for key, value in vars(args).items()
+                if key not in ("output", "compare")
+            },
+        },
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+"""Measure server startup: import time per module and time to the first health check.
+
+Run from the repository root:
+
+    python -m benchmarks.startup_benchmark --runs 3 --max-seconds 5
+    python -m benchmarks.startup_benchmark --imports 25
+
+The server is started with uvicorn in a subprocess and polled on /health
+until it answers, then until the warm-up task has built every runnable. With
+`--max-seconds`, the command fails when the first healthy response takes
+longer, so it can guard startup time in CI. `--imports` profiles
+`import src.main` with `python -X importtime` instead.
+"""
+
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+import httpx
+
+IMPORT_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def profile_imports(module: str) -> List[Tuple[str, int, int]]:
+    """Return (module, self µs, cumulative µs) for each module imported."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    modules = []
+    for line in result.stderr.splitlines():
+        match = IMPORT_LINE.match(line)
+        if match:
+            self_us, cumulative_us, _, name = match.groups()
+            modules.append((name, int(self_us), int(cumulative_us)))
+    return modules
+
+
+def print_imports(modules: List[Tuple[str, int, int]], top: int):
+    by_package: Dict[str, int] = defaultdict(int)
+    for name, self_us, _ in modules:
+        by_package[name.split(".")[0]] += self_us
+    total = sum(by_package.values())
+    print(f"{len(modules)} modules imported in {total / 1e6:.2f} s\n")
+
+    print("Top-level packages by own import time:")
+    for package, self_us in sorted(by_package.items(), key=lambda item: -item[1])[:top]:
+        print(f"  {self_us / 1000:9.1f} ms  {package}")
+
+    print("\nModules by cumulative import time:")
+    for name, _, cumulative_us in sorted(modules, key=lambda item: -item[2])[:top]:
+        print(f"  {cumulative_us / 1000:9.1f} ms  {name}")
+
+
+def wait_for(
+    client: httpx.Client, deadline: float, ready: bool
+) -> Optional[Tuple[float, dict]]:
+    """Poll /health until it answers, or until every runnable is built."""
+    while time.perf_counter() < deadline:
+        try:
+            response = client.get("/health")
+            if response.is_success:
+                health = response.json()
+                runnables = health["runnables"]
+                if not ready or runnables["ready"] == runnables["total"]:
+                    return time.perf_counter(), health
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.02)
+    return None
+
+
+def measure(args, headers: dict) -> dict:
+    server = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "uvicorn",
+            "src.main:app",
+            "--port",
+            str(args.port),
+            "--log-level",
+            "warning",
+        ],
+        env={**os.environ, "PYTHONDONTWRITEBYTECODE": "1"},
+    )
+    started = time.perf_counter()
+    deadline = started + args.timeout
+    try:
+        with httpx.Client(
+            base_url=f"http://127.0.0.1:{args.port}", headers=headers, timeout=5
+        ) as client:
+            healthy = wait_for(client, deadline, ready=False)
+            if healthy is None:
+                raise RuntimeError("The server did not become healthy")
+            warm = wait_for(client, deadline, ready=True)
+            if warm is None:
+                raise RuntimeError("The runnables were not built")
+            client.get("/openai_chain/input_schema").raise_for_status()
+    finally:
+        server.terminate()
+        server.wait()
+
+    return {
+        "healthy_s": round(healthy[0] - started, 3),
+        "warm_s": round(warm[0] - started, 3),
+        "build_seconds": warm[1]["runnables"]["build_seconds"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument(
+        "--max-seconds",
+        type=float,
+        help="fail when the first healthy response takes longer",
+    )
+    parser.add_argument(
+        "--imports",
+        type=int,
+        metavar="N",
+        help="profile the imports of src.main and print the top N",
+    )
+    parser.add_argument("--port", type=int, default=18777)
+    parser.add_argument("--timeout", type=float, default=120)
+    parser.add_argument("--output", help="write the results to this JSON file")
+    args = parser.parse_args()
+
+    if args.imports:
+        print_imports(profile_imports("src.main"), args.imports)
+        return
+
+    from src.config.config import FASTAPI_BEARER_TOKEN
+
+    headers = {"Authorization": f"Bearer {FASTAPI_BEARER_TOKEN}"}
+    runs = []
+    for _ in range(args.runs):
+        result = measure(args, headers)
+        runs.append(result)
+        print(
+            f"healthy after {result['healthy_s']:6.2f} s, "
+            f"all runnables built after {result['warm_s']:6.2f} s"
+        )
+    slowest = max(run["healthy_s"] for run in runs)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"args": vars(args), "runs": runs}, f, indent=2)
+    if args.max_seconds is not None and slowest > args.max_seconds:
+        print(f"Startup took {slowest:.2f} s, over the {args.max_seconds} s bound")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
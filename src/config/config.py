@@ -35,11 +35,91 @@ E2B_API_KEY = config["E2B"]["API_KEY"]
 WIX_CLIENT_ID = config["WIX"]["WIX_CLIENT_ID"]
 CLIENT_ID = config["WIX"]["CLIENT_ID"]
 CLIENT_SECRET = config["WIX"]["CLIENT_SECRET"]
+WIX_CODE_TTL = config.get("WIX", {}).get("CODE_TTL", 600)
+WIX_LEGACY_CODE_KEYS = config.get("WIX", {}).get("LEGACY_CODE_KEYS", True)
 
 FASTAPI_AUTH=config["FASTAPI"]["AUTH"]
 FASTAPI_BEARER_TOKEN = config["FASTAPI"]["BEARER_TOKEN"]
 FASTAPI_MIDDLEWARE_SECRECT_KEY = config["FASTAPI"]["MIDDLEWARE_SECRECT_KEY"]
 
+CLIENTS_MAX_CONNECTIONS = config.get("CLIENTS", {}).get("MAX_CONNECTIONS", 100)
+CLIENTS_MAX_KEEPALIVE = config.get("CLIENTS", {}).get("MAX_KEEPALIVE", 20)
+CLIENTS_KEEPALIVE_EXPIRY = config.get("CLIENTS", {}).get("KEEPALIVE_EXPIRY", 30)
+CLIENTS_TIMEOUT = config.get("CLIENTS", {}).get("TIMEOUT", 60)
+CLIENTS_POOL_THREADS = config.get("CLIENTS", {}).get("POOL_THREADS", 16)
+
+SEARCH_BATCH_MAX_QUERIES = config.get("SEARCH", {}).get("BATCH_MAX_QUERIES", 64)
+SEARCH_BATCH_CONCURRENCY = config.get("SEARCH", {}).get("BATCH_CONCURRENCY", 8)
+SEARCH_ALL_DEADLINE = config.get("SEARCH", {}).get("ALL_DEADLINE", 10.0)
+SEARCH_GROUP_OVERFETCH = config.get("SEARCH", {}).get("GROUP_OVERFETCH", 3)
+SEARCH_EXPAND_CONTEXT_MAX = config.get("SEARCH", {}).get("EXPAND_CONTEXT_MAX", 3)
+SEARCH_CURSOR_TTL = config.get("SEARCH", {}).get("CURSOR_TTL", 300)
+SEARCH_CURSOR_CACHE_SIZE = config.get("SEARCH", {}).get("CURSOR_CACHE_SIZE", 1000)
+SEARCH_MAX_TOP_K = config.get("SEARCH", {}).get("MAX_TOP_K", 100)
+SEARCH_MAX_FETCH = config.get("SEARCH", {}).get("MAX_FETCH", 1000)
+
+RERANK_OVERFETCH = config.get("RERANK", {}).get("OVERFETCH", 4)
+RERANK_RRF_K = config.get("RERANK", {}).get("RRF_K", 60)
+
+RESPONSE_COMPRESS_MIN_SIZE = config.get("RESPONSE", {}).get("COMPRESS_MIN_SIZE", 1024)
+RESPONSE_GZIP_LEVEL = config.get("RESPONSE", {}).get("GZIP_LEVEL", 6)
+RESPONSE_BROTLI_QUALITY = config.get("RESPONSE", {}).get("BROTLI_QUALITY", 5)
+
+METRICS_BUCKETS = config.get("METRICS", {}).get(
+    "BUCKETS", [0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0]
+)
+
+SERVER_WARM_UP = config.get("SERVER", {}).get("WARM_UP", True)
+SERVER_WORKERS = config.get("SERVER", {}).get("WORKERS", 1)
+SERVER_PRELOAD = config.get("SERVER", {}).get("PRELOAD", True)
+SERVER_GRACEFUL_TIMEOUT = config.get("SERVER", {}).get("GRACEFUL_TIMEOUT", 120)
+SERVER_RESTART_BACKOFF = config.get("SERVER", {}).get("RESTART_BACKOFF", 1.0)
+SERVER_RESTART_BACKOFF_MAX = config.get("SERVER", {}).get("RESTART_BACKOFF_MAX", 30.0)
+SERVER_MAX_FAILURES = config.get("SERVER", {}).get("MAX_FAILURES", 5)
+SERVER_FAILURE_WINDOW = config.get("SERVER", {}).get("FAILURE_WINDOW", 60)
+
+LOCAL_INDEX_DIR = config.get("LOCAL_INDEX", {}).get("DIR", "data/local_index")
+LOCAL_INDEX_NAMESPACES = config.get("LOCAL_INDEX", {}).get("NAMESPACES", [])
+LOCAL_INDEX_NPROBE = config.get("LOCAL_INDEX", {}).get("NPROBE", 8)
+
+UPLOAD_DIR = config.get("UPLOAD", {}).get("DIR", "data/uploads")
+UPLOAD_MAX_SIZE = config.get("UPLOAD", {}).get("MAX_SIZE", 104857600)
+UPLOAD_MAX_CONCURRENT = config.get("UPLOAD", {}).get("MAX_CONCURRENT", 8)
+UPLOAD_CHUNK_SIZE = config.get("UPLOAD", {}).get("CHUNK_SIZE", 1048576)
+UPLOAD_RESUMABLE_TTL = config.get("UPLOAD", {}).get("RESUMABLE_TTL", 86400)
+UPLOAD_LOCK_TIMEOUT = config.get("UPLOAD", {}).get("LOCK_TIMEOUT", 60)
+UPLOAD_TTL = config.get("UPLOAD", {}).get("TTL", 604800)
+UPLOAD_QUOTA = config.get("UPLOAD", {}).get("QUOTA", 10737418240)
+UPLOAD_SWEEP_INTERVAL = config.get("UPLOAD", {}).get("SWEEP_INTERVAL", 600)
+
+INGEST_ENABLED = config.get("INGEST", {}).get("ENABLED", True)
+INGEST_DIR = config.get("INGEST", {}).get("DIR", "data/session_index")
+INGEST_PROCESSES = config.get("INGEST", {}).get("PROCESSES", 2)
+INGEST_CHUNK_SIZE = config.get("INGEST", {}).get("CHUNK_SIZE", 1000)
+INGEST_CHUNK_OVERLAP = config.get("INGEST", {}).get("CHUNK_OVERLAP", 200)
+INGEST_EMBED_BATCH = config.get("INGEST", {}).get("EMBED_BATCH", 512)
+INGEST_EMBED_CONCURRENCY = config.get("INGEST", {}).get("EMBED_CONCURRENCY", 4)
+INGEST_JOB_TTL = config.get("INGEST", {}).get("JOB_TTL", 86400)
+INGEST_DRAIN_TIMEOUT = config.get("INGEST", {}).get("DRAIN_TIMEOUT", 30)
+
+REDIS_URL = config.get("REDIS", {}).get("URL", "redis://localhost:6379/0")
+
+EMBEDDING_CACHE_SIZE = config.get("EMBEDDING_CACHE", {}).get("SIZE", 4096)
+EMBEDDING_CACHE_TTL = config.get("EMBEDDING_CACHE", {}).get("TTL", 604800)
+METADATA_CACHE_SIZE = config.get("METADATA_CACHE", {}).get("SIZE", 20000)
+METADATA_CACHE_TTL = config.get("METADATA_CACHE", {}).get("TTL", 86400)
+METADATA_CACHE_NEGATIVE_TTL = config.get("METADATA_CACHE", {}).get("NEGATIVE_TTL", 300)
+CONTEXT_CACHE_SIZE = config.get("CONTEXT_CACHE", {}).get("SIZE", 20000)
+CONTEXT_CACHE_TTL = config.get("CONTEXT_CACHE", {}).get("TTL", 86400)
+CONTEXT_CACHE_NEGATIVE_TTL = config.get("CONTEXT_CACHE", {}).get("NEGATIVE_TTL", 300)
+DOCUMENT_CACHE_SIZE = config.get("DOCUMENT_CACHE", {}).get("SIZE", 5000)
+DOCUMENT_CACHE_TTL = config.get("DOCUMENT_CACHE", {}).get("TTL", 86400)
+DOCUMENT_CACHE_NEGATIVE_TTL = config.get("DOCUMENT_CACHE", {}).get("NEGATIVE_TTL", 300)
+DOCUMENT_CACHE_MAX_AGE = config.get("DOCUMENT_CACHE", {}).get("MAX_AGE", 3600)
+
+EMBEDDING_BATCH_WINDOW_MS = config.get("EMBEDDING_BATCH", {}).get("WINDOW_MS", 5)
+EMBEDDING_BATCH_MAX_SIZE = config.get("EMBEDDING_BATCH", {}).get("MAX_SIZE", 64)
+
 LANGSMITH_API_KEY = config["LANGSMITH"]["API_KEY"]
 LANGCHAIN_TRACING_V2 = config["LANGSMITH"]["TRACING_V2"]
 
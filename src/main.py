@@ -1,32 +1,40 @@
-from fastapi import Depends, FastAPI, HTTPException
+import asyncio
+from contextlib import asynccontextmanager
+
+from fastapi import Depends, FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from fastapi.staticfiles import StaticFiles
-from langserve import add_routes
 from starlette.middleware.sessions import SessionMiddleware
 
 from src.config.config import (
     FASTAPI_AUTH,
     FASTAPI_BEARER_TOKEN,
     FASTAPI_MIDDLEWARE_SECRECT_KEY,
+    SERVER_WARM_UP,
+    UPLOAD_SWEEP_INTERVAL,
 )
 from src.models.models import AgentInput, AgentOutput, GraphInput, SearchFlowInput
 from src.routers import (
+    documents_router,
+    health_router,
+    ingest_router,
+    metrics_router,
+    resumable_upload_router,
     search_academic_db_router,
+    search_all_router,
+    search_pages_router,
     search_patent_db_router,
     search_standard_db_router,
     upload_file_router,
     wix_oauth_router,
 )
-from src.services.lc.agents.openai_agent import openai_agent_runnable
-from src.services.lc.agents.zhipuai_agent import zhipuai_agent_runnable
-from src.services.lc.chains.openai_chain import openai_chain_runnable
-from src.services.lc.chains.zhipuai_chain import zhipuai_chain_runnable
-from src.services.lc.graphs.openai_gragh import openai_graph_runnable
-
-from src.services.lc.agents.lca.openai_flow_recommender_runnable import (
-    openai_flow_recommender_runnable,
-)
+from src.routers.runnable_routes import add_lazy_routes, warm_up
+from src.services.clients import close_clients, get_clients
+from src.services.ingestion import drain, shutdown_pool
+from src.services.metrics import MetricsMiddleware
+from src.services.timing import ServerTimingMiddleware
+from src.services.upload_store import sweeper
 
 bearer_scheme = HTTPBearer()
 
@@ -40,11 +48,37 @@ def validate_token(credentials: HTTPAuthorizationCredentials = Depends(bearer_sc
     return credentials
 
 
+async def authorize(request: Request):
+    """Check the bearer token like the app's dependency, for unbuilt routes."""
+    validate_token(await bearer_scheme(request))
+
+
+# Runnables are built on their first request, so check it before building.
+lazy_auth = authorize if FASTAPI_AUTH else None
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    app.state.clients = get_clients()
+    # Runnables are built in the background so the server answers right away.
+    warming = asyncio.create_task(warm_up()) if SERVER_WARM_UP else None
+    sweeping = asyncio.create_task(sweeper()) if UPLOAD_SWEEP_INTERVAL else None
+    yield
+    if warming is not None:
+        warming.cancel()
+    if sweeping is not None:
+        sweeping.cancel()
+    await drain()
+    shutdown_pool()
+    await close_clients()
+
+
 app = FastAPI(
     title="TianGong AI Server",
     version="1.0",
     description="TianGong AI API Server",
     dependencies=[Depends(validate_token)] if FASTAPI_AUTH else None,
+    lifespan=lifespan,
 )
 
 origins = ["*"]
@@ -54,64 +88,77 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Server-Timing"],
 )
+app.add_middleware(ServerTimingMiddleware)
+app.add_middleware(MetricsMiddleware)
 
 app.mount("/.well-known", StaticFiles(directory="static"), name="static")
 
 app.include_router(search_academic_db_router.router)
 app.include_router(search_patent_db_router.router)
 app.include_router(search_standard_db_router.router)
+app.include_router(search_all_router.router)
+app.include_router(search_pages_router.router)
+app.include_router(documents_router.router)
+app.include_router(health_router.router)
+app.include_router(ingest_router.router)
+app.include_router(metrics_router.router)
 app.include_router(upload_file_router.router)
+app.include_router(resumable_upload_router.router)
 
 
-add_routes(
+add_lazy_routes(
     app,
-    openai_chain_runnable(),
-    path="/openai_chain",
+    "/openai_chain",
+    "src.services.lc.chains.openai_chain:openai_chain_runnable",
+    authorize=lazy_auth,
     # playground_type="chat",
 )
 
-add_routes(
+add_lazy_routes(
     app,
-    zhipuai_chain_runnable(),
-    path="/zhipuai_chain",
+    "/zhipuai_chain",
+    "src.services.lc.chains.zhipuai_chain:zhipuai_chain_runnable",
+    authorize=lazy_auth,
     # playground_type="chat",
 )
 
-add_routes(
+add_lazy_routes(
     app,
-    openai_agent_runnable(),
-    path="/openai_agent",
+    "/openai_agent",
+    "src.services.lc.agents.openai_agent:openai_agent_runnable",
+    authorize=lazy_auth,
     input_type=AgentInput,
     output_type=AgentOutput,
 )
 
-add_routes(
+add_lazy_routes(
     app,
-    zhipuai_agent_runnable(),
-    path="/zhipuai_agent",
+    "/zhipuai_agent",
+    "src.services.lc.agents.zhipuai_agent:zhipuai_agent_runnable",
+    authorize=lazy_auth,
     input_type=AgentInput,
     output_type=AgentOutput,
 )
 
-add_routes(
+add_lazy_routes(
     app,
-    openai_graph_runnable(),
-    path="/openai_graph",
+    "/openai_graph",
+    "src.services.lc.graphs.openai_gragh:openai_graph_runnable",
+    authorize=lazy_auth,
     input_type=GraphInput,
 )
 
-add_routes(
+add_lazy_routes(
     app,
-    openai_flow_recommender_runnable(),
-    path="/runnable_test",
+    "/runnable_test",
+    "src.services.lc.agents.lca.openai_flow_recommender_runnable:openai_flow_recommender_runnable",
+    authorize=lazy_auth,
     input_type=AgentInput,
     output_type=AgentOutput,
 )
 
-
-add_routes
-
 oauth_app = FastAPI()
 
 oauth_app.add_middleware(SessionMiddleware, secret_key=FASTAPI_MIDDLEWARE_SECRECT_KEY)
@@ -1,8 +1,10 @@
-from typing import List, Optional
+from typing import Annotated, Dict, List, Literal, Optional
 
 from langchain_core.messages import HumanMessage
 from langchain_core.pydantic_v1 import BaseModel as LangchainBaseModel
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
+
+from src.config.config import SEARCH_MAX_TOP_K
 
 
 class AgentInput(LangchainBaseModel):
@@ -27,7 +29,35 @@ class PlainSearchRequest(BaseModel):
 
 class VectorSearchRequest(BaseModel):
     query: str
-    top_k: Optional[int] = 16
+    top_k: int = Field(16, ge=1, le=SEARCH_MAX_TOP_K)
+
+
+class VectorSearchRequestWithOptions(VectorSearchRequest):
+    raw_hits: Optional[bool] = False
+    rerank: Optional[bool] = False
+    page_size: Optional[int] = None
+    fields: Optional[List[str]] = None
+
+
+class ChunkVectorSearchRequest(VectorSearchRequestWithOptions):
+    group_by: Optional[Literal["document"]] = None
+    expand_context: Optional[int] = 0
+
+
+class BatchVectorSearchRequest(BaseModel):
+    queries: List[str]
+    top_k: int = Field(16, ge=1, le=SEARCH_MAX_TOP_K)
+
+
+class SearchAllRequest(BaseModel):
+    query: str
+    top_k: Dict[str, Annotated[int, Field(ge=0, le=SEARCH_MAX_TOP_K)]] = {
+        "academic": 16,
+        "patent": 16,
+        "standard": 16,
+        "esg": 16,
+    }
+    deadline: Optional[float] = None
 
 
 class VectorSearchRequestWithIds(VectorSearchRequest):
@@ -39,8 +69,59 @@ class SearchResultWithSource(BaseModel):
     source: str
 
 
+class SearchHit(SearchResultWithSource):
+    id: Optional[str] = None
+    title: Optional[str] = None
+    authors: Optional[List[str]] = None
+    date: Optional[str] = None
+    url: Optional[str] = None
+    score: Optional[float] = None
+
+
 class SearchResponse(BaseModel):
-    result: List[SearchResultWithSource]
+    result: List[SearchHit]
+
+
+class DocumentSearchResult(BaseModel):
+    id: Optional[str] = None
+    source: str
+    title: Optional[str] = None
+    authors: Optional[List[str]] = None
+    date: Optional[str] = None
+    url: Optional[str] = None
+    score: float
+    chunks: List[str]
+
+
+class DocumentSearchResponse(BaseModel):
+    result: List[DocumentSearchResult]
+
+
+class PagedSearchResponse(BaseModel):
+    result: List[dict]
+    next_cursor: Optional[str]
+
+
+class DocumentResponse(BaseModel):
+    namespace: str
+    id: str
+    content: str
+
+
+class BatchSearchResponse(BaseModel):
+    results: List[SearchResponse]
+
+
+class ScoredSearchResult(SearchHit):
+    namespace: str
+    score: float
+
+
+class SearchAllResponse(BaseModel):
+    results: Dict[str, List[SearchHit]]
+    fused: List[ScoredSearchResult]
+    incomplete: List[str]
+    errors: Dict[str, str] = {}
 
 
 class SubscriptionRequest(BaseModel):
@@ -52,3 +133,37 @@ class UploadFileResponse(BaseModel):
     file_path: Optional[str]
     session_id: Optional[str]
     status: str
+    size: Optional[int] = None
+    sha256: Optional[str] = None
+    ingest_id: Optional[str] = None
+
+
+class CreateUploadRequest(BaseModel):
+    session_id: str
+    size: int
+    content_type: Optional[str] = ""
+
+
+class ResumableUploadStatus(BaseModel):
+    upload_id: str
+    session_id: str
+    size: int
+    offset: int
+    received: int
+
+
+class FinalizeUploadRequest(BaseModel):
+    sha256: Optional[str] = None
+
+
+class IngestStatus(BaseModel):
+    job_id: str
+    session_id: str
+    file: str
+    status: str
+    pages: Optional[int] = None
+    chunks: Optional[int] = None
+    embedded: Optional[int] = None
+    seconds: Optional[float] = None
+    reused: Optional[bool] = None
+    error: Optional[str] = None
@@ -0,0 +1,49 @@
+from typing import Optional
+
+from fastapi import APIRouter, Header, HTTPException, Response
+
+from src.config.config import DOCUMENT_CACHE_MAX_AGE
+from src.models.models import DocumentResponse
+from src.services import documents
+
+router = APIRouter()
+
+
+@router.get(
+    "/documents/{namespace}/{id:path}",
+    response_model=DocumentResponse,
+    response_description="The full text of a chunk or document",
+)
+async def get_document(
+    namespace: str,
+    id: str,
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
+):
+    """
+    This endpoint returns the full text behind a search result, for clients that searched without `content`.
+    A chunk id returns the chunk text, and a document id returns all its chunks in order.
+
+    - **namespace**: One of academic, patent or standard
+    - **id**: The `id` of a search result
+
+    Responses carry an `ETag`; send it back as `If-None-Match` to get `304 Not Modified` when the text is unchanged.
+    """
+    if namespace not in documents.NAMESPACES:
+        raise HTTPException(status_code=404, detail=f"Unknown namespace: {namespace}")
+    try:
+        document = await documents.get_document(namespace, id)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    if document is None:
+        raise HTTPException(status_code=404, detail="Document not found")
+
+    headers = {
+        "ETag": f'"{document["etag"]}"',
+        "Cache-Control": f"public, max-age={DOCUMENT_CACHE_MAX_AGE}",
+    }
+    tags = [tag.strip().removeprefix("W/") for tag in (if_none_match or "").split(",")]
+    if "*" in tags or headers["ETag"] in tags:
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return DocumentResponse(namespace=namespace, id=id, content=document["content"])
@@ -0,0 +1,72 @@
+import gzip
+from typing import List, Optional, Union
+
+import orjson
+from fastapi import Response
+from pydantic import BaseModel
+
+from src.config.config import (
+    RESPONSE_BROTLI_QUALITY,
+    RESPONSE_COMPRESS_MIN_SIZE,
+    RESPONSE_GZIP_LEVEL,
+)
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+JSON = "application/json"
+MSGPACK = "application/msgpack"
+
+
+def _tokens(header: Optional[str]) -> List[str]:
+    """Return the values a comma-separated header accepts, without q=0 ones."""
+    tokens = []
+    for part in (header or "").split(","):
+        value, *params = (item.strip() for item in part.split(";"))
+        if value and not any(
+            param.replace(" ", "") in ("q=0", "q=0.0") for param in params
+        ):
+            tokens.append(value.lower())
+    return tokens
+
+
+def encoded_response(
+    content: Union[BaseModel, dict],
+    accept: Optional[str] = None,
+    accept_encoding: Optional[str] = None,
+) -> Response:
+    """Serialize a response body in the format and encoding the client accepts.
+
+    Bodies are orjson, or MessagePack for `Accept: application/msgpack` when
+    the `encodings` extra is installed, and leave out model fields that were
+    never set. Bodies of at least RESPONSE.COMPRESS_MIN_SIZE bytes are
+    compressed with brotli, with the extra and if accepted, or gzip.
+    """
+    if isinstance(content, BaseModel):
+        content = content.model_dump(exclude_unset=True)
+
+    if msgpack is not None and MSGPACK in _tokens(accept):
+        body = msgpack.packb(content, use_bin_type=True)
+        media_type = MSGPACK
+    else:
+        body = orjson.dumps(content)
+        media_type = JSON
+
+    headers = {"Vary": "Accept, Accept-Encoding"}
+    if len(body) >= RESPONSE_COMPRESS_MIN_SIZE:
+        encodings = _tokens(accept_encoding)
+        if brotli is not None and "br" in encodings:
+            body = brotli.compress(body, quality=RESPONSE_BROTLI_QUALITY)
+            headers["Content-Encoding"] = "br"
+        elif "gzip" in encodings:
+            body = gzip.compress(body, compresslevel=RESPONSE_GZIP_LEVEL)
+            headers["Content-Encoding"] = "gzip"
+
+    return Response(body, media_type=media_type, headers=headers)
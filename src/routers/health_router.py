@@ -0,0 +1,19 @@
+import os
+
+from fastapi import APIRouter
+
+from src.routers import runnable_routes
+
+router = APIRouter()
+
+
+@router.get("/health", include_in_schema=False)
+async def get_health():
+    """
+    This endpoint reports that the server is up, which worker process answered, and how many runnables it has built so far.
+    """
+    return {
+        "status": "ok",
+        "worker": os.getpid(),
+        "runnables": runnable_routes.status(),
+    }
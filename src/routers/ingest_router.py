@@ -0,0 +1,24 @@
+from fastapi import APIRouter, HTTPException
+
+from src.models.models import IngestStatus
+from src.services import ingestion
+
+router = APIRouter()
+
+
+@router.get(
+    "/ingest/{job_id}",
+    response_model=IngestStatus,
+    description="Get the progress of a document ingestion job.",
+)
+async def get_ingest_status(job_id: str):
+    """
+    This endpoint returns the progress of ingesting an uploaded file into its session's document store.
+    """
+    try:
+        job = await ingestion.get_job(job_id)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    if job is None:
+        raise HTTPException(status_code=404, detail="Ingestion job not found")
+    return IngestStatus(**job)
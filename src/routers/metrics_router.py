@@ -0,0 +1,13 @@
+from fastapi import APIRouter, Response
+
+from src.services import metrics
+
+router = APIRouter()
+
+
+@router.get("/metrics", response_class=Response, include_in_schema=False)
+async def get_metrics():
+    """
+    This endpoint returns request, stage, upstream and cache metrics in the Prometheus text format.
+    """
+    return Response(metrics.render(), media_type=metrics.CONTENT_TYPE)
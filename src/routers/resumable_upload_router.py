@@ -0,0 +1,140 @@
+from fastapi import APIRouter, Header, HTTPException, Request, Response
+
+from src.models.models import (
+    CreateUploadRequest,
+    FinalizeUploadRequest,
+    ResumableUploadStatus,
+    UploadFileResponse,
+)
+from src.routers.upload_file_router import queue_ingestion
+from src.services.standalone import resumable_upload
+from src.services.standalone.resumable_upload import UploadConflict, UploadNotFound
+from src.services.standalone.upload_file import TooManyUploads, UploadTooLarge
+
+router = APIRouter()
+
+# Chunks are raw bytes rather than a form, so the body is described here for the docs.
+CHUNK_BODY = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "application/offset+octet-stream": {
+                "schema": {"type": "string", "format": "binary"}
+            }
+        },
+    }
+}
+
+
+def upload_error(e: Exception) -> HTTPException:
+    if isinstance(e, UploadNotFound):
+        return HTTPException(status_code=404, detail=str(e))
+    if isinstance(e, UploadConflict):
+        return HTTPException(status_code=409, detail=str(e))
+    if isinstance(e, UploadTooLarge):
+        return HTTPException(status_code=413, detail=str(e))
+    if isinstance(e, TooManyUploads):
+        return HTTPException(
+            status_code=503, detail=str(e), headers={"Retry-After": "1"}
+        )
+    if isinstance(e, ValueError):
+        return HTTPException(status_code=422, detail=str(e))
+    return HTTPException(status_code=500, detail=str(e))
+
+
+def status_response(state: dict, response: Response) -> ResumableUploadStatus:
+    response.headers["Upload-Offset"] = str(state["offset"])
+    return ResumableUploadStatus(**state)
+
+
+@router.post(
+    "/uploads",
+    response_model=ResumableUploadStatus,
+    status_code=201,
+    description="Start a resumable upload.",
+)
+async def create_upload(upload: CreateUploadRequest, response: Response):
+    """
+    Start a resumable upload of `size` bytes. Send the content with PATCH /uploads/{upload_id}, then finalize it.
+    """
+    try:
+        state = await resumable_upload.create_upload(
+            upload.session_id, upload.size, upload.content_type
+        )
+    except Exception as e:
+        raise upload_error(e)
+    response.headers["Location"] = f"/uploads/{state['upload_id']}"
+    return status_response(state, response)
+
+
+@router.get(
+    "/uploads/{upload_id}",
+    response_model=ResumableUploadStatus,
+    description="Get the offset to resume an upload from.",
+)
+async def get_upload(upload_id: str, response: Response):
+    """
+    Return how much of an upload has been received. `offset` is where the client should resume.
+    """
+    try:
+        state = await resumable_upload.get_upload(upload_id)
+    except Exception as e:
+        raise upload_error(e)
+    return status_response(state, response)
+
+
+@router.patch(
+    "/uploads/{upload_id}",
+    response_model=ResumableUploadStatus,
+    description="Write a chunk of a resumable upload.",
+    openapi_extra=CHUNK_BODY,
+)
+async def write_chunk(
+    upload_id: str,
+    request: Request,
+    response: Response,
+    upload_offset: int = Header(...),
+):
+    """
+    Write the request body at the byte offset given by the `Upload-Offset` header. Chunks can be sent in any order,
+    one at a time; a chunk sent while another request holds the upload gets 409.
+    """
+    try:
+        state = await resumable_upload.write_chunk(
+            upload_id, upload_offset, request.stream()
+        )
+    except Exception as e:
+        raise upload_error(e)
+    return status_response(state, response)
+
+
+@router.post(
+    "/uploads/{upload_id}/finalize",
+    response_model=UploadFileResponse,
+    description="Finish a resumable upload.",
+)
+async def finalize_upload(
+    upload_id: str,
+    finalize: FinalizeUploadRequest = FinalizeUploadRequest(),
+):
+    """
+    Store a completely received upload like /upload_file does, checking its SHA-256 when one is given.
+    """
+    try:
+        response = await resumable_upload.finalize_upload(upload_id, finalize.sha256)
+        await queue_ingestion(response)
+    except Exception as e:
+        raise upload_error(e)
+    return UploadFileResponse(**response)
+
+
+@router.delete(
+    "/uploads/{upload_id}",
+    status_code=204,
+    description="Abort a resumable upload.",
+)
+async def delete_upload(upload_id: str):
+    try:
+        await resumable_upload.delete_upload(upload_id)
+    except Exception as e:
+        raise upload_error(e)
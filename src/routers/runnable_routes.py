@@ -0,0 +1,143 @@
+import asyncio
+import importlib
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.exception_handlers import http_exception_handler
+from starlette.routing import BaseRoute, Match, NoMatchFound
+
+logger = logging.getLogger(__name__)
+
+_routes: List["LazyRunnableRoutes"] = []
+
+
+def _route_path(scope) -> str:
+    root_path = scope.get("root_path", "")
+    path = scope["path"]
+    return path[len(root_path) :] if path.startswith(root_path) else path
+
+
+class LazyRunnableRoutes(BaseRoute):
+    """Placeholder for the LangServe routes of a runnable that is not built yet.
+
+    It matches every request under `path`. The first one, or the warm-up task
+    started with the app, imports the runnable's module, builds the runnable
+    and replaces the placeholder with the routes from `add_routes`. Requests
+    are checked with `authorize` first, since the app's dependencies only run
+    on the built routes, so an unauthorized request cannot start a build.
+    """
+
+    def __init__(
+        self,
+        app: FastAPI,
+        path: str,
+        factory: str,
+        authorize: Optional[Callable[[Request], Awaitable[Any]]] = None,
+        **kwargs: Any,
+    ):
+        self.app = app
+        self.path = path
+        self.factory = factory
+        self.authorize = authorize
+        self.kwargs = kwargs
+        self.ready = False
+        self.seconds = None
+        self._lock = asyncio.Lock()
+
+    def matches(self, scope):
+        if scope["type"] in ("http", "websocket"):
+            path = _route_path(scope)
+            if path == self.path or path.startswith(self.path + "/"):
+                return Match.FULL, {}
+        return Match.NONE, {}
+
+    def url_path_for(self, name: str, /, **path_params: Any):
+        raise NoMatchFound(name, path_params)
+
+    async def handle(self, scope, receive, send):
+        if self.authorize is not None and scope["type"] == "http":
+            request = Request(scope, receive)
+            try:
+                await self.authorize(request)
+            except HTTPException as e:
+                response = await http_exception_handler(request, e)
+                await response(scope, receive, send)
+                return
+        await self.build()
+        await self.app.router(scope, receive, send)
+
+    def _load(self):
+        from langserve import add_routes
+
+        from src.services.lc.callbacks import register_stage_timing
+
+        register_stage_timing()
+        module, name = self.factory.split(":")
+        runnable = getattr(importlib.import_module(module), name)()
+        return add_routes, runnable
+
+    async def build(self):
+        async with self._lock:
+            if self.ready:
+                return
+            started = time.perf_counter()
+            # Imports run in a thread so the loop keeps serving other routes.
+            add_routes, runnable = await asyncio.get_running_loop().run_in_executor(
+                None, self._load
+            )
+            self.app.router.routes.remove(self)
+            add_routes(self.app, runnable, path=self.path, **self.kwargs)
+            self.app.openapi_schema = None
+            self.ready = True
+            self.seconds = time.perf_counter() - started
+            logger.info("Built %s in %.2f s", self.path, self.seconds)
+
+
+def add_lazy_routes(
+    app: FastAPI,
+    path: str,
+    factory: str,
+    authorize: Optional[Callable[[Request], Awaitable[Any]]] = None,
+    **kwargs: Any,
+):
+    """Register the LangServe routes of `factory`, a "module:function" string.
+
+    `authorize` is awaited with each request that reaches the routes before
+    they are built, raising HTTPException to reject it. The other keyword
+    arguments are passed to `add_routes` once the runnable is built.
+    """
+    route = LazyRunnableRoutes(app, path, factory, authorize, **kwargs)
+    app.router.routes.append(route)
+    _routes.append(route)
+
+
+def preload():
+    """Import the modules of every registered runnable without building it.
+
+    Called before forking workers, so they share the imported code.
+    """
+    import langserve  # noqa: F401
+
+    for route in _routes:
+        importlib.import_module(route.factory.split(":")[0])
+
+
+async def warm_up():
+    """Build every registered runnable in turn, logging the ones that fail."""
+    for route in list(_routes):
+        try:
+            await route.build()
+        except Exception:
+            logger.exception("Failed to build %s", route.path)
+
+
+def status() -> Dict[str, Any]:
+    return {
+        "ready": sum(route.ready for route in _routes),
+        "total": len(_routes),
+        "build_seconds": {
+            route.path: round(route.seconds, 3) for route in _routes if route.ready
+        },
+    }
@@ -0,0 +1,55 @@
+from typing import Optional
+
+from fastapi import APIRouter, Header, HTTPException
+
+from src.config.config import SEARCH_ALL_DEADLINE
+from src.models.models import SearchAllRequest, SearchAllResponse
+from src.routers.encoding import encoded_response
+from src.services.standalone import search_all
+
+router = APIRouter()
+
+
+@router.post(
+    "/search_all",
+    response_model=SearchAllResponse,
+    response_description="Documents matching the query, per namespace and fused",
+)
+async def search_vectors(
+    request: SearchAllRequest,
+    accept: Optional[str] = Header(None),
+    accept_encoding: Optional[str] = Header(None),
+):
+    """
+    This endpoint performs one semantic search across the academic, patent, standard and ESG vector databases.
+    The query is embedded once and every namespace is searched concurrently.
+
+    - **query**: The search query string
+    - **top_k**: The number of documents to return per namespace (default 16 for each of academic, patent, standard and esg); only the listed namespaces are searched
+    - **deadline**: Seconds to wait before returning whatever has finished (default 10); unfinished or failed namespaces are listed in `incomplete`, with the reason in `errors`
+
+    Send `Accept: application/msgpack` for a MessagePack body, and `Accept-Encoding: gzip` or `br` to compress large responses.
+    """
+    unknown = set(request.top_k) - set(search_all.SOURCES)
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown namespaces: {', '.join(sorted(unknown))}",
+        )
+    if not any(request.top_k.values()):
+        raise HTTPException(
+            status_code=400,
+            detail="top_k must ask at least one namespace for documents",
+        )
+    try:
+        result = await search_all.search(
+            request.query,
+            request.top_k,
+            request.deadline or SEARCH_ALL_DEADLINE,
+        )
+        content = SearchAllResponse(**result)
+    except TimeoutError:
+        raise HTTPException(status_code=504, detail="Search deadline exceeded")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    return encoded_response(content, accept, accept_encoding)
@@ -0,0 +1,38 @@
+from typing import Optional
+
+from fastapi import APIRouter, Header, HTTPException
+
+from src.models.models import PagedSearchResponse
+from src.routers.encoding import encoded_response
+from src.services import pagination
+
+router = APIRouter()
+
+
+@router.get(
+    "/search_pages/{cursor}",
+    response_model=PagedSearchResponse,
+    response_description="The next page of a paginated search",
+)
+async def search_page(
+    cursor: str,
+    accept: Optional[str] = Header(None),
+    accept_encoding: Optional[str] = Header(None),
+):
+    """
+    This endpoint returns a further page of search results, using the `next_cursor` of the previous page.
+    Pages are served from the results kept by the first request, without searching again.
+
+    - **cursor**: The `next_cursor` value of the previous page
+
+    Send `Accept: application/msgpack` for a MessagePack body, and `Accept-Encoding: gzip` or `br` to compress large responses.
+    """
+    try:
+        page = await pagination.next_page(cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    if page is None:
+        raise HTTPException(status_code=404, detail="Cursor expired")
+    return encoded_response(PagedSearchResponse(**page), accept, accept_encoding)
@@ -1,6 +1,18 @@
-from fastapi import APIRouter, HTTPException
+from typing import Optional, Union
 
-from src.models.models import SearchResponse, VectorSearchRequest
+from fastapi import APIRouter, Header, HTTPException
+
+from src.config.config import SEARCH_BATCH_MAX_QUERIES
+from src.models.models import (
+    BatchSearchResponse,
+    BatchVectorSearchRequest,
+    PagedSearchResponse,
+    SearchResponse,
+    VectorSearchRequestWithOptions,
+)
+from src.routers.encoding import encoded_response
+from src.routers.streaming import stream_media_type, stream_response
+from src.services import pagination
 from src.services.standalone import search_patent_db
 
 router = APIRouter()
@@ -8,19 +20,83 @@ router = APIRouter()
 
 @router.post(
     "/search_patent_db",
-    response_model=SearchResponse,
+    response_model=Union[PagedSearchResponse, SearchResponse],
     response_description="List of patents matching the query",
 )
-async def search_vectors(request: VectorSearchRequest):
+async def search_vectors(
+    request: VectorSearchRequestWithOptions,
+    accept: Optional[str] = Header(None),
+    accept_encoding: Optional[str] = Header(None),
+):
     """
     This endpoint allows you to perform a semantic search in a patent vector database.
     It takes a query string as input and returns a list of documents that match the query.
 
     - **query**: The search query string
     - **top_k**: The number of documents to return (default 16)
+    - **raw_hits**: When streaming, send the vector hits with empty sources before the enriched results (default false)
+    - **rerank**: Re-rank a larger candidate set with BM25 keyword scores before returning the top results (default false)
+    - **page_size**: Return the results in pages of this size; `top_k` sets how many results are kept across all pages, and `next_cursor` fetches the next page from `/search_pages/{cursor}` (default none)
+    - **fields**: The keys to keep in each result, from `id`, `content`, `source`, `title`, `date`, `url` and `score`; leave out `content` and load it later from `/documents/{namespace}/{id}` (default all)
+
+    Send `Accept: application/x-ndjson` or `Accept: text/event-stream` to receive each result as soon as it is ready. Paginated or projected results are always returned in one response.
+    Send `Accept: application/msgpack` for a MessagePack body, and `Accept-Encoding: gzip` or `br` to compress large responses.
+    """
+    if request.page_size is not None and request.page_size < 1:
+        raise HTTPException(status_code=400, detail="page_size must be positive")
+    media_type = stream_media_type(accept)
+    if media_type and not (request.page_size or request.fields):
+        return stream_response(
+            search_patent_db.search_stream(
+                request.query, request.top_k, request.raw_hits, request.rerank
+            ),
+            media_type,
+        )
+    try:
+        result = await search_patent_db.search(
+            request.query, request.top_k, request.rerank, request.fields
+        )
+        if request.page_size:
+            page = await pagination.first_page(result, request.page_size)
+            content = PagedSearchResponse(**page)
+        elif request.fields:
+            content = {"result": result}
+        else:
+            content = SearchResponse(result=result)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    return encoded_response(content, accept, accept_encoding)
+
+
+@router.post(
+    "/search_patent_db/batch",
+    response_model=BatchSearchResponse,
+    response_description="Lists of patents matching each query, in input order",
+)
+async def search_vectors_batch(
+    request: BatchVectorSearchRequest,
+    accept: Optional[str] = Header(None),
+    accept_encoding: Optional[str] = Header(None),
+):
+    """
+    This endpoint runs several semantic searches in a patent vector database with one request.
+    The queries are embedded together and results are returned per query, in input order.
+
+    - **queries**: The search query strings (at most 64 by default)
+    - **top_k**: The number of patents to return per query (default 16)
+
+    Send `Accept: application/msgpack` for a MessagePack body, and `Accept-Encoding: gzip` or `br` to compress large responses.
     """
+    if len(request.queries) > SEARCH_BATCH_MAX_QUERIES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {SEARCH_BATCH_MAX_QUERIES} queries are allowed per batch",
+        )
     try:
-        result = await search_patent_db.search(request.query, request.top_k)
-        return SearchResponse(result=result)
+        results = await search_patent_db.search_batch(request.queries, request.top_k)
+        content = BatchSearchResponse(
+            results=[SearchResponse(result=result) for result in results]
+        )
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+    return encoded_response(content, accept, accept_encoding)
@@ -1,6 +1,19 @@
-from fastapi import APIRouter, HTTPException
+from typing import Optional, Union
 
-from src.models.models import SearchResponse, VectorSearchRequest
+from fastapi import APIRouter, Header, HTTPException
+
+from src.config.config import SEARCH_BATCH_MAX_QUERIES, SEARCH_EXPAND_CONTEXT_MAX
+from src.models.models import (
+    BatchSearchResponse,
+    BatchVectorSearchRequest,
+    ChunkVectorSearchRequest,
+    DocumentSearchResponse,
+    PagedSearchResponse,
+    SearchResponse,
+)
+from src.routers.encoding import encoded_response
+from src.routers.streaming import stream_media_type, stream_response
+from src.services import pagination
 from src.services.standalone import search_standard_db
 
 router = APIRouter()
@@ -8,19 +21,102 @@ router = APIRouter()
 
 @router.post(
     "/search_standard_db",
-    response_model=SearchResponse,
+    response_model=Union[PagedSearchResponse, SearchResponse, DocumentSearchResponse],
     response_description="List of documents matching the query",
 )
-async def search_vectors(request: VectorSearchRequest):
+async def search_vectors(
+    request: ChunkVectorSearchRequest,
+    accept: Optional[str] = Header(None),
+    accept_encoding: Optional[str] = Header(None),
+):
     """
     This endpoint allows you to perform a semantic search in a standards vector database.
     It takes a query string as input and returns a list of documents that match the query.
 
     - **query**: The search query string
     - **top_k**: The number of documents to return (default 16)
+    - **raw_hits**: When streaming, send the vector hits with empty sources before the enriched results (default false)
+    - **rerank**: Re-rank a larger candidate set with BM25 keyword scores before returning the top results (default false)
+    - **page_size**: Return the results in pages of this size; `top_k` sets how many results are kept across all pages, and `next_cursor` fetches the next page from `/search_pages/{cursor}` (default none)
+    - **fields**: The keys to keep in each result, from `id`, `content`, `source`, `title`, `authors`, `date`, `url` and `score`, plus `chunks` when grouped; leave out `content` and load it later from `/documents/{namespace}/{id}` (default all)
+    - **group_by**: Set to `document` to merge chunks of the same document into one result with its best score and chunk texts (default none)
+    - **expand_context**: The number of neighboring chunks to add on each side of every hit, at most 3 by default (default 0)
+
+    Send `Accept: application/x-ndjson` or `Accept: text/event-stream` to receive each result as soon as it is ready. Grouped, expanded, paginated or projected results are always returned in one response.
+    Send `Accept: application/msgpack` for a MessagePack body, and `Accept-Encoding: gzip` or `br` to compress large responses.
+    """
+    if not 0 <= (request.expand_context or 0) <= SEARCH_EXPAND_CONTEXT_MAX:
+        raise HTTPException(
+            status_code=400,
+            detail=f"expand_context must be between 0 and {SEARCH_EXPAND_CONTEXT_MAX}",
+        )
+    if request.page_size is not None and request.page_size < 1:
+        raise HTTPException(status_code=400, detail="page_size must be positive")
+    media_type = stream_media_type(accept)
+    if media_type and not (
+        request.group_by
+        or request.expand_context
+        or request.page_size
+        or request.fields
+    ):
+        return stream_response(
+            search_standard_db.search_stream(
+                request.query, request.top_k, request.raw_hits, request.rerank
+            ),
+            media_type,
+        )
+    try:
+        result = await search_standard_db.search(
+            request.query,
+            request.top_k,
+            request.rerank,
+            request.group_by,
+            request.expand_context,
+            request.fields,
+        )
+        if request.page_size:
+            page = await pagination.first_page(result, request.page_size)
+            content = PagedSearchResponse(**page)
+        elif request.fields:
+            content = {"result": result}
+        elif request.group_by:
+            content = DocumentSearchResponse(result=result)
+        else:
+            content = SearchResponse(result=result)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    return encoded_response(content, accept, accept_encoding)
+
+
+@router.post(
+    "/search_standard_db/batch",
+    response_model=BatchSearchResponse,
+    response_description="Lists of documents matching each query, in input order",
+)
+async def search_vectors_batch(
+    request: BatchVectorSearchRequest,
+    accept: Optional[str] = Header(None),
+    accept_encoding: Optional[str] = Header(None),
+):
+    """
+    This endpoint runs several semantic searches in a standards vector database with one request.
+    The queries are embedded together and results are returned per query, in input order.
+
+    - **queries**: The search query strings (at most 64 by default)
+    - **top_k**: The number of documents to return per query (default 16)
+
+    Send `Accept: application/msgpack` for a MessagePack body, and `Accept-Encoding: gzip` or `br` to compress large responses.
     """
+    if len(request.queries) > SEARCH_BATCH_MAX_QUERIES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {SEARCH_BATCH_MAX_QUERIES} queries are allowed per batch",
+        )
     try:
-        result = await search_standard_db.search(request.query, request.top_k)
-        return SearchResponse(result=result)
+        results = await search_standard_db.search_batch(request.queries, request.top_k)
+        content = BatchSearchResponse(
+            results=[SearchResponse(result=result) for result in results]
+        )
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+    return encoded_response(content, accept, accept_encoding)
@@ -0,0 +1,44 @@
+import json
+from typing import AsyncIterator, Optional
+
+from fastapi.responses import StreamingResponse
+
+NDJSON = "application/x-ndjson"
+SSE = "text/event-stream"
+
+
+def stream_media_type(accept: Optional[str]) -> Optional[str]:
+    """Return the streaming media type the client asked for, if any."""
+    if not accept:
+        return None
+    for media_type in (NDJSON, SSE):
+        if media_type in accept:
+            return media_type
+    return None
+
+
+async def _encode(events: AsyncIterator[dict], media_type: str):
+    try:
+        async for event in events:
+            yield _line(event, media_type)
+    except Exception as e:
+        yield _line({"event": "error", "detail": str(e)}, media_type)
+        return
+    yield _line({"event": "done"}, media_type)
+
+
+def _line(event: dict, media_type: str) -> str:
+    if media_type == SSE:
+        data = {key: value for key, value in event.items() if key != "event"}
+        data = json.dumps(data, ensure_ascii=False)
+        return f"event: {event['event']}\ndata: {data}\n\n"
+    return json.dumps(event, ensure_ascii=False) + "\n"
+
+
+def stream_response(events: AsyncIterator[dict], media_type: str) -> StreamingResponse:
+    """Send search events one per line as NDJSON, or as server-sent events."""
+    return StreamingResponse(
+        _encode(events, media_type),
+        media_type=media_type,
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
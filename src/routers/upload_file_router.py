@@ -1,22 +1,77 @@
-from fastapi import APIRouter, File, Form, HTTPException, UploadFile
+from fastapi import APIRouter, HTTPException, Request
 
+from src.config.config import INGEST_ENABLED
 from src.models.models import UploadFileResponse
-from src.services.standalone.upload_file import handle_file_upload
+from src.services import ingestion
+from src.services.standalone.upload_file import (
+    TooManyUploads,
+    UploadTooLarge,
+    handle_file_upload,
+)
 
 router = APIRouter()
 
+# The body is parsed as it streams in, so the form is described here for the docs.
+UPLOAD_FORM = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "multipart/form-data": {
+                "schema": {
+                    "type": "object",
+                    "required": ["file", "session_id"],
+                    "properties": {
+                        "file": {"type": "string", "format": "binary"},
+                        "session_id": {"type": "string"},
+                    },
+                }
+            }
+        },
+    }
+}
+
+
+async def queue_ingestion(response: dict):
+    """Start ingesting a stored upload in the background, if its file type is supported."""
+    if INGEST_ENABLED and ingestion.supported(response["file_path"]):
+        response["ingest_id"] = await ingestion.create_job(
+            response["session_id"], response["file_path"]
+        )
+        ingestion.start(
+            response["ingest_id"],
+            response["session_id"],
+            response["file_path"],
+            response["sha256"],
+        )
+
 
 @router.post(
     "/upload_file",
     response_model=UploadFileResponse,
     description="Upload a file to the server.",
+    openapi_extra=UPLOAD_FORM,
 )
-async def upload_file(file: UploadFile = File(...), session_id: str = Form(...)):
+async def upload_file(request: Request):
     """
-    Upload a file to the server.
+    Upload a file to the server. The file is streamed to disk in chunks and its SHA-256 is returned with it.
+    PDF, DOCX and text files are then ingested into the session's document store; poll /ingest/{ingest_id} for progress.
     """
+    content_length = request.headers.get("content-length")
     try:
-        response = await handle_file_upload(file=file, session_id=session_id)
+        response = await handle_file_upload(
+            request.stream(),
+            request.headers.get("content-type", ""),
+            int(content_length) if content_length else None,
+        )
+        await queue_ingestion(response)
         return UploadFileResponse(**response)
+    except UploadTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except TooManyUploads as e:
+        raise HTTPException(
+            status_code=503, detail=str(e), headers={"Retry-After": "1"}
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
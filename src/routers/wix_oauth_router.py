@@ -1,12 +1,18 @@
 import uuid
 
-import redis
 from fastapi import APIRouter, Depends, Form, HTTPException, Query, Request, status
 from fastapi.responses import JSONResponse
 from fastapi.templating import Jinja2Templates
 
-from src.config.config import CLIENT_ID, CLIENT_SECRET, FASTAPI_BEARER_TOKEN
+from src.config.config import (
+    CLIENT_ID,
+    CLIENT_SECRET,
+    FASTAPI_BEARER_TOKEN,
+    WIX_CODE_TTL,
+    WIX_LEGACY_CODE_KEYS,
+)
 from src.models.models import SubscriptionRequest
+from src.services.clients import get_clients
 from src.services.wix.wix_oauth import (
     get_member_access_token,
     wix_get_callback_url,
@@ -17,7 +23,9 @@ router = APIRouter()
 
 templates = Jinja2Templates(directory="templates")
 
-r = redis.Redis(host="localhost", port=6379, db=0)
+
+def code_key(code: str) -> str:
+    return f"oauth_code:{code}"
 
 
 def get_oauth_params(
@@ -107,7 +115,8 @@ async def subscription(
 
     subscription, expires_in = await wix_get_subscription(member_access_token)
 
-    r.set(openai_code, expires_in)
+    # Codes live in the shared Redis so any worker can redeem them.
+    await get_clients().redis.set(code_key(openai_code), expires_in, ex=WIX_CODE_TTL)
 
     if subscription == "Pro":
         return JSONResponse(content={"message": "You are an Pro member.", "url": url})
@@ -127,11 +136,17 @@ async def authorization(
     client_secret: str = Form(...),
     code: str = Form(...),
 ):
-    expires_in = int(r.get(code))
+    keys = [code_key(code)]
+    if WIX_LEGACY_CODE_KEYS:
+        # Codes issued before the `oauth_code:` prefix are stored under the bare
+        # code without an expiry. They are redeemed until LEGACY_CODE_KEYS is off.
+        keys.append(code)
+    values = await get_clients().redis.mget(keys)
+    expires_in = next((value for value in values if value is not None), None)
     if client_id != CLIENT_ID or client_secret != CLIENT_SECRET or expires_in is None:
         raise HTTPException(status_code=401, detail="Invalid or missing token")
     return {
         "access_token": FASTAPI_BEARER_TOKEN,
         "token_type": "bearer",
-        "expires_in": expires_in,
+        "expires_in": int(expires_in),
     }
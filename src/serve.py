@@ -0,0 +1,225 @@
+"""Serve the app from several worker processes sharing one listening socket.
+
+    python -m src.serve --host 0.0.0.0 --port 7778 --workers 4
+
+The app, and with `[SERVER] PRELOAD` the LangChain modules behind its
+runnables, are imported once in this process and forked into the workers.
+Each worker then opens its own clients and builds its runnables in its
+lifespan, so no sockets or threads are shared across processes. Caches and
+OAuth codes that must be seen by every worker live in Redis.
+
+Signals:
+    SIGHUP           start fresh workers, then drain the old ones
+    SIGTERM, SIGINT  drain every worker and exit
+
+A draining worker stops accepting connections and lets in-flight requests,
+such as agent streams, finish for up to `[SERVER] GRACEFUL_TIMEOUT` seconds.
+
+A worker that exits on its own is restarted after a delay starting at
+`[SERVER] RESTART_BACKOFF` seconds and doubling with each failure of its
+slot, up to `RESTART_BACKOFF_MAX`. Once a slot fails `MAX_FAILURES` times
+within `FAILURE_WINDOW` seconds, such as when the app cannot start, every
+worker is drained and the master exits with status 1.
+Code changes need a full restart, since workers are forked from the code
+imported here.
+"""
+
+import argparse
+import logging
+import os
+import signal
+import socket
+import sys
+import time
+from typing import Dict, List
+
+import uvicorn
+
+from src.config.config import (
+    SERVER_FAILURE_WINDOW,
+    SERVER_GRACEFUL_TIMEOUT,
+    SERVER_MAX_FAILURES,
+    SERVER_PRELOAD,
+    SERVER_RESTART_BACKOFF,
+    SERVER_RESTART_BACKOFF_MAX,
+    SERVER_WORKERS,
+)
+
+logger = logging.getLogger("uvicorn.error")
+
+
+def let_streams_finish():
+    """Stop sse_starlette from ending event streams as soon as uvicorn exits.
+
+    It patches uvicorn's exit handler to close every stream, which would cut
+    off agent streams on a draining worker. Streams still running after the
+    graceful timeout are cancelled by uvicorn instead.
+    """
+    from sse_starlette.sse import unpatch_uvicorn_signal_handler
+
+    unpatch_uvicorn_signal_handler()
+
+
+class Master:
+    """Fork `workers` uvicorn servers and keep that many running."""
+
+    def __init__(self, config: uvicorn.Config, workers: int):
+        self.config = config
+        self.workers = workers
+        self.sock: socket.socket = None
+        # Running workers, with the slot each one fills.
+        self.running: Dict[int, int] = {}
+        # Workers told to drain, with the time they get killed at.
+        self.draining: Dict[int, float] = {}
+        # Recent failure times of each slot, and when it may restart.
+        self.failures: List[List[float]] = [[] for _ in range(workers)]
+        self.restart_at: List[float] = [0.0] * workers
+        self.reload = False
+        self.stop = False
+        self.code = 0
+
+    def spawn(self, slot: int):
+        pid = os.fork()
+        if pid == 0:
+            for signum in (signal.SIGHUP, signal.SIGTERM, signal.SIGINT):
+                signal.signal(signum, signal.SIG_DFL)
+            code = 1
+            try:
+                server = uvicorn.Server(self.config)
+                server.run(sockets=[self.sock])
+                # uvicorn returns normally when the app fails to start.
+                code = 0 if server.started else 1
+            except SystemExit as e:
+                code = e.code if isinstance(e.code, int) else 1
+            except BaseException:
+                logger.exception("Worker %s failed", os.getpid())
+            finally:
+                os._exit(code)
+        self.running[pid] = slot
+        logger.info("Started worker %s", pid)
+
+    def drain(self, pids):
+        deadline = time.monotonic() + SERVER_GRACEFUL_TIMEOUT + 5
+        for pid in pids:
+            self.running.pop(pid, None)
+            self.draining[pid] = deadline
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    def reap(self):
+        while True:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if pid == 0:
+                return
+            slot = self.running.pop(pid, None)
+            if slot is not None:
+                logger.warning(
+                    "Worker %s exited with code %s",
+                    pid,
+                    os.waitstatus_to_exitcode(status),
+                )
+                self.failed(slot)
+            self.draining.pop(pid, None)
+
+        now = time.monotonic()
+        for pid, deadline in list(self.draining.items()):
+            if now > deadline:
+                logger.error("Killing worker %s, graceful timeout exceeded", pid)
+                try:
+                    os.kill(pid, signal.SIGKILL)
+                except ProcessLookupError:
+                    pass
+                self.draining[pid] = float("inf")
+
+    def failed(self, slot: int):
+        """Back off before restarting a slot, or stop once it keeps failing."""
+        now = time.monotonic()
+        failures = [t for t in self.failures[slot] if now - t < SERVER_FAILURE_WINDOW]
+        failures.append(now)
+        self.failures[slot] = failures
+        if len(failures) >= SERVER_MAX_FAILURES:
+            logger.error(
+                "Worker slot %s failed %s times within %s seconds, giving up",
+                slot,
+                len(failures),
+                SERVER_FAILURE_WINDOW,
+            )
+            self.stop = True
+            self.code = 1
+            return
+        delay = min(
+            SERVER_RESTART_BACKOFF * 2 ** (len(failures) - 1),
+            SERVER_RESTART_BACKOFF_MAX,
+        )
+        self.restart_at[slot] = now + delay
+        logger.info("Restarting worker slot %s in %.1f seconds", slot, delay)
+
+    def _on_signal(self, signum, frame):
+        if signum == signal.SIGHUP:
+            self.reload = True
+        else:
+            self.stop = True
+
+    def run(self) -> int:
+        """Serve until told to stop, returning the exit status."""
+        self.sock = self.config.bind_socket()
+        for signum in (signal.SIGHUP, signal.SIGTERM, signal.SIGINT):
+            signal.signal(signum, self._on_signal)
+
+        while not self.stop:
+            if self.reload:
+                self.reload = False
+                old = list(self.running)
+                logger.info("Reloading %s workers", len(old))
+                for slot in range(self.workers):
+                    self.spawn(slot)
+                self.drain(old)
+            self.reap()
+            now = time.monotonic()
+            filled = set(self.running.values())
+            for slot in range(self.workers):
+                if self.stop:
+                    break
+                if slot not in filled and now >= self.restart_at[slot]:
+                    self.spawn(slot)
+            time.sleep(0.5)
+
+        logger.info("Draining %s workers", len(self.running))
+        self.drain(list(self.running))
+        while self.draining:
+            self.reap()
+            time.sleep(0.2)
+        self.sock.close()
+        return self.code
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=7778)
+    parser.add_argument("--workers", type=int, default=SERVER_WORKERS)
+    args = parser.parse_args()
+
+    from src.main import app
+    from src.routers import runnable_routes
+
+    if SERVER_PRELOAD:
+        runnable_routes.preload()
+    let_streams_finish()
+
+    config = uvicorn.Config(
+        app,
+        host=args.host,
+        port=args.port,
+        timeout_graceful_shutdown=SERVER_GRACEFUL_TIMEOUT,
+    )
+    sys.exit(Master(config, args.workers or os.cpu_count()).run())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,203 @@
+import asyncio
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
+from typing import Awaitable, Iterable, List, Optional
+
+import httpx
+import redis
+import redis.asyncio
+from openai import AsyncOpenAI, OpenAI
+from pinecone import Pinecone
+from xata.client import XataClient
+
+from src.config.config import (
+    CLIENTS_KEEPALIVE_EXPIRY,
+    CLIENTS_MAX_CONNECTIONS,
+    CLIENTS_MAX_KEEPALIVE,
+    CLIENTS_POOL_THREADS,
+    CLIENTS_TIMEOUT,
+    OPENAI_API_KEY,
+    PINECONE_API_KEY,
+    PINECONE_INDEX_NAME,
+    REDIS_URL,
+    SEARCH_BATCH_CONCURRENCY,
+    XATA_API_KEY,
+)
+from src.services import local_index, metrics, timing
+
+
+def _on_openai_response_sync(response: httpx.Response):
+    metrics.count_retryable("openai", response.status_code)
+    timing.record_request_id("openai", response.headers.get("x-request-id"))
+
+
+async def _on_openai_response(response: httpx.Response):
+    _on_openai_response_sync(response)
+
+
+class Clients:
+    """Upstream clients opened once and shared by every request.
+
+    The OpenAI client runs on a keep-alive httpx pool. The Pinecone index and
+    the Xata clients are created on first use, since building them needs a
+    round trip to the upstream service, and then reused. Both SDKs are
+    blocking, so their calls go through a bounded thread pool to keep the
+    event loop free.
+    """
+
+    def __init__(self):
+        self.http = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=CLIENTS_MAX_CONNECTIONS,
+                max_keepalive_connections=CLIENTS_MAX_KEEPALIVE,
+                keepalive_expiry=CLIENTS_KEEPALIVE_EXPIRY,
+            ),
+            timeout=CLIENTS_TIMEOUT,
+            event_hooks={"response": [_on_openai_response]},
+        )
+        self.openai = AsyncOpenAI(api_key=OPENAI_API_KEY, http_client=self.http)
+        self.redis = redis.asyncio.Redis.from_url(REDIS_URL)
+
+        self.executor = ThreadPoolExecutor(
+            max_workers=CLIENTS_POOL_THREADS, thread_name_prefix="upstream"
+        )
+        self._lock = threading.Lock()
+        self._stack = ExitStack()
+        self._index = None
+        self._xata = {}
+        self._openai_sync = None
+        self._redis_sync = None
+
+    @property
+    def index(self):
+        with self._lock:
+            if self._index is None:
+                pc = Pinecone(api_key=PINECONE_API_KEY)
+                self._index = self._stack.enter_context(
+                    pc.Index(PINECONE_INDEX_NAME, pool_threads=CLIENTS_POOL_THREADS)
+                )
+        return self._index
+
+    @property
+    def openai_sync(self) -> OpenAI:
+        """Blocking OpenAI client for the synchronous LangChain tool paths."""
+        with self._lock:
+            if self._openai_sync is None:
+                self._openai_sync = OpenAI(
+                    api_key=OPENAI_API_KEY,
+                    http_client=httpx.Client(
+                        limits=httpx.Limits(
+                            max_connections=CLIENTS_MAX_CONNECTIONS,
+                            max_keepalive_connections=CLIENTS_MAX_KEEPALIVE,
+                            keepalive_expiry=CLIENTS_KEEPALIVE_EXPIRY,
+                        ),
+                        timeout=CLIENTS_TIMEOUT,
+                        event_hooks={"response": [_on_openai_response_sync]},
+                    ),
+                )
+        return self._openai_sync
+
+    @property
+    def redis_sync(self) -> redis.Redis:
+        with self._lock:
+            if self._redis_sync is None:
+                self._redis_sync = redis.Redis.from_url(REDIS_URL)
+        return self._redis_sync
+
+    def xata(self, db_url: str) -> XataClient:
+        with self._lock:
+            client = self._xata.get(db_url)
+            if client is None:
+                client = XataClient(api_key=XATA_API_KEY, db_url=db_url)
+                self._xata[db_url] = client
+        return client
+
+    async def run(self, func, *args, **kwargs):
+        """Run a blocking upstream call in the shared thread pool."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self.executor, functools.partial(func, *args, **kwargs)
+        )
+
+    async def query(self, **kwargs):
+        """Query the Pinecone index without blocking the event loop.
+
+        Namespaces with an enabled local replica are answered from it, unless
+        the query needs a metadata filter.
+        """
+        with metrics.stage("query"):
+            local = local_index.get(kwargs.get("namespace"))
+            if local is not None and not kwargs.get("filter"):
+                return await self.run(local.query, **kwargs)
+            with metrics.upstream("pinecone"):
+                return await self.run(lambda: self.index.query(**kwargs))
+
+    async def list_ids(self, **kwargs) -> list:
+        """List vector ids, e.g. by prefix, without blocking the event loop.
+
+        Listing needs a serverless index.
+        """
+        with metrics.upstream("pinecone"):
+            return await self.run(
+                lambda: [id for page in self.index.list(**kwargs) for id in page]
+            )
+
+    async def fetch(self, **kwargs):
+        """Fetch vectors from the Pinecone index without blocking the event loop."""
+        with metrics.upstream("pinecone"):
+            return await self.run(lambda: self.index.fetch(**kwargs))
+
+    async def xata_query(self, db_url: str, table: str, payload: dict):
+        """Query a Xata table without blocking the event loop."""
+        with metrics.upstream("xata"):
+            response = await self.run(
+                lambda: self.xata(db_url).data().query(table, payload)
+            )
+        timing.record_request_id("xata", response.headers.get("x-request-id"))
+        return response
+
+    async def aclose(self):
+        await self.openai.close()
+        await self.redis.aclose()
+        if self._openai_sync is not None:
+            self._openai_sync.close()
+        if self._redis_sync is not None:
+            self._redis_sync.close()
+        self._stack.close()
+        for client in self._xata.values():
+            client.data().session.close()
+        self._xata.clear()
+        self.executor.shutdown(wait=False)
+
+
+_clients: Optional[Clients] = None
+
+
+def get_clients() -> Clients:
+    """Return the shared clients, opening them if the app has not done so yet."""
+    global _clients
+    if _clients is None:
+        _clients = Clients()
+    return _clients
+
+
+async def close_clients():
+    global _clients
+    if _clients is not None:
+        await _clients.aclose()
+        _clients = None
+
+
+async def gather_limited(
+    aws: Iterable[Awaitable], limit: int = SEARCH_BATCH_CONCURRENCY
+) -> List:
+    """Like asyncio.gather, but with at most `limit` awaitables running at once."""
+    semaphore = asyncio.Semaphore(limit)
+
+    async def run(aw):
+        async with semaphore:
+            return await aw
+
+    return await asyncio.gather(*(run(aw) for aw in aws))
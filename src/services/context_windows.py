@@ -0,0 +1,140 @@
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from src.config.config import (
+    CONTEXT_CACHE_NEGATIVE_TTL,
+    CONTEXT_CACHE_SIZE,
+    CONTEXT_CACHE_TTL,
+)
+from src.services import metrics
+from src.services.clients import get_clients
+from src.services.tiered_cache import JsonCache
+
+# A run of consecutive chunks of one document, as (doc, first, last).
+Window = Tuple[str, int, int]
+
+
+class ContextCache(JsonCache):
+    """Cache of stitched context windows; windows with no chunks are empty."""
+
+    def __init__(
+        self,
+        maxsize: int = CONTEXT_CACHE_SIZE,
+        ttl: int = CONTEXT_CACHE_TTL,
+        negative_ttl: int = CONTEXT_CACHE_NEGATIVE_TTL,
+    ):
+        super().__init__(maxsize, ttl, negative_ttl)
+
+    @staticmethod
+    def key(namespace: str, window: Window) -> str:
+        doc, first, last = window
+        return f"context:{namespace}:{doc}:{first}-{last}"
+
+
+cache = ContextCache()
+metrics.register_cache("context", cache)
+
+
+def neighbor_window(id: str, n: int) -> Optional[Window]:
+    """Return the window of `n` chunks on each side of a `<doc>_<chunk>` id."""
+    doc, _, chunk = id.rpartition("_")
+    if not doc or not chunk.isdigit():
+        return None
+    return doc, max(int(chunk) - n, 0), int(chunk) + n
+
+
+def merge_windows(windows: Iterable[Window]) -> List[Window]:
+    """Merge overlapping or adjacent windows of the same document."""
+    merged = []
+    for doc, first, last in sorted(windows):
+        if merged and merged[-1][0] == doc and first <= merged[-1][2] + 1:
+            merged[-1] = (doc, merged[-1][1], max(merged[-1][2], last))
+        else:
+            merged.append((doc, first, last))
+    return merged
+
+
+async def fetch_windows(namespace: str, windows: Iterable[Window]) -> Dict[Window, str]:
+    """Return the stitched text of each window.
+
+    Windows not cached are read with one Pinecone fetch for all their chunks.
+    Chunks past the end of a document are skipped.
+    """
+    with metrics.stage("expand_context"):
+        return await _fetch_windows(namespace, windows)
+
+
+async def _fetch_windows(
+    namespace: str, windows: Iterable[Window]
+) -> Dict[Window, str]:
+    keys = {window: ContextCache.key(namespace, window) for window in set(windows)}
+    cached = await cache.aget(list(keys.values()))
+    texts = {
+        window: cached[key]["text"] for window, key in keys.items() if cached.get(key)
+    }
+
+    missing = [window for window, key in keys.items() if key not in cached]
+    if missing:
+        ids = sorted(
+            {
+                f"{doc}_{chunk}"
+                for doc, first, last in missing
+                for chunk in range(first, last + 1)
+            }
+        )
+        vectors = (await get_clients().fetch(ids=ids, namespace=namespace)).vectors
+
+        stitched = {}
+        for doc, first, last in missing:
+            chunks = [vectors.get(f"{doc}_{chunk}") for chunk in range(first, last + 1)]
+            stitched[(doc, first, last)] = "\n".join(
+                chunk.metadata["text"] for chunk in chunks if chunk is not None
+            )
+        await cache.aset(
+            {
+                keys[window]: {"text": text} if text else {}
+                for window, text in stitched.items()
+            }
+        )
+        texts.update({window: text for window, text in stitched.items() if text})
+
+    return texts
+
+
+async def expand_hits(namespace: str, matches, n: int) -> Dict[str, str]:
+    """Map each hit id to its text with `n` neighboring chunks on each side."""
+    if not n:
+        return {}
+
+    windows = {doc["id"]: neighbor_window(doc["id"], n) for doc in matches}
+    texts = await fetch_windows(
+        namespace, (window for window in windows.values() if window)
+    )
+    return {id: texts[window] for id, window in windows.items() if window in texts}
+
+
+async def expand_documents(
+    namespace: str, groups: List[Tuple[str, list]], n: int
+) -> Dict[str, List[str]]:
+    """Map each document to the texts of its hits widened by `n` chunks.
+
+    Windows that overlap within a document are stitched together once.
+    """
+    if not n:
+        return {}
+
+    merged = {
+        parent: merge_windows(
+            window
+            for window in (neighbor_window(doc["id"], n) for doc in docs)
+            if window
+        )
+        for parent, docs in groups
+    }
+    texts = await fetch_windows(
+        namespace, (window for windows in merged.values() for window in windows)
+    )
+    return {
+        parent: [texts[window] for window in windows if window in texts]
+        for parent, windows in merged.items()
+        if any(window in texts for window in windows)
+    }
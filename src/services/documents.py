@@ -0,0 +1,97 @@
+import hashlib
+from typing import Optional
+
+from src.config.config import (
+    DOCUMENT_CACHE_NEGATIVE_TTL,
+    DOCUMENT_CACHE_SIZE,
+    DOCUMENT_CACHE_TTL,
+    PINECONE_NAMESPACE_PATENT,
+    PINECONE_NAMESPACE_SCI,
+    PINECONE_NAMESPACE_STANDARD,
+)
+from src.services import metrics
+from src.services.clients import gather_limited, get_clients
+from src.services.grouping import chunk_key, parent_id
+from src.services.metadata_cache import MISSING
+from src.services.tiered_cache import JsonCache
+
+# Pinecone namespace and text metadata field behind each search namespace.
+NAMESPACES = {
+    "academic": (PINECONE_NAMESPACE_SCI, "text"),
+    "patent": (PINECONE_NAMESPACE_PATENT, "abstract"),
+    "standard": (PINECONE_NAMESPACE_STANDARD, "text"),
+}
+
+FETCH_PAGE_SIZE = 100
+
+
+class DocumentCache(JsonCache):
+    """Cache of the chunk and document texts served by id."""
+
+    def __init__(
+        self,
+        maxsize: int = DOCUMENT_CACHE_SIZE,
+        ttl: int = DOCUMENT_CACHE_TTL,
+        negative_ttl: int = DOCUMENT_CACHE_NEGATIVE_TTL,
+    ):
+        super().__init__(maxsize, ttl, negative_ttl)
+
+    @staticmethod
+    def key(namespace: str, id: str) -> str:
+        return f"document:{namespace}:{id}"
+
+
+cache = DocumentCache()
+metrics.register_cache("document", cache)
+
+
+async def _load(namespace: str, id: str) -> dict:
+    index_namespace, text_field = NAMESPACES[namespace]
+    clients = get_clients()
+
+    vectors = (await clients.fetch(ids=[id], namespace=index_namespace)).vectors
+    if id in vectors:
+        return {"content": vectors[id].metadata[text_field]}
+
+    ids = [
+        chunk_id
+        for chunk_id in await clients.list_ids(
+            prefix=f"{id}_", namespace=index_namespace
+        )
+        if parent_id(chunk_id) == id
+    ]
+    if not ids:
+        return MISSING
+    ids.sort(key=chunk_key)
+
+    pages = await gather_limited(
+        clients.fetch(ids=ids[i : i + FETCH_PAGE_SIZE], namespace=index_namespace)
+        for i in range(0, len(ids), FETCH_PAGE_SIZE)
+    )
+    chunks = {}
+    for page in pages:
+        chunks.update(page.vectors)
+    return {
+        "content": "\n".join(
+            chunks[chunk_id].metadata[text_field]
+            for chunk_id in ids
+            if chunk_id in chunks
+        )
+    }
+
+
+async def get_document(namespace: str, id: str) -> Optional[dict]:
+    """Return the text of a chunk, or of a whole document stitched in chunk order.
+
+    The result carries an `etag` of the text. Returns None if the namespace
+    has no such chunk or document.
+    """
+    key = DocumentCache.key(namespace, id)
+    document = (await cache.aget([key])).get(key)
+    if document is None:
+        document = await _load(namespace, id)
+        if document:
+            digest = hashlib.sha256(document["content"].encode()).hexdigest()
+            document = {**document, "etag": digest[:32]}
+        await cache.aset({key: document})
+    return document or None
@@ -0,0 +1,209 @@
+import asyncio
+import hashlib
+import unicodedata
+from array import array
+from typing import Dict, Iterable, List, Set, Tuple
+
+from src.config.config import (
+    EMBEDDING_BATCH_MAX_SIZE,
+    EMBEDDING_BATCH_WINDOW_MS,
+    EMBEDDING_CACHE_SIZE,
+    EMBEDDING_CACHE_TTL,
+    OPENAI_EMBEDDING_MODEL_V3,
+)
+from src.services import metrics
+from src.services.clients import get_clients
+from src.services.tiered_cache import TieredCache
+
+
+def normalize_query(query: str) -> str:
+    """Fold full-width forms, whitespace and case so equivalent queries match.
+
+    NFKC maps full-width Latin letters, digits and punctuation (and the
+    ideographic space) to their half-width forms, and half-width katakana to
+    full-width, leaving CJK ideographs untouched.
+    """
+    query = unicodedata.normalize("NFKC", query)
+    return " ".join(query.split()).casefold()
+
+
+def encode_vector(vector: Iterable[float]) -> bytes:
+    return array("f", vector).tobytes()
+
+
+def decode_vector(data: bytes) -> List[float]:
+    vector = array("f")
+    vector.frombytes(data)
+    return vector.tolist()
+
+
+class EmbeddingCache(TieredCache):
+    """Two-tier cache of float32 query vectors, keyed by normalized query."""
+
+    def __init__(
+        self, maxsize: int = EMBEDDING_CACHE_SIZE, ttl: int = EMBEDDING_CACHE_TTL
+    ):
+        super().__init__(maxsize, ttl)
+
+    @staticmethod
+    def key(model: str, query: str) -> str:
+        digest = hashlib.sha1(normalize_query(query).encode("utf-8")).hexdigest()
+        return f"embedding:{model}:{digest}"
+
+
+def _ordered(data):
+    return sorted(data, key=lambda item: item.index)
+
+
+class EmbeddingBatcher:
+    """Coalesce concurrent embedding requests into shared upstream calls.
+
+    Texts queued within `window_ms` of the first pending one, or until
+    `max_size` texts are waiting, are sent as a single
+    `embeddings.create(input=[...])` call and the vectors are handed back to
+    each waiting caller. A request that is already `max_size` texts long is
+    sent on its own.
+    """
+
+    def __init__(
+        self,
+        window_ms: float = EMBEDDING_BATCH_WINDOW_MS,
+        max_size: int = EMBEDDING_BATCH_MAX_SIZE,
+    ):
+        self.window = window_ms / 1000
+        self.max_size = max_size
+        self._pending: Dict[str, List[Tuple[str, asyncio.Future]]] = {}
+        self._timers: Dict[str, asyncio.TimerHandle] = {}
+        self._inflight: Set[asyncio.Task] = set()
+        self.calls = 0
+        self.texts = 0
+
+    async def embed(self, texts: List[str], model: str) -> List[List[float]]:
+        if len(texts) >= self.max_size:
+            return await self._create(texts, model)
+
+        loop = asyncio.get_running_loop()
+        pending = self._pending.setdefault(model, [])
+        futures = []
+        for text in texts:
+            future = loop.create_future()
+            pending.append((text, future))
+            futures.append(future)
+
+        while len(pending) >= self.max_size:
+            self._flush(model)
+            pending = self._pending.get(model, [])
+        if pending and model not in self._timers:
+            self._timers[model] = loop.call_later(self.window, self._flush, model)
+
+        return list(await asyncio.gather(*futures))
+
+    def _flush(self, model: str):
+        timer = self._timers.pop(model, None)
+        if timer is not None:
+            timer.cancel()
+        pending = self._pending.pop(model, [])
+        batch, rest = pending[: self.max_size], pending[self.max_size :]
+        if rest:
+            self._pending[model] = rest
+        if batch:
+            # The loop only keeps weak references to tasks, so hold on to
+            # each one until it is done.
+            task = asyncio.ensure_future(self._send(batch, model))
+            self._inflight.add(task)
+            task.add_done_callback(self._inflight.discard)
+
+    async def _send(self, batch: List[Tuple[str, asyncio.Future]], model: str):
+        texts = list(dict.fromkeys(text for text, _ in batch))
+        try:
+            vectors = dict(zip(texts, await self._create(texts, model)))
+            results = [(future, vectors[text]) for text, future in batch]
+        except BaseException as e:
+            # Every waiter fails with the batch, even when it is cancelled.
+            for _, future in batch:
+                if not future.done():
+                    if isinstance(e, asyncio.CancelledError):
+                        future.cancel()
+                    else:
+                        future.set_exception(e)
+            if not isinstance(e, Exception):
+                raise
+            return
+        for future, vector in results:
+            if not future.done():
+                future.set_result(vector)
+
+    async def _create(self, texts: List[str], model: str) -> List[List[float]]:
+        self.calls += 1
+        self.texts += len(texts)
+        with metrics.upstream("openai"):
+            response = await get_clients().openai.embeddings.create(
+                input=texts, model=model
+            )
+        return [item.embedding for item in _ordered(response.data)]
+
+
+cache = EmbeddingCache()
+metrics.register_cache("embedding", cache)
+batcher = EmbeddingBatcher()
+
+
+def _plan(queries: List[str], model: str):
+    """Key queries by their normalized form, but embed them as written.
+
+    Queries that normalize alike share the vector of the first one embedded.
+    """
+    keys = [EmbeddingCache.key(model, query) for query in queries]
+    return list(queries), keys
+
+
+def _missing(texts: List[str], keys: List[str], found: Dict[str, bytes]):
+    missing = {}
+    for text, key in zip(texts, keys):
+        if key not in found and key not in missing:
+            missing[key] = text
+    return missing
+
+
+async def embed_queries(
+    queries: List[str], model: str = OPENAI_EMBEDDING_MODEL_V3
+) -> List[List[float]]:
+    """Embed queries, serving repeats from the cache and the rest in one call."""
+    with metrics.stage("embed"):
+        texts, keys = _plan(queries, model)
+        found = await cache.aget(keys)
+        missing = _missing(texts, keys, found)
+        if missing:
+            vectors = await batcher.embed(list(missing.values()), model)
+            computed = {
+                key: encode_vector(vector) for key, vector in zip(missing, vectors)
+            }
+            await cache.aset(computed)
+            found.update(computed)
+    return [decode_vector(found[key]) for key in keys]
+
+
+async def embed_query(
+    query: str, model: str = OPENAI_EMBEDDING_MODEL_V3
+) -> List[float]:
+    return (await embed_queries([query], model))[0]
+
+
+def embed_query_sync(query: str, model: str = OPENAI_EMBEDDING_MODEL_V3) -> List[float]:
+    """Blocking counterpart of embed_query for synchronous tool runs."""
+    with metrics.stage("embed"):
+        texts, keys = _plan([query], model)
+        found = cache.get(keys)
+        missing = _missing(texts, keys, found)
+        if missing:
+            with metrics.upstream("openai"):
+                response = get_clients().openai_sync.embeddings.create(
+                    input=list(missing.values()), model=model
+                )
+            computed = {
+                key: encode_vector(item.embedding)
+                for key, item in zip(missing, _ordered(response.data))
+            }
+            cache.set(computed)
+            found.update(computed)
+    return decode_vector(found[keys[0]])
@@ -0,0 +1,88 @@
+"""Text extraction and chunking for uploaded documents.
+
+This module runs in the ingestion process pool, so it only imports what the
+extraction itself needs.
+"""
+
+import os
+import re
+import zipfile
+from typing import List
+from xml.etree import ElementTree
+
+import pypdf
+
+EXTENSIONS = (".pdf", ".docx", ".txt", ".md")
+
+WORD = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+
+
+def supported(path: str) -> bool:
+    return os.path.splitext(path)[1].lower() in EXTENSIONS
+
+
+def _pdf_pages(path: str) -> List[str]:
+    reader = pypdf.PdfReader(path)
+    return [page.extract_text() or "" for page in reader.pages]
+
+
+def _docx_pages(path: str) -> List[str]:
+    """Read the paragraphs of a DOCX file, split at its rendered page breaks."""
+    with zipfile.ZipFile(path) as archive:
+        root = ElementTree.fromstring(archive.read("word/document.xml"))
+
+    pages = [[]]
+    for paragraph in root.iter(f"{WORD}p"):
+        text = []
+        for node in paragraph.iter():
+            if node.tag == f"{WORD}t" and node.text:
+                text.append(node.text)
+            elif node.tag == f"{WORD}tab":
+                text.append("\t")
+            elif node.tag == f"{WORD}lastRenderedPageBreak" or (
+                node.tag == f"{WORD}br" and node.get(f"{WORD}type") == "page"
+            ):
+                # Word often stores both kinds for one break, so skip empty pages.
+                if text or any(pages[-1]):
+                    pages[-1].append("".join(text))
+                    text = []
+                    pages.append([])
+        pages[-1].append("".join(text))
+    return ["\n".join(lines) for lines in pages]
+
+
+def _text_pages(path: str) -> List[str]:
+    with open(path, encoding="utf-8", errors="replace") as f:
+        return f.read().split("\f")
+
+
+def extract_pages(path: str) -> List[str]:
+    """Return the text of each page of a PDF, DOCX or plain text file.
+
+    DOCX pages follow the page breaks Word stored when the file was saved,
+    and plain text pages are separated by form feeds.
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension == ".pdf":
+        return _pdf_pages(path)
+    if extension == ".docx":
+        return _docx_pages(path)
+    if extension in (".txt", ".md"):
+        return _text_pages(path)
+    raise ValueError(f"Unsupported file type: {extension}")
+
+
+def extract_chunks(path: str, chunk_size: int, chunk_overlap: int) -> dict:
+    """Extract a file and split it into chunks, each tagged with its page."""
+    from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+    splitter = RecursiveCharacterTextSplitter(
+        chunk_size=chunk_size, chunk_overlap=chunk_overlap
+    )
+    pages = extract_pages(path)
+    chunks = []
+    for number, text in enumerate(pages, start=1):
+        text = re.sub(r"[ \t]+", " ", text).strip()
+        for chunk in splitter.split_text(text):
+            chunks.append({"text": chunk, "page": number})
+    return {"pages": len(pages), "chunks": chunks}
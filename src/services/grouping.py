@@ -0,0 +1,33 @@
+from typing import List, Tuple
+
+
+def parent_id(id: str) -> str:
+    """Return the document part of a `<doc>_<chunk>` vector id."""
+    return id.rpartition("_")[0]
+
+
+def chunk_key(id: str) -> tuple:
+    """Sort key putting `<doc>_<chunk>` ids in chunk order."""
+    chunk = id.rpartition("_")[2]
+    return (0, int(chunk), "") if chunk.isdigit() else (1, 0, chunk)
+
+
+def group_matches(matches, top_k: int) -> List[Tuple[str, list]]:
+    """Collapse chunk hits into at most `top_k` documents.
+
+    Documents are ordered by their first hit in `matches`, and each
+    document's hits are put back in chunk order.
+    """
+    groups = {}
+    for doc in matches:
+        parent = parent_id(doc["id"])
+        if parent not in groups:
+            if len(groups) == top_k:
+                continue
+            groups[parent] = []
+        groups[parent].append(doc)
+
+    return [
+        (parent, sorted(docs, key=lambda doc: chunk_key(doc["id"])))
+        for parent, docs in groups.items()
+    ]
@@ -0,0 +1,325 @@
+import asyncio
+import contextvars
+import logging
+import multiprocessing
+import os
+import shutil
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Awaitable, Callable, List, Optional, Set
+
+import numpy as np
+import redis
+
+from src.config.config import (
+    INGEST_CHUNK_OVERLAP,
+    INGEST_CHUNK_SIZE,
+    INGEST_DIR,
+    INGEST_DRAIN_TIMEOUT,
+    INGEST_EMBED_BATCH,
+    INGEST_EMBED_CONCURRENCY,
+    INGEST_JOB_TTL,
+    INGEST_PROCESSES,
+    OPENAI_EMBEDDING_MODEL_V3,
+)
+from src.services import extraction, local_index, metrics, upload_store
+from src.services.clients import gather_limited, get_clients
+
+logger = logging.getLogger(__name__)
+
+INDEX_ARTIFACT = "index"
+
+# Loaded document indexes kept per process, shared by the sessions linking
+# them. Snapshots never change once written, so entries stay valid until the
+# upload store evicts them.
+LOADED_MAX = 256
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+_loaded: "OrderedDict[str, local_index.LocalIndex]" = OrderedDict()
+_loaded_lock = threading.Lock()
+_jobs: Set[asyncio.Task] = set()
+
+
+def pool() -> ProcessPoolExecutor:
+    """Return the process pool extracting documents, starting it on first use.
+
+    Workers are spawned rather than forked, since the server process runs
+    threads.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                max_workers=INGEST_PROCESSES,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+    return _pool
+
+
+def shutdown_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+
+def supported(file_path: str) -> bool:
+    return extraction.supported(file_path)
+
+
+def session_dir(session_id: str) -> str:
+    if not session_id or os.sep in session_id or session_id in (".", ".."):
+        raise ValueError("Invalid session_id")
+    return os.path.join(INGEST_DIR, session_id)
+
+
+def job_key(job_id: str) -> str:
+    return f"ingest:{job_id}"
+
+
+async def _update(key: str, **fields):
+    """Record job progress in Redis, where any worker can read it."""
+    try:
+        async with get_clients().redis.pipeline(transaction=False) as pipe:
+            pipe.hset(job_key(key), mapping={k: str(v) for k, v in fields.items()})
+            pipe.expire(job_key(key), INGEST_JOB_TTL)
+            await pipe.execute()
+    except (redis.RedisError, OSError) as e:
+        logger.warning("Ingestion progress update failed: %s", e)
+
+
+async def create_job(session_id: str, file_path: str) -> str:
+    job_id = uuid.uuid4().hex
+    await _update(
+        job_id,
+        job_id=job_id,
+        session_id=session_id,
+        file=os.path.basename(file_path),
+        status="queued",
+    )
+    return job_id
+
+
+async def get_job(job_id: str) -> Optional[dict]:
+    fields = await get_clients().redis.hgetall(job_key(job_id))
+    if not fields:
+        return None
+    return {key.decode(): value.decode() for key, value in fields.items()}
+
+
+async def embed_texts(
+    texts: List[str],
+    on_batch: Optional[Callable[[int], Awaitable[None]]] = None,
+    model: str = OPENAI_EMBEDDING_MODEL_V3,
+) -> np.ndarray:
+    """Embed document chunks in INGEST_EMBED_BATCH sized calls.
+
+    Chunks bypass the query embedding cache, since they are rarely repeated.
+    """
+
+    async def embed(batch: List[str]) -> List[List[float]]:
+        with metrics.upstream("openai"):
+            response = await get_clients().openai.embeddings.create(
+                input=batch, model=model
+            )
+        if on_batch is not None:
+            await on_batch(len(batch))
+        return [item.embedding for item in sorted(response.data, key=lambda i: i.index)]
+
+    batches = [
+        texts[i : i + INGEST_EMBED_BATCH]
+        for i in range(0, len(texts), INGEST_EMBED_BATCH)
+    ]
+    with metrics.stage("embed"):
+        results = await gather_limited(
+            (embed(batch) for batch in batches), INGEST_EMBED_CONCURRENCY
+        )
+    return np.asarray([vector for batch in results for vector in batch], np.float32)
+
+
+def write_document(sha256: str, job_id: str, vectors: np.ndarray, chunks: list):
+    """Write a document's index as an artifact of its stored file.
+
+    The snapshot is written under a hidden name and renamed into place, so
+    searches never see a partial one. When another job ingesting the same
+    bytes finished first, its snapshot is kept.
+    """
+    artifact = upload_store.artifact_path(sha256, INDEX_ARTIFACT)
+    temporary = upload_store.artifact_path(f".{sha256}.{job_id}", INDEX_ARTIFACT)
+    local_index.write_snapshot(
+        temporary,
+        sha256,
+        [f"{sha256}_{i}" for i in range(len(chunks))],
+        vectors,
+        chunks,
+    )
+    try:
+        os.rename(temporary, artifact)
+    except OSError:
+        if not os.path.isdir(artifact):
+            raise
+        shutil.rmtree(temporary)
+
+
+def link_document(session_id: str, sha256: str):
+    """Add a stored file's index to the session's documents."""
+    artifact = upload_store.artifact_path(sha256, INDEX_ARTIFACT)
+    if not os.path.isdir(artifact):
+        # Files without any text have no index.
+        return
+    directory = session_dir(session_id)
+    os.makedirs(directory, exist_ok=True)
+    try:
+        os.symlink(os.path.abspath(artifact), os.path.join(directory, sha256))
+    except FileExistsError:
+        pass
+
+
+def _reuse(sha256: str) -> dict:
+    index = local_index.LocalIndex(upload_store.artifact_path(sha256, INDEX_ARTIFACT))
+    pages = max((chunk.get("page", 0) for chunk in index.metadata), default=0)
+    return {"pages": pages, "chunks": len(index), "reused": True}
+
+
+async def ingest(job_id: str, session_id: str, file_path: str, sha256: str) -> dict:
+    """Extract, chunk, embed and index an uploaded file for its session.
+
+    The index is kept with the stored file, so the same bytes uploaded again
+    in any session reuse it instead of being embedded again. Progress is
+    recorded under the job id as it goes. Returns the final progress fields.
+    """
+    started = time.perf_counter()
+    progress = {"status": "extracting"}
+    loop = asyncio.get_running_loop()
+    try:
+        if upload_store.has_artifact(sha256, INDEX_ARTIFACT, "manifest.json"):
+            progress.update(await loop.run_in_executor(None, _reuse, sha256))
+        else:
+            await _update(job_id, **progress)
+            await _index(job_id, file_path, sha256, progress)
+        await loop.run_in_executor(None, link_document, session_id, sha256)
+        progress["status"] = "done"
+    except asyncio.CancelledError:
+        progress.update(
+            status="failed",
+            error="Interrupted by a server shutdown",
+            seconds=round(time.perf_counter() - started, 3),
+        )
+        await _update(job_id, **progress)
+        raise
+    except Exception as e:
+        logger.exception("Ingestion of %s failed", file_path)
+        progress.update(status="failed", error=str(e))
+
+    progress["seconds"] = round(time.perf_counter() - started, 3)
+    await _update(job_id, **progress)
+    return progress
+
+
+def start(job_id: str, session_id: str, file_path: str, sha256: str) -> asyncio.Task:
+    """Run an ingestion job in the background of this worker.
+
+    The job gets a fresh context, so its stages are not counted in the
+    metrics and Server-Timing of the request that queued it.
+    """
+    task = asyncio.get_running_loop().create_task(
+        ingest(job_id, session_id, file_path, sha256), context=contextvars.Context()
+    )
+    _jobs.add(task)
+    task.add_done_callback(_jobs.discard)
+    return task
+
+
+async def drain(timeout: float = INGEST_DRAIN_TIMEOUT):
+    """Wait up to `timeout` seconds for running jobs, then cancel the rest."""
+    if not _jobs:
+        return
+    _, pending = await asyncio.wait(set(_jobs), timeout=timeout)
+    for task in pending:
+        task.cancel()
+    await asyncio.gather(*pending, return_exceptions=True)
+
+
+async def _index(job_id: str, file_path: str, sha256: str, progress: dict):
+    loop = asyncio.get_running_loop()
+    with metrics.stage("extract"):
+        extracted = await loop.run_in_executor(
+            pool(),
+            extraction.extract_chunks,
+            file_path,
+            INGEST_CHUNK_SIZE,
+            INGEST_CHUNK_OVERLAP,
+        )
+    chunks = extracted["chunks"]
+    progress.update(status="embedding", pages=extracted["pages"], chunks=len(chunks))
+    await _update(job_id, **progress)
+    if not chunks:
+        return
+
+    progress["embedded"] = 0
+
+    async def on_batch(count: int):
+        progress["embedded"] += count
+        await _update(job_id, embedded=progress["embedded"])
+
+    vectors = await embed_texts([chunk["text"] for chunk in chunks], on_batch)
+    progress["status"] = "indexing"
+    await _update(job_id, status="indexing")
+
+    name = os.path.basename(file_path)
+    for chunk in chunks:
+        chunk["file"] = name
+    with metrics.stage("index"):
+        await loop.run_in_executor(
+            None, write_document, sha256, job_id, vectors, chunks
+        )
+
+
+def _load(path: str) -> local_index.LocalIndex:
+    with _loaded_lock:
+        index = _loaded.get(path)
+        if index is not None:
+            _loaded.move_to_end(path)
+            return index
+    index = local_index.LocalIndex(path)
+    with _loaded_lock:
+        _loaded[path] = index
+        while len(_loaded) > LOADED_MAX:
+            _loaded.popitem(last=False)
+    return index
+
+
+def search_session(session_id: str, vector: List[float], top_k: int) -> List[dict]:
+    """Return the `top_k` chunks of the session's documents closest to `vector`."""
+    directory = session_dir(session_id)
+    try:
+        names = [name for name in os.listdir(directory) if not name.startswith(".")]
+    except FileNotFoundError:
+        return []
+
+    hits = []
+    for name in names:
+        link = os.path.join(directory, name)
+        try:
+            index = _load(os.path.realpath(link, strict=True))
+        except FileNotFoundError:
+            # The upload store evicted the document.
+            with _loaded_lock:
+                _loaded.pop(os.path.realpath(link), None)
+            try:
+                os.unlink(link)
+            except FileNotFoundError:
+                pass
+            continue
+        rows, scores = index.search(vector, top_k)
+        hits.extend(
+            {"score": float(score), **index.metadata[row]}
+            for row, score in zip(rows, scores)
+        )
+    hits.sort(key=lambda hit: -hit["score"])
+    return hits[:top_k]
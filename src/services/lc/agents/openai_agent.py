@@ -23,6 +23,7 @@ from src.services.lc.tools.search_esg_tool import SearchESG
 from src.services.lc.tools.search_internet_tool import SearchInternet
 # from src.services.lc.tools.search_local_db_tool import SearchLocalDb
 from src.services.lc.tools.search_patent_db_tool import SearchPatentDb
+from src.services.lc.tools.search_session_docs_tool import SearchSessionDocs
 from src.services.lc.tools.search_standard_tool import SearchStandardDb
 
 
@@ -43,6 +44,7 @@ def openai_agent_runnable():
         SearchESG(),
         # SearchLocalDb(),
         SearchStandardDb(),
+        SearchSessionDocs(),
         PythonREPLTool(),
     ]
     oai_tools = [convert_to_openai_function(tool) for tool in lc_tools]
@@ -0,0 +1,71 @@
+import threading
+import time
+from contextvars import ContextVar
+from typing import Any, Dict, Optional
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.tracers.context import register_configure_hook
+
+from src.services import metrics
+
+
+class StageTimingHandler(BaseCallbackHandler):
+    """Time LLM calls and tool runs as the `llm` and `tool` stages.
+
+    The durations go to /metrics and to the Server-Timing breakdown of the
+    request that started the run.
+    """
+
+    run_inline = True
+
+    def __init__(self):
+        self._started: Dict[UUID, float] = {}
+        self._lock = threading.Lock()
+
+    def _start(self, run_id: UUID):
+        with self._lock:
+            self._started[run_id] = time.perf_counter()
+
+    def _end(self, run_id: UUID, stage: str):
+        with self._lock:
+            started = self._started.pop(run_id, None)
+        if started is not None:
+            metrics.observe_stage(stage, time.perf_counter() - started)
+
+    def on_llm_start(self, serialized, prompts, *, run_id: UUID, **kwargs: Any):
+        self._start(run_id)
+
+    def on_chat_model_start(self, serialized, messages, *, run_id: UUID, **kwargs):
+        self._start(run_id)
+
+    def on_llm_end(self, response, *, run_id: UUID, **kwargs: Any):
+        self._end(run_id, "llm")
+
+    def on_llm_error(self, error, *, run_id: UUID, **kwargs: Any):
+        self._end(run_id, "llm")
+
+    def on_tool_start(self, serialized, input_str, *, run_id: UUID, **kwargs: Any):
+        self._start(run_id)
+
+    def on_tool_end(self, output, *, run_id: UUID, **kwargs: Any):
+        self._end(run_id, "tool")
+
+    def on_tool_error(self, error, *, run_id: UUID, **kwargs: Any):
+        self._end(run_id, "tool")
+
+
+_handler: ContextVar[Optional[StageTimingHandler]] = ContextVar(
+    "stage_timing_handler", default=StageTimingHandler()
+)
+
+
+_registered = False
+
+
+def register_stage_timing():
+    """Attach the stage timing handler to every LangChain run in the process."""
+    global _registered
+    if not _registered:
+        register_configure_hook(_handler, inheritable=True)
+        _registered = True
@@ -5,18 +5,13 @@ from langchain.callbacks.manager import (
     CallbackManagerForToolRun,
 )
 from langchain.tools import BaseTool
-from openai import OpenAI
-from pinecone import Pinecone
 from pydantic import BaseModel
 
-from src.config.config import (
-    OPENAI_API_KEY,
-    OPENAI_EMBEDDING_MODEL_V3,
-    PINECONE_API_KEY,
-    PINECONE_INDEX_NAME,
-    PINECONE_NAMESPACE_ESG,
-)
+from src.config.config import PINECONE_NAMESPACE_ESG
 from src.models.models import VectorSearchRequestWithIds
+from src.services import metrics
+from src.services.clients import get_clients
+from src.services.embeddings import embed_query, embed_query_sync
 
 
 class SearchESG(BaseTool):
@@ -33,26 +28,22 @@ class SearchESG(BaseTool):
     ) -> str:
         """Use the tool synchronously."""
 
-        openai_client = OpenAI(api_key=OPENAI_API_KEY)
-        pc = Pinecone(api_key=PINECONE_API_KEY)
-        idx = pc.Index(PINECONE_INDEX_NAME)
+        clients = get_clients()
 
-        response = openai_client.embeddings.create(
-            input=query, model=OPENAI_EMBEDDING_MODEL_V3
-        )
-        query_vector = response.data[0].embedding
+        query_vector = embed_query_sync(query)
 
         filter = None
         if doc_ids:
             filter = {"rec_id": {"$in": doc_ids}}
 
-        response = idx.query(
-            namespace=PINECONE_NAMESPACE_ESG,
-            vector=query_vector,
-            filter=filter,
-            top_k=top_k,
-            include_metadata=True,
-        )
+        with metrics.stage("query"), metrics.upstream("pinecone"):
+            response = clients.index.query(
+                namespace=PINECONE_NAMESPACE_ESG,
+                vector=query_vector,
+                filter=filter,
+                top_k=top_k,
+                include_metadata=True,
+            )
 
         result_list = [item["metadata"]["text"] for item in response["matches"]]
 
@@ -67,20 +58,15 @@ class SearchESG(BaseTool):
     ) -> str:
         """Use the tool asynchronously."""
 
-        openai_client = OpenAI(api_key=OPENAI_API_KEY)
-        pc = Pinecone(api_key=PINECONE_API_KEY)
-        idx = pc.Index(PINECONE_INDEX_NAME)
+        clients = get_clients()
 
-        response = openai_client.embeddings.create(
-            input=query, model=OPENAI_EMBEDDING_MODEL_V3
-        )
-        query_vector = response.data[0].embedding
+        query_vector = await embed_query(query)
 
         filter = None
         if doc_ids:
             filter = {"rec_id": {"$in": doc_ids}}
 
-        response = idx.query(
+        response = await clients.query(
             namespace=PINECONE_NAMESPACE_ESG,
             vector=query_vector,
             filter=filter,
@@ -0,0 +1,68 @@
+from typing import Optional, Type
+
+from langchain.callbacks.manager import (
+    AsyncCallbackManagerForToolRun,
+    CallbackManagerForToolRun,
+)
+from langchain.tools import BaseTool
+from pydantic import BaseModel
+
+from src.models.models import VectorSearchRequest
+from src.services import ingestion, metrics
+from src.services.clients import get_clients
+from src.services.embeddings import embed_query, embed_query_sync
+
+
+def format_hits(hits: list) -> str:
+    return str(
+        [
+            {"content": hit["text"], "source": f"{hit['file']}, page {hit['page']}"}
+            for hit in hits
+        ]
+    )
+
+
+class SearchSessionDocs(BaseTool):
+    name = "search_session_docs_tool"
+    description = "Semantic search in the documents the user uploaded in this session."
+    args_schema: Type[BaseModel] = VectorSearchRequest
+
+    def _run(
+        self,
+        query: str,
+        top_k: Optional[int] = 16,
+        run_manager: Optional[CallbackManagerForToolRun] = None,
+    ) -> str:
+        """Use the tool synchronously."""
+
+        session_id = run_manager.metadata.get("session_id") if run_manager else None
+        if not session_id:
+            return "[]"
+
+        query_vector = embed_query_sync(query)
+
+        with metrics.stage("query"):
+            hits = ingestion.search_session(session_id, query_vector, top_k)
+
+        return format_hits(hits)
+
+    async def _arun(
+        self,
+        query: str,
+        top_k: Optional[int] = 16,
+        run_manager: Optional[AsyncCallbackManagerForToolRun] = None,
+    ) -> str:
+        """Use the tool asynchronously."""
+
+        session_id = run_manager.metadata.get("session_id") if run_manager else None
+        if not session_id:
+            return "[]"
+
+        query_vector = await embed_query(query)
+
+        with metrics.stage("query"):
+            hits = await get_clients().run(
+                ingestion.search_session, session_id, query_vector, top_k
+            )
+
+        return format_hits(hits)
@@ -0,0 +1,289 @@
+import argparse
+import json
+import logging
+import mmap
+import os
+import threading
+from collections.abc import Sequence
+from typing import Dict, List, Optional
+
+import numpy as np
+from pinecone.core.client.models import QueryResponse, ScoredVector
+
+from src.config.config import (
+    LOCAL_INDEX_DIR,
+    LOCAL_INDEX_NAMESPACES,
+    LOCAL_INDEX_NPROBE,
+)
+
+logger = logging.getLogger(__name__)
+
+# Rows scored per matrix product, to bound the float32 working copy.
+CHUNK_ROWS = 65536
+
+
+class _Lines(Sequence):
+    """JSON values stored one per line, decoded by row on access.
+
+    The file is memory-mapped and `<name>.offsets.npy` holds the byte offset
+    of every line, so a snapshot's ids and metadata stay on disk and only the
+    rows a query returns are read.
+    """
+
+    def __init__(self, path: str):
+        self._offsets = np.load(path + ".offsets.npy", mmap_mode="r")
+        with open(path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            self._data = (
+                mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+            )
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    def __getitem__(self, row):
+        row = int(row)
+        if row < 0:
+            row += len(self)
+        if not 0 <= row < len(self):
+            raise IndexError(row)
+        return json.loads(self._data[self._offsets[row] : self._offsets[row + 1]])
+
+
+def _write_lines(path: str, values: List):
+    offsets = [0]
+    with open(path, "wb") as f:
+        for value in values:
+            line = json.dumps(value, ensure_ascii=False).encode() + b"\n"
+            f.write(line)
+            offsets.append(offsets[-1] + len(line))
+    np.save(path + ".offsets.npy", np.asarray(offsets, dtype=np.int64))
+
+
+def _read_lines(path: str, name: str):
+    """Open the `name` sidecar, falling back to the whole-file JSON of older
+    snapshots, which is loaded into memory."""
+    lines = os.path.join(path, f"{name}.jsonl")
+    if os.path.exists(lines):
+        return _Lines(lines)
+    with open(os.path.join(path, f"{name}.json")) as f:
+        return json.load(f)
+
+
+class LocalIndex:
+    """Memory-mapped snapshot of one Pinecone namespace answering top-k queries.
+
+    Vectors are stored unit-normalized as float16, or as int8 with one scale
+    per row, so scores are cosine similarities like Pinecone's. A snapshot
+    built with IVF partitions only scans the `nprobe` partitions whose
+    centroids are closest to the query.
+
+    Ids and metadata are read by row from memory-mapped JSON lines, so
+    resident memory grows with the rows queries return, not with the size of
+    the namespace.
+    """
+
+    def __init__(self, path: str, nprobe: int = LOCAL_INDEX_NPROBE):
+        with open(os.path.join(path, "manifest.json")) as f:
+            manifest = json.load(f)
+        self.ids: Sequence[str] = _read_lines(path, "ids")
+        self.metadata: Sequence[dict] = _read_lines(path, "metadata")
+
+        self.namespace = manifest["namespace"]
+        self.vectors = np.load(os.path.join(path, "vectors.npy"), mmap_mode="r")
+        self.scales = None
+        if manifest["dtype"] == "int8":
+            self.scales = np.load(os.path.join(path, "scales.npy"), mmap_mode="r")
+
+        self.centroids = None
+        self.offsets = None
+        if manifest.get("nlist"):
+            self.centroids = np.load(os.path.join(path, "centroids.npy"))
+            self.offsets = np.load(os.path.join(path, "offsets.npy"))
+        self.nprobe = nprobe
+
+    def __len__(self):
+        return len(self.ids)
+
+    def _scores(self, query: np.ndarray, start: int, stop: int) -> np.ndarray:
+        scores = self.vectors[start:stop].astype(np.float32) @ query
+        if self.scales is not None:
+            scores *= self.scales[start:stop]
+        return scores
+
+    def _ranges(self, query: np.ndarray):
+        if self.centroids is None:
+            return [(0, len(self.ids))]
+        probe = np.argsort(-(self.centroids @ query))[: self.nprobe]
+        return [(int(self.offsets[p]), int(self.offsets[p + 1])) for p in probe]
+
+    def search(self, vector: List[float], top_k: int):
+        """Return the row numbers and scores of the `top_k` closest vectors."""
+        query = np.asarray(vector, dtype=np.float32)
+        query /= np.linalg.norm(query) or 1.0
+
+        rows = []
+        scores = []
+        for start, stop in self._ranges(query):
+            for chunk in range(start, stop, CHUNK_ROWS):
+                end = min(chunk + CHUNK_ROWS, stop)
+                chunk_scores = self._scores(query, chunk, end)
+                if len(chunk_scores) > top_k:
+                    keep = np.argpartition(-chunk_scores, top_k)[:top_k]
+                else:
+                    keep = np.arange(len(chunk_scores))
+                rows.append(keep + chunk)
+                scores.append(chunk_scores[keep])
+
+        if not rows:
+            return np.array([], dtype=np.int64), np.array([], dtype=np.float32)
+        rows = np.concatenate(rows)
+        scores = np.concatenate(scores)
+        order = np.argsort(-scores, kind="stable")[:top_k]
+        return rows[order], scores[order]
+
+    def query(
+        self, vector: List[float], top_k: int, include_metadata: bool = False, **kwargs
+    ) -> QueryResponse:
+        """Answer a query with the same response type as `Index.query`."""
+        rows, scores = self.search(vector, top_k)
+        matches = []
+        for row, score in zip(rows, scores):
+            fields = {"id": self.ids[row], "score": float(score), "values": []}
+            if include_metadata:
+                fields["metadata"] = self.metadata[row]
+            matches.append(ScoredVector(**fields, _check_type=False))
+        return QueryResponse(
+            matches=matches, namespace=self.namespace, _check_type=False
+        )
+
+
+_indexes: Dict[str, Optional[LocalIndex]] = {}
+_lock = threading.Lock()
+
+
+def get(namespace: Optional[str]) -> Optional[LocalIndex]:
+    """Return the local replica of `namespace` if it is enabled and exported."""
+    if namespace not in LOCAL_INDEX_NAMESPACES:
+        return None
+    with _lock:
+        if namespace not in _indexes:
+            path = os.path.join(LOCAL_INDEX_DIR, namespace)
+            try:
+                _indexes[namespace] = LocalIndex(path)
+            except FileNotFoundError:
+                logger.warning("No local index snapshot at %s, using Pinecone", path)
+                _indexes[namespace] = None
+        return _indexes[namespace]
+
+
+def _kmeans(matrix: np.ndarray, nlist: int, iterations: int = 10) -> np.ndarray:
+    rng = np.random.default_rng(0)
+    sample = matrix[rng.choice(len(matrix), min(len(matrix), nlist * 256), False)]
+    centroids = sample[rng.choice(len(sample), nlist, False)]
+    for _ in range(iterations):
+        assignments = np.argmax(sample @ centroids.T, axis=1)
+        for p in range(nlist):
+            members = sample[assignments == p]
+            if len(members):
+                centroids[p] = members.mean(axis=0)
+        centroids /= np.linalg.norm(centroids, axis=1, keepdims=True) + 1e-12
+    return centroids
+
+
+def write_snapshot(
+    path: str,
+    namespace: str,
+    ids: List[str],
+    vectors,
+    metadata: List[dict],
+    dtype: str = "float16",
+    nlist: int = 0,
+):
+    """Write vectors with their ids and metadata as a snapshot LocalIndex reads."""
+    matrix = np.asarray(vectors, dtype=np.float32)
+    matrix /= np.linalg.norm(matrix, axis=1, keepdims=True) + 1e-12
+
+    os.makedirs(path, exist_ok=True)
+    nlist = min(nlist, len(ids))
+    if nlist:
+        centroids = _kmeans(matrix, nlist)
+        assignments = np.argmax(matrix @ centroids.T, axis=1)
+        order = np.argsort(assignments, kind="stable")
+        matrix = matrix[order]
+        ids = [ids[i] for i in order]
+        metadata = [metadata[i] for i in order]
+        counts = np.bincount(assignments, minlength=nlist)
+        offsets = np.concatenate([[0], np.cumsum(counts)])
+        np.save(os.path.join(path, "centroids.npy"), centroids)
+        np.save(os.path.join(path, "offsets.npy"), offsets)
+
+    if dtype == "int8":
+        scales = np.abs(matrix).max(axis=1) / 127 + 1e-12
+        np.save(os.path.join(path, "scales.npy"), scales.astype(np.float32))
+        matrix = np.round(matrix / scales[:, None]).astype(np.int8)
+    else:
+        matrix = matrix.astype(np.float16)
+    np.save(os.path.join(path, "vectors.npy"), matrix)
+
+    _write_lines(os.path.join(path, "ids.jsonl"), ids)
+    _write_lines(os.path.join(path, "metadata.jsonl"), metadata)
+    with open(os.path.join(path, "manifest.json"), "w") as f:
+        json.dump(
+            {
+                "namespace": namespace,
+                "dtype": dtype,
+                "dimension": int(matrix.shape[1]),
+                "count": len(ids),
+                "nlist": nlist,
+            },
+            f,
+        )
+
+
+def export_namespace(
+    index, namespace: str, path: str, dtype: str = "float16", nlist: int = 0
+) -> int:
+    """Write a snapshot of `namespace` from a Pinecone index to `path`.
+
+    Listing ids needs a serverless index. Returns the number of vectors.
+    """
+    ids = []
+    vectors = []
+    metadata = []
+    for page in index.list(namespace=namespace):
+        fetched = index.fetch(ids=page, namespace=namespace).vectors
+        for id in page:
+            vector = fetched.get(id)
+            if vector is None:
+                continue
+            ids.append(id)
+            vectors.append(vector.values)
+            metadata.append(vector.metadata or {})
+
+    if not ids:
+        raise ValueError(f"Namespace {namespace} has no vectors to export")
+
+    write_snapshot(path, namespace, ids, vectors, metadata, dtype=dtype, nlist=nlist)
+    return len(ids)
+
+
+if __name__ == "__main__":
+    from src.services.clients import get_clients
+
+    parser = argparse.ArgumentParser(
+        description="Export a Pinecone namespace to a local index snapshot."
+    )
+    parser.add_argument("namespace")
+    parser.add_argument("--dtype", choices=["float16", "int8"], default="float16")
+    parser.add_argument("--nlist", type=int, default=0)
+    args = parser.parse_args()
+
+    count = export_namespace(
+        get_clients().index,
+        args.namespace,
+        os.path.join(LOCAL_INDEX_DIR, args.namespace),
+        dtype=args.dtype,
+        nlist=args.nlist,
+    )
+    print(f"Exported {count} vectors from {args.namespace}")
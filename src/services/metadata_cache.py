@@ -0,0 +1,176 @@
+import functools
+import hashlib
+from typing import Dict, Iterable, List, Tuple
+
+from src.config.config import (
+    METADATA_CACHE_NEGATIVE_TTL,
+    METADATA_CACHE_SIZE,
+    METADATA_CACHE_TTL,
+)
+from src.services import metrics
+from src.services.clients import gather_limited, get_clients
+from src.services.tiered_cache import JsonCache
+
+XATA_PAGE_SIZE = 200
+
+# Stored for ids Xata has no record for, so repeated misses skip the lookup.
+MISSING = {}
+
+
+@functools.lru_cache(maxsize=64)
+def _scope(db_url: str, columns: Tuple[str, ...]) -> str:
+    return hashlib.sha1("\n".join((db_url, *columns)).encode()).hexdigest()[:16]
+
+
+class MetadataCache(JsonCache):
+    """Two-tier cache of Xata records.
+
+    Records are keyed by database and column set as well as table and id, so
+    lookups of other columns or another database never share an entry. Ids
+    with no record are cached too, under a shorter TTL, so records added to
+    Xata later still show up soon.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = METADATA_CACHE_SIZE,
+        ttl: int = METADATA_CACHE_TTL,
+        negative_ttl: int = METADATA_CACHE_NEGATIVE_TTL,
+    ):
+        super().__init__(maxsize, ttl, negative_ttl)
+
+    @staticmethod
+    def key(db_url: str, table: str, columns: List[str], id: str) -> str:
+        scope = _scope(db_url, tuple(sorted(columns)))
+        return f"metadata:{table}:{scope}:{id}"
+
+
+cache = MetadataCache()
+metrics.register_cache("metadata", cache)
+
+
+def _keys(
+    db_url: str, table: str, ids: Iterable[str], columns: List[str]
+) -> Dict[str, str]:
+    return {id: MetadataCache.key(db_url, table, columns, id) for id in set(ids)}
+
+
+def _split(keys: Dict[str, str], cached: Dict[str, dict]) -> Tuple[dict, list]:
+    records = {
+        id: cached[key] for id, key in keys.items() if key in cached and cached[key]
+    }
+    missing = [id for id, key in keys.items() if key not in cached]
+    return records, missing
+
+
+async def get_cached_records(
+    db_url: str, table: str, ids: Iterable[str], columns: List[str]
+) -> Tuple[dict, list]:
+    """Split ids into cached records and the ids that still need a lookup."""
+    keys = _keys(db_url, table, ids, columns)
+    return _split(keys, await cache.aget(list(keys.values())))
+
+
+def get_cached_records_sync(
+    db_url: str, table: str, ids: Iterable[str], columns: List[str]
+) -> Tuple[dict, list]:
+    """Blocking counterpart of get_cached_records for synchronous tool runs."""
+    keys = _keys(db_url, table, ids, columns)
+    return _split(keys, cache.get(list(keys.values())))
+
+
+def _payloads(key_column: str, ids: List[str], columns: List[str]) -> List[dict]:
+    return [
+        {
+            "columns": columns,
+            "filter": {
+                key_column: {"$any": ids[i : i + XATA_PAGE_SIZE]},
+            },
+            "page": {"size": XATA_PAGE_SIZE},
+        }
+        for i in range(0, len(ids), XATA_PAGE_SIZE)
+    ]
+
+
+def _collect(key_column: str, responses) -> Dict[str, dict]:
+    return {
+        record[key_column]: record
+        for response in responses
+        for record in response.get("records", [])
+    }
+
+
+def _entries(
+    db_url: str,
+    table: str,
+    ids: List[str],
+    columns: List[str],
+    fetched: Dict[str, dict],
+) -> Dict[str, dict]:
+    keys = _keys(db_url, table, ids, columns)
+    return {keys[id]: fetched.get(id, MISSING) for id in ids}
+
+
+async def fetch_missing_records(
+    db_url: str, table: str, key_column: str, ids: List[str], columns: List[str]
+) -> Dict[str, dict]:
+    """Query Xata for `ids` by `key_column` and cache what comes back.
+
+    Sends one `$any` query per page of ids. Ids with no record are cached as
+    missing.
+    """
+    if not ids:
+        return {}
+
+    responses = await gather_limited(
+        get_clients().xata_query(db_url, table, payload)
+        for payload in _payloads(key_column, ids, columns)
+    )
+    fetched = _collect(key_column, responses)
+    await cache.aset(_entries(db_url, table, ids, columns, fetched))
+    return fetched
+
+
+def fetch_missing_records_sync(
+    db_url: str, table: str, key_column: str, ids: List[str], columns: List[str]
+) -> Dict[str, dict]:
+    """Blocking counterpart of fetch_missing_records, querying page by page."""
+    if not ids:
+        return {}
+
+    xata = get_clients().xata(db_url)
+    with metrics.upstream("xata"):
+        responses = [
+            xata.data().query(table, payload)
+            for payload in _payloads(key_column, ids, columns)
+        ]
+    fetched = _collect(key_column, responses)
+    cache.set(_entries(db_url, table, ids, columns, fetched))
+    return fetched
+
+
+async def fetch_records(
+    db_url: str, table: str, key_column: str, ids: Iterable[str], columns: List[str]
+) -> Dict[str, dict]:
+    """Look up Xata records by `key_column`, querying only the ids not cached.
+
+    Returns the records found, keyed by id.
+    """
+    with metrics.stage("enrich"):
+        records, missing = await get_cached_records(db_url, table, ids, columns)
+        records.update(
+            await fetch_missing_records(db_url, table, key_column, missing, columns)
+        )
+    return records
+
+
+def fetch_records_sync(
+    db_url: str, table: str, key_column: str, ids: Iterable[str], columns: List[str]
+) -> Dict[str, dict]:
+    """Blocking counterpart of fetch_records for synchronous tool runs."""
+    with metrics.stage("enrich"):
+        records, missing = get_cached_records_sync(db_url, table, ids, columns)
+        records.update(
+            fetch_missing_records_sync(db_url, table, key_column, missing, columns)
+        )
+    return records
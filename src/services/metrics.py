@@ -0,0 +1,315 @@
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Sequence, Tuple
+
+from src.config.config import METRICS_BUCKETS
+from src.services import timing
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Statuses the OpenAI client retries while it has attempts left.
+RETRYABLE_STATUSES = (408, 409, 429)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.label_names = tuple(labels)
+        self._lock = threading.Lock()
+        REGISTRY.append(self)
+
+    def _key(self, labels: dict) -> Tuple[str, ...]:
+        return tuple(str(labels[name]) for name in self.label_names)
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()):
+        super().__init__(name, help, labels)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self) -> List[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        return self.header() + [
+            f"{self.name}{_labels(self.label_names, key)} {_number(value)}"
+            for key, value in values
+        ]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labels: Sequence[str] = (),
+        buckets: Sequence[float] = METRICS_BUCKETS,
+    ):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+        # Per label set: count of observations in each bucket, then the sum.
+        self._values: Dict[Tuple[str, ...], Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            counts, total = self._values.setdefault(
+                key, ([0] * len(self.buckets), [0.0])
+            )
+            counts[index] += 1
+            total[0] += value
+
+    @contextmanager
+    def time(self, **labels) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            values = sorted(
+                (key, (list(counts), total[0]))
+                for key, (counts, total) in self._values.items()
+            )
+        lines = self.header()
+        for key, (counts, total) in values:
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                le = _labels(self.label_names, key, f'le="{_number(bound)}"')
+                lines.append(f"{self.name}_bucket{le} {cumulative}")
+            labels = _labels(self.label_names, key)
+            lines.append(f"{self.name}_sum{labels} {_number(total)}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+REGISTRY: List[_Metric] = []
+_caches: Dict[str, object] = {}
+
+REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "Time to serve an HTTP request, including streamed bodies.",
+    ("method", "route", "status"),
+)
+REQUESTS_IN_FLIGHT = Gauge(
+    "http_requests_in_flight", "HTTP requests being served.", ("method",)
+)
+STAGE_DURATION = Histogram(
+    "stage_duration_seconds",
+    "Time spent in one stage of a search or tool run.",
+    ("stage",),
+)
+UPSTREAM_DURATION = Histogram(
+    "upstream_duration_seconds",
+    "Time of calls to upstream services, including failed ones.",
+    ("upstream",),
+)
+UPSTREAM_IN_FLIGHT = Gauge(
+    "upstream_in_flight", "Upstream calls waiting for a reply.", ("upstream",)
+)
+UPSTREAM_ERRORS = Counter(
+    "upstream_errors_total",
+    "Upstream calls that raised, by exception type.",
+    ("upstream", "error"),
+)
+UPSTREAM_RETRIES = Counter(
+    "upstream_retries_total",
+    "Upstream responses with a status the OpenAI client retries "
+    "(408, 409, 429 and 5xx).",
+    ("upstream",),
+)
+UPLOAD_STORE_BYTES = Gauge(
+    "upload_store_bytes",
+    "Disk used by the upload store at the last sweep, by kind of file.",
+    ("kind",),
+)
+UPLOAD_STORE_FILES = Gauge(
+    "upload_store_files", "Distinct files in the upload store at the last sweep."
+)
+UPLOAD_STORE_QUOTA = Gauge(
+    "upload_store_quota_bytes", "Disk space the upload store is evicted down to."
+)
+UPLOAD_STORE_UPLOADS = Counter(
+    "upload_store_uploads_total",
+    "Uploads stored, by whether the same bytes were already stored.",
+    ("result",),
+)
+UPLOAD_STORE_SAVED_BYTES = Counter(
+    "upload_store_deduplicated_bytes_total",
+    "Bytes not stored again because an identical file was already stored.",
+)
+UPLOAD_STORE_ARTIFACTS = Counter(
+    "upload_store_artifacts_total",
+    "Lookups of artifacts derived from stored files, by kind and result.",
+    ("kind", "result"),
+)
+UPLOAD_STORE_EVICTIONS = Counter(
+    "upload_store_evictions_total",
+    "Stored files evicted, by reason.",
+    ("reason",),
+)
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """Time a block as one stage of a request, in sync or async code.
+
+    The duration also goes into the Server-Timing breakdown of the request
+    being served.
+    """
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe_stage(name, time.perf_counter() - started)
+
+
+def observe_stage(name: str, seconds: float):
+    STAGE_DURATION.observe(seconds, stage=name)
+    timing.record(name, seconds)
+
+
+@contextmanager
+def upstream(name: str) -> Iterator[None]:
+    """Time a call to an upstream service and count it if it raises."""
+    UPSTREAM_IN_FLIGHT.inc(upstream=name)
+    try:
+        with UPSTREAM_DURATION.time(upstream=name):
+            yield
+    except Exception as e:
+        UPSTREAM_ERRORS.inc(upstream=name, error=type(e).__name__)
+        raise
+    finally:
+        UPSTREAM_IN_FLIGHT.dec(upstream=name)
+
+
+def count_retryable(upstream: str, status: int):
+    if status in RETRYABLE_STATUSES or status >= 500:
+        UPSTREAM_RETRIES.inc(upstream=upstream)
+
+
+def register_cache(name: str, cache):
+    """Report the hit ratio of a cache with a `stats()` method on /metrics."""
+    _caches[name] = cache
+
+
+def _render_caches() -> List[str]:
+    stats = {name: cache.stats() for name, cache in sorted(_caches.items())}
+    lines = [
+        "# HELP cache_hits_total Cache lookups answered, by tier.",
+        "# TYPE cache_hits_total counter",
+    ]
+    for name, stat in stats.items():
+        for tier in ("lru", "redis"):
+            labels = _labels(("cache", "tier"), (name, tier))
+            lines.append(f"cache_hits_total{labels} {stat[f'{tier}_hits']}")
+    metrics = (
+        ("cache_misses_total", "counter", "Cache lookups not answered.", "misses"),
+        ("cache_hit_ratio", "gauge", "Share of cache lookups answered.", "hit_ratio"),
+        ("cache_size", "gauge", "Entries held in process.", "size"),
+    )
+    for metric, kind, help, field in metrics:
+        lines += [f"# HELP {metric} {help}", f"# TYPE {metric} {kind}"]
+        lines += [
+            f"{metric}{_labels(('cache',), (name,))} {_number(stat[field])}"
+            for name, stat in stats.items()
+        ]
+    return lines
+
+
+def render() -> str:
+    """Return every metric in the Prometheus text exposition format."""
+    lines = []
+    for metric in REGISTRY:
+        lines += metric.render()
+    lines += _render_caches()
+    return "\n".join(lines) + "\n"
+
+
+class MetricsMiddleware:
+    """Record the duration of every HTTP request by route template and status.
+
+    Routes are labelled with their path template, such as
+    `/documents/{namespace}/{id:path}`, so ids in URLs do not add label values.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status = 500
+        started = time.perf_counter()
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        REQUESTS_IN_FLIGHT.inc(method=method)
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            REQUESTS_IN_FLIGHT.dec(method=method)
+            route = scope.get("route")
+            path = getattr(route, "path", None)
+            REQUEST_DURATION.observe(
+                time.perf_counter() - started,
+                method=method,
+                route=scope.get("root_path", "") + path if path else "unmatched",
+                status=status,
+            )
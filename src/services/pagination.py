@@ -0,0 +1,77 @@
+import base64
+import binascii
+import uuid
+from typing import Optional, Tuple
+
+from src.config.config import SEARCH_CURSOR_CACHE_SIZE, SEARCH_CURSOR_TTL
+from src.services import metrics
+from src.services.tiered_cache import JsonCache
+
+
+class CursorCache(JsonCache):
+    """Short-lived cache of search results, paged through with cursors.
+
+    Only result sets with more than one page are stored, so there are no
+    negative entries and everything expires after `ttl`.
+    """
+
+    def __init__(
+        self, maxsize: int = SEARCH_CURSOR_CACHE_SIZE, ttl: int = SEARCH_CURSOR_TTL
+    ):
+        super().__init__(maxsize, ttl, negative_ttl=ttl)
+
+    @staticmethod
+    def key(token: str) -> str:
+        return f"cursor:{token}"
+
+
+cache = CursorCache()
+metrics.register_cache("cursor", cache)
+
+
+def _encode(token: str, offset: int) -> str:
+    cursor = f"{token}:{offset}".encode()
+    return base64.urlsafe_b64encode(cursor).decode().rstrip("=")
+
+
+def _decode(cursor: str) -> Tuple[str, int]:
+    padded = cursor + "=" * (-len(cursor) % 4)
+    try:
+        token, _, offset = base64.urlsafe_b64decode(padded).decode().partition(":")
+        # Only plain digits, so no sign, whitespace or other numerals get in.
+        if not (offset.isascii() and offset.isdigit()):
+            raise ValueError(offset)
+        return token, int(offset)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise ValueError("Invalid cursor")
+
+
+def _page(token: str, results: list, offset: int, page_size: int) -> dict:
+    end = offset + page_size
+    return {
+        "result": results[offset:end],
+        "next_cursor": _encode(token, end) if end < len(results) else None,
+    }
+
+
+async def first_page(results: list, page_size: int) -> dict:
+    """Return the first page of `results`, keeping the rest for later pages."""
+    token = uuid.uuid4().hex
+    if len(results) > page_size:
+        await cache.aset(
+            {CursorCache.key(token): {"results": results, "page_size": page_size}}
+        )
+    return _page(token, results, 0, page_size)
+
+
+async def next_page(cursor: str) -> Optional[dict]:
+    """Return the page a cursor points to, or None once the results expired.
+
+    Raises ValueError if the cursor is malformed.
+    """
+    token, offset = _decode(cursor)
+    key = CursorCache.key(token)
+    entry = (await cache.aget([key])).get(key)
+    if not entry:
+        return None
+    return _page(token, entry["results"], offset, entry["page_size"])
@@ -0,0 +1,18 @@
+from typing import Iterable, List, Optional
+
+# The fields the LangChain tools pass on to the model.
+RESULT_FIELDS = ("content", "source")
+
+
+def project(results: List[dict], fields: Optional[Iterable[str]]) -> List[dict]:
+    """Keep only `fields` of each result, skipping fields a result lacks.
+
+    Results are returned whole if no fields are given.
+    """
+    if not fields:
+        return results
+    fields = list(fields)
+    return [
+        {field: result[field] for field in fields if field in result}
+        for result in results
+    ]
@@ -0,0 +1,118 @@
+import math
+import re
+import unicodedata
+from typing import Callable, List, Sequence, TypeVar
+
+from src.config.config import RERANK_RRF_K
+
+T = TypeVar("T")
+
+# Hiragana, katakana, CJK ideographs and hangul, which are written without
+# spaces and are indexed as overlapping character bigrams instead of words.
+CJK = "\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af\uf900-\ufaff"
+
+# Words joined by inner separators, such as "GB/T", "24040-2008" and
+# "1,2-dichloroethane", are tokens of their own as well as their parts.
+_WORD = re.compile(rf"[^\W_{CJK}]+")
+_COMPOUND = re.compile(rf"[^\W_{CJK}]+(?:[.,\-/][^\W_{CJK}]+)+")
+_BIGRAM = re.compile(rf"(?=([{CJK}]{{2}}))")
+_SINGLE = re.compile(rf"(?<![{CJK}])[{CJK}](?![{CJK}])")
+_WORD_CHAR = re.compile(rf"[^\W_{CJK}]")
+
+K1 = 1.5
+B = 0.75
+
+
+def _normalize(text: str) -> str:
+    return unicodedata.normalize("NFKC", text).casefold()
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into casefolded words and CJK character bigrams."""
+    text = _normalize(text)
+    return (
+        _WORD.findall(text)
+        + _COMPOUND.findall(text)
+        + _BIGRAM.findall(text)
+        + _SINGLE.findall(text)
+    )
+
+
+def _term_counter(token: str) -> Callable[[str], int]:
+    """Return a function counting `token` in normalized text.
+
+    CJK tokens are plain substrings. Word tokens must not run into other word
+    characters; the pattern starts with the literal token so `re` can skip
+    ahead to candidate positions, and only those are checked on the left.
+    """
+    if not _WORD_CHAR.match(token):
+        return lambda text: text.count(token)
+
+    pattern = re.compile(re.escape(token) + rf"(?![^\W_{CJK}])")
+
+    def count(text: str) -> int:
+        return sum(
+            1
+            for match in pattern.finditer(text)
+            if not match.start() or not _WORD_CHAR.match(text, match.start() - 1)
+        )
+
+    return count
+
+
+def bm25_scores(query: str, texts: Sequence[str]) -> List[float]:
+    """Score `texts` against `query` with BM25, using `texts` as the corpus.
+
+    Texts are only scanned for the query's terms instead of being tokenized,
+    and their length is measured in characters.
+    """
+    terms = set(tokenize(query))
+    if not texts or not terms:
+        return [0.0] * len(texts)
+
+    texts = [_normalize(text) for text in texts]
+    lengths = [len(text) for text in texts]
+    avg_length = sum(lengths) / len(lengths) or 1.0
+
+    weighted = []
+    for term in terms:
+        count = _term_counter(term)
+        tfs = [count(text) for text in texts]
+        df = sum(1 for tf in tfs if tf)
+        if df:
+            idf = math.log(1 + (len(texts) - df + 0.5) / (df + 0.5))
+            weighted.append((idf, tfs))
+
+    scores = []
+    for i, length in enumerate(lengths):
+        norm = K1 * (1 - B + B * length / avg_length)
+        score = 0.0
+        for idf, tfs in weighted:
+            tf = tfs[i]
+            if tf:
+                score += idf * tf * (K1 + 1) / (tf + norm)
+        scores.append(score)
+    return scores
+
+
+def rerank_hits(
+    query: str, hits: List[T], text: Callable[[T], str], top_k: int
+) -> List[T]:
+    """Fuse the given order of `hits` with their BM25 order and keep `top_k`.
+
+    Uses reciprocal rank fusion. Hits sharing no term with the query only
+    keep their dense rank, and ties stay in the given order.
+    """
+    scores = bm25_scores(query, [text(hit) for hit in hits])
+    lexical = sorted(
+        (i for i, score in enumerate(scores) if score > 0),
+        key=lambda i: scores[i],
+        reverse=True,
+    )
+
+    fused = [1 / (RERANK_RRF_K + rank + 1) for rank in range(len(hits))]
+    for rank, i in enumerate(lexical):
+        fused[i] += 1 / (RERANK_RRF_K + rank + 1)
+
+    order = sorted(range(len(hits)), key=lambda i: fused[i], reverse=True)
+    return [hits[i] for i in order[:top_k]]
@@ -0,0 +1,289 @@
+import asyncio
+from typing import AsyncIterator, Callable, List, Optional, Tuple
+
+from src.config.config import (
+    RERANK_OVERFETCH,
+    SEARCH_GROUP_OVERFETCH,
+    SEARCH_MAX_FETCH,
+    XATA_DOCS_DB_URL,
+)
+from src.services import metrics
+from src.services.clients import gather_limited, get_clients
+from src.services.context_windows import expand_documents, expand_hits
+from src.services.embeddings import embed_queries, embed_query, embed_query_sync
+from src.services.grouping import group_matches
+from src.services.metadata_cache import (
+    fetch_missing_records,
+    fetch_records,
+    fetch_records_sync,
+    get_cached_records,
+)
+from src.services.projection import project
+from src.services.rerank import rerank_hits
+
+
+def _record_id(doc) -> str:
+    return doc["id"].rpartition("_")[0]
+
+
+class ChunkSearch:
+    """Search over a namespace of text chunks whose records live in Xata.
+
+    Chunk ids are `<record id>_<chunk number>`. Each hit is enriched with the
+    row of `table` whose `key_column` is its record id, and turned into a
+    result by `format_match(doc, records_dict)`, which returns None for hits
+    whose record is missing.
+    """
+
+    def __init__(
+        self,
+        namespace: str,
+        table: str,
+        key_column: str,
+        columns: List[str],
+        format_match: Callable[[object, dict], Optional[dict]],
+    ):
+        self.namespace = namespace
+        self.table = table
+        self.key_column = key_column
+        self.columns = columns
+        self.format_match = format_match
+
+    async def _query(self, query_vector: List[float], top_k: int):
+        return await get_clients().query(
+            namespace=self.namespace,
+            vector=query_vector,
+            top_k=min(top_k, SEARCH_MAX_FETCH),
+            include_metadata=True,
+        )
+
+    async def _matches(
+        self, query_vector: List[float], top_k: int, query: Optional[str] = None
+    ):
+        if not query:
+            return (await self._query(query_vector, top_k))["matches"]
+
+        docs = await self._query(query_vector, top_k * RERANK_OVERFETCH)
+        with metrics.stage("rerank"):
+            return rerank_hits(
+                query, docs["matches"], lambda doc: doc.metadata["text"], top_k
+            )
+
+    async def _fetch_records(self, matches) -> dict:
+        return await fetch_records(
+            XATA_DOCS_DB_URL,
+            self.table,
+            self.key_column,
+            list({_record_id(doc) for doc in matches}),
+            self.columns,
+        )
+
+    def _format(self, matches, records_dict: dict, windows: Optional[dict] = None):
+        """Format the matches found in `records_dict`, with the content of each
+        replaced by its context window from `windows` when there is one.
+        """
+        with metrics.stage("format"):
+            docs_list = []
+            for doc in matches:
+                result = self.format_match(doc, records_dict)
+                if result:
+                    if windows:
+                        result["content"] = windows.get(doc["id"], result["content"])
+                    docs_list.append(result)
+
+        return docs_list
+
+    async def retrieve(
+        self,
+        query_vector: List[float],
+        top_k: int = 16,
+        rerank_query: Optional[str] = None,
+        expand_context: int = 0,
+    ) -> List[Tuple]:
+        """Search with a query vector, keeping each result's similarity score.
+
+        With `rerank_query`, more hits are fetched and re-ranked against it with
+        BM25 before the top `top_k` are kept. With `expand_context`, each
+        result's content also holds that many neighboring chunks on each side.
+        """
+
+        matches = await self._matches(query_vector, top_k, rerank_query)
+        records_dict, windows = await asyncio.gather(
+            self._fetch_records(matches),
+            expand_hits(self.namespace, matches, expand_context),
+        )
+
+        return [
+            (result["score"], result)
+            for result in self._format(matches, records_dict, windows)
+        ]
+
+    async def retrieve_documents(
+        self,
+        query_vector: List[float],
+        top_k: int = 16,
+        rerank_query: Optional[str] = None,
+        expand_context: int = 0,
+    ) -> List[dict]:
+        """Search with a query vector, merging chunk hits into `top_k` documents.
+
+        Hits are over-fetched so that enough distinct documents come back. Each
+        document keeps its best score and its chunk texts in chunk order. With
+        `expand_context`, the chunk texts are widened by that many neighboring
+        chunks on each side, and overlapping windows are stitched together.
+        """
+
+        matches = await self._matches(
+            query_vector, top_k * SEARCH_GROUP_OVERFETCH, rerank_query
+        )
+        groups = group_matches(matches, top_k)
+        records_dict, windows = await asyncio.gather(
+            self._fetch_records([docs[0] for _, docs in groups]),
+            expand_documents(self.namespace, groups, expand_context),
+        )
+
+        with metrics.stage("format"):
+            documents = []
+            for parent, docs in groups:
+                result = self.format_match(docs[0], records_dict)
+                if result:
+                    del result["content"]
+                    documents.append(
+                        {
+                            **result,
+                            "id": parent,
+                            "score": max(doc["score"] for doc in docs),
+                            "chunks": windows.get(parent)
+                            or [doc.metadata["text"] for doc in docs],
+                        }
+                    )
+
+        return documents
+
+    async def search(
+        self,
+        query: str,
+        top_k: int = 16,
+        rerank: bool = False,
+        group_by: Optional[str] = None,
+        expand_context: int = 0,
+        fields: Optional[List[str]] = None,
+    ) -> list:
+        """Semantic search with a query string.
+
+        With `group_by="document"`, returns one entry per document instead of
+        one per chunk. With `expand_context`, results include that many
+        neighboring chunks on each side of every hit. `fields` picks the keys
+        kept in each result, such as `id`, `source` and `score` for a list view.
+        """
+
+        query_vector = await embed_query(query)
+        rerank_query = query if rerank else None
+
+        if group_by == "document":
+            documents = await self.retrieve_documents(
+                query_vector, top_k, rerank_query, expand_context
+            )
+            return project(documents, fields)
+
+        scored = await self.retrieve(query_vector, top_k, rerank_query, expand_context)
+        return project([result for _, result in scored], fields)
+
+    def search_sync(
+        self, query: str, top_k: int = 16, fields: Optional[List[str]] = None
+    ) -> list:
+        """Blocking counterpart of `search` for synchronous tool runs.
+
+        Records are looked up through the same metadata cache.
+        """
+
+        query_vector = embed_query_sync(query)
+        with metrics.stage("query"), metrics.upstream("pinecone"):
+            docs = get_clients().index.query(
+                namespace=self.namespace,
+                vector=query_vector,
+                top_k=min(top_k, SEARCH_MAX_FETCH),
+                include_metadata=True,
+            )
+        records_dict = fetch_records_sync(
+            XATA_DOCS_DB_URL,
+            self.table,
+            self.key_column,
+            list({_record_id(doc) for doc in docs["matches"]}),
+            self.columns,
+        )
+        return project(self._format(docs["matches"], records_dict), fields)
+
+    async def search_batch(self, queries: List[str], top_k: int = 16) -> list:
+        """Semantic search for several queries, returned in input order."""
+
+        query_vectors = await embed_queries(queries)
+
+        docs = await gather_limited(
+            self._query(vector, top_k) for vector in query_vectors
+        )
+        records_dict = await self._fetch_records(
+            [matche for doc in docs for matche in doc["matches"]]
+        )
+
+        return [self._format(doc["matches"], records_dict) for doc in docs]
+
+    async def search_stream(
+        self, query: str, top_k: int = 16, raw_hits: bool = False, rerank: bool = False
+    ) -> AsyncIterator[dict]:
+        """Semantic search yielding each result as soon as it is enriched.
+
+        Results whose record is cached come first, the rest follow one Xata
+        lookup later. Every event carries the hit's rank in the Pinecone
+        order, or in the BM25 re-ranked order with `rerank`. With `raw_hits`,
+        the bare vector hits are sent up front with an empty source.
+        """
+
+        query_vector = await embed_query(query)
+        matches = await self._matches(query_vector, top_k, query if rerank else None)
+
+        if raw_hits:
+            for rank, doc in enumerate(matches):
+                yield {
+                    "event": "hit",
+                    "rank": rank,
+                    "score": doc["score"],
+                    "content": doc.metadata["text"],
+                    "source": "",
+                }
+
+        records_dict, missing = await get_cached_records(
+            XATA_DOCS_DB_URL,
+            self.table,
+            (_record_id(doc) for doc in matches),
+            self.columns,
+        )
+
+        deferred = []
+        for rank, doc in enumerate(matches):
+            if _record_id(doc) in missing:
+                deferred.append((rank, doc))
+                continue
+            result = self.format_match(doc, records_dict)
+            if result:
+                yield {"event": "result", "rank": rank, "score": doc["score"], **result}
+
+        if deferred:
+            records_dict.update(
+                await fetch_missing_records(
+                    XATA_DOCS_DB_URL,
+                    self.table,
+                    self.key_column,
+                    missing,
+                    self.columns,
+                )
+            )
+            for rank, doc in deferred:
+                result = self.format_match(doc, records_dict)
+                if result:
+                    yield {
+                        "event": "result",
+                        "rank": rank,
+                        "score": doc["score"],
+                        **result,
+                    }
@@ -0,0 +1,290 @@
+import asyncio
+import contextlib
+import errno
+import hashlib
+import os
+import uuid
+from typing import AsyncIterator, List, Optional, Tuple
+
+from redis.exceptions import LockError
+
+from src.config.config import (
+    UPLOAD_CHUNK_SIZE,
+    UPLOAD_LOCK_TIMEOUT,
+    UPLOAD_MAX_SIZE,
+    UPLOAD_RESUMABLE_TTL,
+)
+from src.services import metrics, upload_store
+from src.services.clients import get_clients
+from src.services.standalone.upload_file import (
+    UploadTooLarge,
+    check_session_id,
+    store_upload,
+    upload_slot,
+)
+
+
+class UploadNotFound(Exception):
+    pass
+
+
+class UploadConflict(Exception):
+    pass
+
+
+def upload_key(upload_id: str) -> str:
+    return f"upload:{upload_id}"
+
+
+def ranges_key(upload_id: str) -> str:
+    return f"upload:{upload_id}:ranges"
+
+
+def lock_key(upload_id: str) -> str:
+    return f"upload:{upload_id}:lock"
+
+
+def part_path(upload_id: str) -> str:
+    return upload_store.store_path(f".{upload_id}.upload")
+
+
+@contextlib.asynccontextmanager
+async def upload_lock(upload_id: str):
+    """Hold the upload's lock in Redis, shared by every worker.
+
+    Chunks, finalizing and deleting each take the lock, so none of them
+    overlap. Raises UploadConflict when another request holds it. The lock
+    expires UPLOAD_LOCK_TIMEOUT seconds after it was last renewed, so a
+    crashed worker does not keep the upload locked.
+    """
+    lock = get_clients().redis.lock(
+        lock_key(upload_id), timeout=UPLOAD_LOCK_TIMEOUT, blocking=False
+    )
+    if not await lock.acquire():
+        raise UploadConflict("Upload is busy with another request")
+    try:
+        yield lock
+    finally:
+        try:
+            await lock.release()
+        except LockError:
+            pass
+
+
+async def _renew(lock):
+    try:
+        await lock.reacquire()
+    except LockError:
+        raise UploadConflict("Upload lock expired")
+
+
+async def _run(func, *args):
+    return await asyncio.get_running_loop().run_in_executor(None, func, *args)
+
+
+def _preallocate(path: str, size: int):
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    try:
+        try:
+            os.posix_fallocate(fd, 0, size)
+        except (AttributeError, OSError) as e:
+            # Not every file system can reserve blocks; a sparse file will do.
+            if getattr(e, "errno", None) == errno.ENOSPC:
+                raise
+            os.ftruncate(fd, size)
+    except BaseException:
+        os.close(fd)
+        os.remove(path)
+        raise
+    os.close(fd)
+
+
+def _pwrite(fd: int, data: bytes, offset: int):
+    view = memoryview(data)
+    while view:
+        written = os.pwrite(fd, view, offset)
+        view = view[written:]
+        offset += written
+
+
+def _hash_file(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(UPLOAD_CHUNK_SIZE):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def coverage(ranges: List[Tuple[int, int]]) -> Tuple[int, int]:
+    """Return how far the received byte ranges reach without a gap from the
+    start of the file, and how many bytes they cover in all.
+    """
+    merged = []
+    for start, stop in sorted(ranges):
+        if merged and start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], stop)
+        else:
+            merged.append([start, stop])
+    offset = merged[0][1] if merged and merged[0][0] == 0 else 0
+    return offset, sum(stop - start for start, stop in merged)
+
+
+async def create_upload(session_id: str, size: int, content_type: str = "") -> dict:
+    """Start a resumable upload of `size` bytes, preallocating its file.
+
+    State is kept in Redis for UPLOAD_RESUMABLE_TTL seconds after the last
+    chunk, so any worker sharing the upload store can take the next one.
+    """
+    if not session_id:
+        raise ValueError("session_id is required")
+    check_session_id(session_id)
+    if size < 0:
+        raise ValueError("size must not be negative")
+    if size > UPLOAD_MAX_SIZE:
+        raise UploadTooLarge(f"File exceeds the {UPLOAD_MAX_SIZE} byte limit")
+
+    upload_id = uuid.uuid4().hex
+    await _run(_preallocate, part_path(upload_id), size)
+    state = {
+        "upload_id": upload_id,
+        "session_id": session_id,
+        "size": size,
+        "content_type": content_type,
+    }
+    try:
+        async with get_clients().redis.pipeline(transaction=False) as pipe:
+            pipe.hset(upload_key(upload_id), mapping=state)
+            pipe.expire(upload_key(upload_id), UPLOAD_RESUMABLE_TTL)
+            await pipe.execute()
+    except BaseException:
+        await _run(os.remove, part_path(upload_id))
+        raise
+    return {**state, "offset": 0, "received": 0}
+
+
+async def get_upload(upload_id: str) -> dict:
+    """Return the state of an upload with the offset to resume from."""
+    async with get_clients().redis.pipeline(transaction=False) as pipe:
+        pipe.hgetall(upload_key(upload_id))
+        pipe.smembers(ranges_key(upload_id))
+        fields, members = await pipe.execute()
+    if not fields:
+        raise UploadNotFound(f"Upload {upload_id} not found")
+
+    state = {key.decode(): value.decode() for key, value in fields.items()}
+    state["size"] = int(state["size"])
+    ranges = [tuple(map(int, member.split(b":"))) for member in members]
+    state["offset"], state["received"] = coverage(ranges)
+    return state
+
+
+async def _record(upload_id: str, start: int, stop: int):
+    async with get_clients().redis.pipeline(transaction=False) as pipe:
+        pipe.sadd(ranges_key(upload_id), f"{start}:{stop}")
+        pipe.expire(ranges_key(upload_id), UPLOAD_RESUMABLE_TTL)
+        pipe.expire(upload_key(upload_id), UPLOAD_RESUMABLE_TTL)
+        await pipe.execute()
+
+
+async def write_chunk(
+    upload_id: str, offset: int, stream: AsyncIterator[bytes]
+) -> dict:
+    """Write a chunk at `offset` with positioned writes, off the event loop.
+
+    Chunks may arrive in any order and on any worker, one at a time per
+    upload. When the stream breaks off, the bytes received so far are still
+    written and recorded, so the client resumes from where it stopped.
+    Raises UploadNotFound, UploadConflict for an offset outside the file, an
+    upload busy with another request or being finalized, UploadTooLarge for a
+    chunk running past the declared size, and TooManyUploads.
+    """
+    async with upload_lock(upload_id) as lock:
+        state = await get_upload(upload_id)
+        if "finalizing" in state:
+            raise UploadConflict("Upload is being finalized")
+        size = state["size"]
+        if not 0 <= offset <= size:
+            raise UploadConflict(f"Offset must be between 0 and {size}")
+
+        written = 0
+        buffer = bytearray()
+        with upload_slot(), metrics.stage("upload"):
+            fd = await _run(os.open, part_path(upload_id), os.O_WRONLY)
+            try:
+                async for data in stream:
+                    if offset + written + len(buffer) + len(data) > size:
+                        raise UploadTooLarge(f"Chunk runs past the {size} byte upload")
+                    buffer += data
+                    if len(buffer) >= UPLOAD_CHUNK_SIZE:
+                        await _renew(lock)
+                        await _run(_pwrite, fd, bytes(buffer), offset + written)
+                        written += len(buffer)
+                        buffer.clear()
+            finally:
+                try:
+                    if buffer:
+                        await _renew(lock)
+                        await _run(_pwrite, fd, bytes(buffer), offset + written)
+                        written += len(buffer)
+                finally:
+                    await _run(os.close, fd)
+                    if written:
+                        await _record(upload_id, offset, offset + written)
+    return await get_upload(upload_id)
+
+
+async def _delete(upload_id: str):
+    redis = get_clients().redis
+    if not await redis.delete(upload_key(upload_id), ranges_key(upload_id)):
+        raise UploadNotFound(f"Upload {upload_id} not found")
+    try:
+        await _run(os.remove, part_path(upload_id))
+    except FileNotFoundError:
+        pass
+
+
+async def delete_upload(upload_id: str):
+    async with upload_lock(upload_id):
+        await _delete(upload_id)
+
+
+async def finalize_upload(upload_id: str, sha256: Optional[str] = None) -> dict:
+    """Check a fully received upload and store it like `handle_file_upload`.
+
+    The upload stays locked throughout, and chunks sent after finalizing
+    started are rejected. With `sha256`, an upload whose content does not
+    match is deleted and ValueError is raised.
+    """
+    async with upload_lock(upload_id) as lock:
+        state = await get_upload(upload_id)
+        if state["offset"] < state["size"]:
+            raise UploadConflict(f"Upload incomplete, resume from {state['offset']}")
+        redis = get_clients().redis
+        if not await redis.hsetnx(upload_key(upload_id), "finalizing", 1):
+            raise UploadConflict("Upload is already being finalized")
+
+        try:
+            with metrics.stage("upload"):
+                digest = await _run(_hash_file, part_path(upload_id))
+            await _renew(lock)
+            if sha256 and sha256.lower() != digest:
+                await _delete(upload_id)
+                raise ValueError("Uploaded content does not match sha256")
+            file_path = await _run(
+                store_upload,
+                part_path(upload_id),
+                state["session_id"],
+                state["content_type"],
+                digest,
+            )
+        except BaseException:
+            await redis.hdel(upload_key(upload_id), "finalizing")
+            raise
+        await redis.delete(upload_key(upload_id), ranges_key(upload_id))
+    return {
+        "file_path": file_path,
+        "session_id": state["session_id"],
+        "status": "success",
+        "size": state["size"],
+        "sha256": digest,
+    }
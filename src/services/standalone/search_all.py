@@ -0,0 +1,81 @@
+import asyncio
+import logging
+from typing import Dict, Optional
+
+from src.services.embeddings import embed_query
+from src.services.standalone import (
+    search_academic_db,
+    search_esg_db,
+    search_patent_db,
+    search_standard_db,
+)
+
+SOURCES = {
+    "academic": search_academic_db,
+    "patent": search_patent_db,
+    "standard": search_standard_db,
+    "esg": search_esg_db,
+}
+
+logger = logging.getLogger(__name__)
+
+
+async def search(
+    query: str, top_k: Dict[str, int], deadline: Optional[float] = None
+) -> dict:
+    """Semantic search across several namespaces with one query embedding.
+
+    Namespaces are queried and enriched concurrently; those asked for no
+    documents are skipped. Those that fail or are still running when
+    `deadline` seconds have passed are returned empty, listed under
+    `incomplete` and described in `errors`. The fused ranking merges every namespace by
+    similarity score, which is comparable because all namespaces share one
+    index and embedding model.
+    """
+
+    top_k = {name: k for name, k in top_k.items() if k > 0}
+    if not top_k:
+        return {"results": {}, "fused": [], "incomplete": [], "errors": {}}
+
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+
+    query_vector = await asyncio.wait_for(embed_query(query), deadline)
+
+    tasks = {
+        name: asyncio.ensure_future(SOURCES[name].retrieve(query_vector, k))
+        for name, k in top_k.items()
+    }
+    remaining = None if deadline is None else max(deadline - (loop.time() - started), 0)
+    _, pending = await asyncio.wait(tasks.values(), timeout=remaining)
+    for task in pending:
+        task.cancel()
+
+    results = {}
+    fused = []
+    incomplete = []
+    errors = {}
+    for name, task in tasks.items():
+        if task in pending:
+            errors[name] = "Deadline exceeded"
+        elif task.exception() is not None:
+            errors[name] = f"{type(task.exception()).__name__}: {task.exception()}"
+        if name in errors:
+            logger.warning("Search of %s namespace incomplete: %s", name, errors[name])
+            results[name] = []
+            incomplete.append(name)
+            continue
+        results[name] = [result for _, result in task.result()]
+        fused.extend(
+            {"namespace": name, "score": score, **result}
+            for score, result in task.result()
+        )
+
+    fused.sort(key=lambda item: item["score"], reverse=True)
+
+    return {
+        "results": results,
+        "fused": fused,
+        "incomplete": incomplete,
+        "errors": errors,
+    }
@@ -0,0 +1,48 @@
+from typing import List, Optional, Tuple
+
+from src.config.config import PINECONE_NAMESPACE_ESG
+from src.services.clients import get_clients
+from src.services.embeddings import embed_query
+
+
+async def _query(
+    query_vector: List[float], top_k: int, doc_ids: Optional[List[str]] = None
+):
+    filter = None
+    if doc_ids:
+        filter = {"rec_id": {"$in": doc_ids}}
+
+    return await get_clients().query(
+        namespace=PINECONE_NAMESPACE_ESG,
+        vector=query_vector,
+        filter=filter,
+        top_k=top_k,
+        include_metadata=True,
+    )
+
+
+def _format_match(doc) -> dict:
+    return {
+        "content": doc.metadata["text"],
+        "source": doc.metadata.get("rec_id", doc["id"]),
+    }
+
+
+async def retrieve(
+    query_vector: List[float], top_k: int = 16, doc_ids: Optional[List[str]] = None
+) -> List[Tuple]:
+    """Search with a query vector, keeping each result's similarity score."""
+
+    docs = await _query(query_vector, top_k, doc_ids)
+
+    return [(doc["score"], _format_match(doc)) for doc in docs["matches"]]
+
+
+async def search(
+    query: str, top_k: int = 16, doc_ids: Optional[List[str]] = None
+) -> str:
+    """Semantic search in ESG vector database."""
+
+    query_vector = await embed_query(query)
+
+    return [result for _, result in await retrieve(query_vector, top_k, doc_ids)]
@@ -1,53 +1,139 @@
 import datetime
-
-from openai import OpenAI
-from pinecone import Pinecone
+from typing import AsyncIterator, List, Optional, Tuple
 
 from src.config.config import (
-    OPENAI_API_KEY,
-    OPENAI_EMBEDDING_MODEL_V3,
-    PINECONE_API_KEY,
-    PINECONE_INDEX_NAME,
     PINECONE_NAMESPACE_PATENT,
+    RERANK_OVERFETCH,
+    SEARCH_MAX_FETCH,
 )
+from src.services import metrics
+from src.services.clients import gather_limited, get_clients
+from src.services.embeddings import embed_queries, embed_query, embed_query_sync
+from src.services.projection import project
+from src.services.rerank import rerank_hits
 
 
-async def search(query: str, top_k: int = 16) -> str:
-    """Semantic search in patents vector database."""
+async def _query(query_vector: List[float], top_k: int):
+    return await get_clients().query(
+        namespace=PINECONE_NAMESPACE_PATENT,
+        vector=query_vector,
+        top_k=min(top_k, SEARCH_MAX_FETCH),
+        include_metadata=True,
+    )
 
-    openai_client = OpenAI(api_key=OPENAI_API_KEY)
 
-    pc = Pinecone(api_key=PINECONE_API_KEY)
-    idx = pc.Index(PINECONE_INDEX_NAME)
+async def _matches(query_vector: List[float], top_k: int, query: Optional[str] = None):
+    if not query:
+        return (await _query(query_vector, top_k))["matches"]
 
-    response = openai_client.embeddings.create(
-        input=query, model=OPENAI_EMBEDDING_MODEL_V3
-    )
-    query_vector = response.data[0].embedding
+    docs = await _query(query_vector, top_k * RERANK_OVERFETCH)
+    with metrics.stage("rerank"):
+        return rerank_hits(
+            query, docs["matches"], lambda doc: doc.metadata["abstract"], top_k
+        )
 
-    docs = idx.query(
-        namespace=PINECONE_NAMESPACE_PATENT,
-        vector=query_vector,
-        top_k=top_k,
-        include_metadata=True,
+
+def _format_match(doc) -> dict:
+    date = datetime.datetime.fromtimestamp(doc.metadata["publication_date"])
+    formatted_date = date.strftime("%Y-%m-%d")
+    country = doc.metadata["country"]
+    url = doc.metadata["url"]
+    title = doc.metadata["title"]
+    id = doc["id"]
+
+    source_entry = "[{}. {}. {}. {}.]({})".format(
+        id,
+        title,
+        country,
+        formatted_date,
+        url,
     )
+    return {
+        "id": doc["id"],
+        "content": doc.metadata["abstract"],
+        "source": source_entry,
+        "title": title,
+        "date": formatted_date,
+        "url": url,
+        "score": doc["score"],
+    }
+
+
+def _format(matches) -> list:
+    with metrics.stage("format"):
+        return [_format_match(doc) for doc in matches]
+
+
+async def retrieve(
+    query_vector: List[float], top_k: int = 16, rerank_query: Optional[str] = None
+) -> List[Tuple]:
+    """Search with a query vector, keeping each result's similarity score.
+
+    With `rerank_query`, more hits are fetched and re-ranked against it with
+    BM25 before the top `top_k` are kept.
+    """
+
+    matches = await _matches(query_vector, top_k, rerank_query)
 
-    docs_list = []
-    for doc in docs["matches"]:
-        date = datetime.datetime.fromtimestamp(doc.metadata["publication_date"])
-        formatted_date = date.strftime("%Y-%m-%d")
-        country = doc.metadata["country"]
-        url = doc.metadata["url"]
-        title = doc.metadata["title"]
-        id = doc["id"]
-
-        source_entry = "[{}. {}. {}. {}.]({})".format(
-            id,
-            title,
-            country,
-            formatted_date,
-            url,
+    with metrics.stage("format"):
+        return [(doc["score"], _format_match(doc)) for doc in matches]
+
+
+async def search(
+    query: str,
+    top_k: int = 16,
+    rerank: bool = False,
+    fields: Optional[List[str]] = None,
+) -> list:
+    """Semantic search in patents vector database.
+
+    `fields` picks the keys kept in each result, such as `id`, `source` and
+    `score` for a list view.
+    """
+
+    query_vector = await embed_query(query)
+
+    scored = await retrieve(query_vector, top_k, query if rerank else None)
+    return project([result for _, result in scored], fields)
+
+
+def search_sync(
+    query: str, top_k: int = 16, fields: Optional[List[str]] = None
+) -> list:
+    """Blocking counterpart of `search` for synchronous tool runs."""
+
+    query_vector = embed_query_sync(query)
+    with metrics.stage("query"), metrics.upstream("pinecone"):
+        docs = get_clients().index.query(
+            namespace=PINECONE_NAMESPACE_PATENT,
+            vector=query_vector,
+            top_k=min(top_k, SEARCH_MAX_FETCH),
+            include_metadata=True,
         )
-        docs_list.append({"content": doc.metadata["abstract"], "source": source_entry})
+    return project(_format(docs["matches"]), fields)
+
+
+async def search_batch(queries: List[str], top_k: int = 16) -> list:
+    """Semantic search for several queries, returned in input order."""
+
+    query_vectors = await embed_queries(queries)
+
+    docs = await gather_limited(_query(vector, top_k) for vector in query_vectors)
+
+    return [_format(doc["matches"]) for doc in docs]
+
+
+async def search_stream(
+    query: str, top_k: int = 16, raw_hits: bool = False, rerank: bool = False
+) -> AsyncIterator[dict]:
+    """Semantic search yielding each result with its rank in the Pinecone order,
+    or in the BM25 re-ranked order with `rerank`.
+
+    Patent hits need no enrichment, so `raw_hits` has nothing extra to send.
+    """
+
+    query_vector = await embed_query(query)
 
-    return docs_list
+    scored = await retrieve(query_vector, top_k, query if rerank else None)
+    for rank, (score, result) in enumerate(scored):
+        yield {"event": "result", "rank": rank, "score": score, **result}
@@ -1,17 +1,232 @@
+import asyncio
+import hashlib
 import mimetypes
+import os
 import uuid
+from contextlib import contextmanager
+from typing import AsyncIterator, Dict, List, Optional, Tuple
 
-from fastapi import File
+from multipart.multipart import MultipartParser, parse_options_header
 
+from src.config.config import (
+    UPLOAD_CHUNK_SIZE,
+    UPLOAD_MAX_CONCURRENT,
+    UPLOAD_MAX_SIZE,
+)
+from src.services import metrics, upload_store
 
-async def handle_file_upload(file: File, session_id: str) -> dict:
-    file_content = await file.read()
-    extension = mimetypes.guess_extension(file.content_type)
-    file_path = f"/tmp/{session_id}_{uuid.uuid4()}{extension}"
-    with open(file_path, "wb") as f:
-        f.write(file_content)
+# Limit for the plain form fields sent next to the file, such as session_id.
+MAX_FIELD_SIZE = 64 * 1024
+
+_uploads = 0
+
+
+class UploadTooLarge(Exception):
+    pass
+
+
+class TooManyUploads(Exception):
+    pass
+
+
+@contextmanager
+def upload_slot():
+    """Hold one of the UPLOAD_MAX_CONCURRENT upload slots of this process."""
+    global _uploads
+    if _uploads >= UPLOAD_MAX_CONCURRENT:
+        raise TooManyUploads("Too many uploads in progress, retry later")
+    _uploads += 1
+    try:
+        yield
+    finally:
+        _uploads -= 1
+
+
+class ChunkedWriter:
+    """Write a byte stream to a file in fixed-size chunks, off the event loop.
+
+    Incoming data is buffered until `chunk_size` bytes are waiting, so memory
+    stays bounded by one chunk whatever the file size. The SHA-256 of the
+    content is computed in the same thread as the writes.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        chunk_size: int = UPLOAD_CHUNK_SIZE,
+        max_size: int = UPLOAD_MAX_SIZE,
+    ):
+        self.path = path
+        self.chunk_size = chunk_size
+        self.max_size = max_size
+        self.size = 0
+        self.sha256 = hashlib.sha256()
+        self._buffer = bytearray()
+        self._file = None
+
+    @staticmethod
+    async def _run(func, *args):
+        return await asyncio.get_running_loop().run_in_executor(None, func, *args)
+
+    def _write_chunk(self, chunk: bytes):
+        self._file.write(chunk)
+        self.sha256.update(chunk)
+
+    async def open(self):
+        self._file = await self._run(open, self.path, "xb")
+
+    async def write(self, data: bytes):
+        self.size += len(data)
+        if self.size > self.max_size:
+            raise UploadTooLarge(f"File exceeds the {self.max_size} byte limit")
+        self._buffer += data
+        while len(self._buffer) >= self.chunk_size:
+            chunk = bytes(self._buffer[: self.chunk_size])
+            del self._buffer[: self.chunk_size]
+            await self._run(self._write_chunk, chunk)
+
+    async def close(self):
+        if self._buffer:
+            await self._run(self._write_chunk, bytes(self._buffer))
+            self._buffer.clear()
+        await self._run(self._file.close)
+
+    async def discard(self):
+        if self._file is not None:
+            await self._run(self._file.close)
+            await self._run(os.remove, self.path)
+
+
+def check_session_id(session_id: str):
+    if os.sep in session_id or session_id in (".", ".."):
+        raise ValueError("Invalid session_id")
+
+
+def store_upload(path: str, session_id: str, content_type: str, sha256: str) -> str:
+    """Add a completely received file to the upload store and return its path."""
+    extension = mimetypes.guess_extension(content_type) or ""
+    return upload_store.add(path, sha256, session_id, extension)
+
+
+class StreamingForm:
+    """Read a multipart form as it arrives, writing its `file` part to disk.
+
+    The parser callbacks only record events; they are handled between reads
+    so the file writes can be awaited.
+    """
+
+    def __init__(self, boundary: bytes, file_path: str):
+        self.file_path = file_path
+        self.fields: Dict[str, bytearray] = {}
+        self.file: Optional[ChunkedWriter] = None
+        self.file_type = ""
+        self._events: List[Tuple[str, bytes]] = []
+        self._headers: Dict[bytes, bytes] = {}
+        self._header = [b"", b""]
+        self._name = ""
+        self._parser = MultipartParser(
+            boundary,
+            {
+                "on_part_begin": lambda: self._events.append(("begin", b"")),
+                "on_header_field": lambda d, s, e: self._events.append(
+                    ("field", d[s:e])
+                ),
+                "on_header_value": lambda d, s, e: self._events.append(
+                    ("value", d[s:e])
+                ),
+                "on_header_end": lambda: self._events.append(("header_end", b"")),
+                "on_headers_finished": lambda: self._events.append(("headers", b"")),
+                "on_part_data": lambda d, s, e: self._events.append(("data", d[s:e])),
+            },
+        )
+
+    async def feed(self, chunk: bytes):
+        self._parser.write(chunk)
+        for kind, data in self._events:
+            if kind == "begin":
+                self._headers = {}
+            elif kind == "field":
+                self._header[0] += data
+            elif kind == "value":
+                self._header[1] += data
+            elif kind == "header_end":
+                self._headers[self._header[0].lower()] = self._header[1]
+                self._header = [b"", b""]
+            elif kind == "headers":
+                await self._start_part()
+            elif self._name == "file":
+                await self.file.write(data)
+            else:
+                field = self.fields[self._name]
+                field += data
+                if len(field) > MAX_FIELD_SIZE:
+                    raise ValueError(f"Form field {self._name} is too large")
+        self._events.clear()
+
+    async def _start_part(self):
+        _, options = parse_options_header(self._headers.get(b"content-disposition"))
+        self._name = options.get(b"name", b"").decode()
+        if self._name != "file":
+            self.fields[self._name] = bytearray()
+            return
+        if self.file is not None:
+            raise ValueError("Only one file can be uploaded at a time")
+        self.file = ChunkedWriter(self.file_path)
+        await self.file.open()
+        self.file_type = self._headers.get(b"content-type", b"").decode("latin-1")
+
+    def finalize(self):
+        self._parser.finalize()
+
+    def field(self, name: str) -> Optional[str]:
+        value = self.fields.get(name)
+        return value.decode() if value is not None else None
+
+
+async def handle_file_upload(
+    stream: AsyncIterator[bytes],
+    content_type: str,
+    content_length: Optional[int] = None,
+) -> dict:
+    """Stream a multipart upload with `file` and `session_id` fields to disk.
+
+    Raises UploadTooLarge past UPLOAD_MAX_SIZE, TooManyUploads when this
+    process already handles UPLOAD_MAX_CONCURRENT uploads, and ValueError
+    for a malformed form.
+    """
+    _, params = parse_options_header(content_type)
+    boundary = params.get(b"boundary")
+    if not boundary:
+        raise ValueError("Expected a multipart/form-data body")
+    if content_length is not None and content_length > UPLOAD_MAX_SIZE + MAX_FIELD_SIZE:
+        raise UploadTooLarge(f"File exceeds the {UPLOAD_MAX_SIZE} byte limit")
+
+    with upload_slot(), metrics.stage("upload"):
+        # The session id may come after the file, so write to a temporary name.
+        form = StreamingForm(boundary, upload_store.store_path(f".{uuid.uuid4()}.part"))
+        try:
+            async for chunk in stream:
+                await form.feed(chunk)
+            form.finalize()
+
+            session_id = form.field("session_id")
+            if form.file is None or not session_id:
+                raise ValueError("Both file and session_id are required")
+            check_session_id(session_id)
+            await form.file.close()
+        except BaseException:
+            if form.file is not None:
+                await form.file.discard()
+            raise
+
+    sha256 = form.file.sha256.hexdigest()
+    file_path = await asyncio.get_running_loop().run_in_executor(
+        None, store_upload, form.file.path, session_id, form.file_type, sha256
+    )
     return {
         "file_path": file_path,
         "session_id": session_id,
         "status": "success",
+        "size": form.file.size,
+        "sha256": sha256,
     }
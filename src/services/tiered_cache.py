@@ -0,0 +1,160 @@
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+import redis
+
+from src.services.clients import get_clients
+
+logger = logging.getLogger(__name__)
+
+
+class TieredCache:
+    """In-process LRU with TTL in front of Redis, which every worker shares.
+
+    Subclasses build the keys and choose how values are stored in Redis with
+    `_dumps` and `_loads`; values are stored as given by default. Reads and
+    writes that fail on Redis are logged and fall back to the local tier.
+    """
+
+    def __init__(self, maxsize: int, ttl: int):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._lru: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.lru_hits = 0
+        self.redis_hits = 0
+        self.misses = 0
+
+    def _ttl(self, value: Any) -> int:
+        return self.ttl
+
+    def _dumps(self, value: Any):
+        return value
+
+    def _loads(self, data: bytes) -> Any:
+        return data
+
+    def _get_local(self, keys: List[str]) -> Dict[str, Any]:
+        now = time.monotonic()
+        found = {}
+        with self._lock:
+            for key in keys:
+                entry = self._lru.get(key)
+                if entry is None:
+                    continue
+                expires_at, value = entry
+                if expires_at < now:
+                    del self._lru[key]
+                    continue
+                self._lru.move_to_end(key)
+                found[key] = value
+            self.lru_hits += len(found)
+        return found
+
+    def _put_local(self, items: Dict[str, Any]):
+        now = time.monotonic()
+        with self._lock:
+            for key, value in items.items():
+                self._lru[key] = (now + self._ttl(value), value)
+                self._lru.move_to_end(key)
+            while len(self._lru) > self.maxsize:
+                self._lru.popitem(last=False)
+
+    def _record_remote(
+        self, keys: List[str], values: List[Optional[bytes]]
+    ) -> Dict[str, Any]:
+        hits = {
+            key: self._loads(data)
+            for key, data in zip(keys, values)
+            if data is not None
+        }
+        with self._lock:
+            self.redis_hits += len(hits)
+            self.misses += len(keys) - len(hits)
+        self._put_local(hits)
+        return hits
+
+    def _warn(self, action: str, e: Exception):
+        logger.warning("%s %s failed: %s", type(self).__name__, action, e)
+
+    async def aget(self, keys: List[str]) -> Dict[str, Any]:
+        found = self._get_local(keys)
+        remote = [key for key in keys if key not in found]
+        if remote:
+            try:
+                values = await get_clients().redis.mget(remote)
+            except (redis.RedisError, OSError) as e:
+                self._warn("read", e)
+                values = [None] * len(remote)
+            found.update(self._record_remote(remote, values))
+        return found
+
+    async def aset(self, items: Dict[str, Any]):
+        self._put_local(items)
+        try:
+            async with get_clients().redis.pipeline(transaction=False) as pipe:
+                for key, value in items.items():
+                    pipe.set(key, self._dumps(value), ex=self._ttl(value))
+                await pipe.execute()
+        except (redis.RedisError, OSError) as e:
+            self._warn("write", e)
+
+    def get(self, keys: List[str]) -> Dict[str, Any]:
+        found = self._get_local(keys)
+        remote = [key for key in keys if key not in found]
+        if remote:
+            try:
+                values = get_clients().redis_sync.mget(remote)
+            except (redis.RedisError, OSError) as e:
+                self._warn("read", e)
+                values = [None] * len(remote)
+            found.update(self._record_remote(remote, values))
+        return found
+
+    def set(self, items: Dict[str, Any]):
+        self._put_local(items)
+        try:
+            with get_clients().redis_sync.pipeline(transaction=False) as pipe:
+                for key, value in items.items():
+                    pipe.set(key, self._dumps(value), ex=self._ttl(value))
+                pipe.execute()
+        except (redis.RedisError, OSError) as e:
+            self._warn("write", e)
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.lru_hits + self.redis_hits + self.misses
+            return {
+                "size": len(self._lru),
+                "lru_hits": self.lru_hits,
+                "redis_hits": self.redis_hits,
+                "misses": self.misses,
+                "hit_ratio": (self.lru_hits + self.redis_hits) / lookups
+                if lookups
+                else 0.0,
+            }
+
+
+class JsonCache(TieredCache):
+    """Two-tier cache of dicts, stored as JSON in Redis.
+
+    An empty dict records a lookup that found nothing. It expires after
+    `negative_ttl`, so what shows up upstream later is found soon.
+    """
+
+    def __init__(self, maxsize: int, ttl: int, negative_ttl: int):
+        super().__init__(maxsize, ttl)
+        self.negative_ttl = negative_ttl
+
+    def _ttl(self, value: dict) -> int:
+        return self.ttl if value else self.negative_ttl
+
+    def _dumps(self, value: dict) -> str:
+        return json.dumps(value)
+
+    def _loads(self, data: bytes) -> dict:
+        return json.loads(data)
@@ -0,0 +1,168 @@
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, List, Optional
+from urllib.parse import parse_qs
+
+import orjson
+
+_current: ContextVar[Optional["RequestTimings"]] = ContextVar(
+    "request_timings", default=None
+)
+
+
+class RequestTimings:
+    """Stage durations and upstream request ids collected while serving one request.
+
+    Stages that run several times, such as one LLM call per agent step, are
+    summed.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self._stages: Dict[str, List[float]] = {}
+        self._request_ids: List[dict] = []
+        self._lock = threading.Lock()
+
+    def add(self, stage: str, seconds: float):
+        with self._lock:
+            total = self._stages.setdefault(stage, [0.0, 0])
+            total[0] += seconds
+            total[1] += 1
+
+    def add_request_id(self, upstream: str, request_id: str):
+        with self._lock:
+            self._request_ids.append({"upstream": upstream, "id": request_id})
+
+    def header(self) -> str:
+        """Return the stages as a Server-Timing header value, in milliseconds."""
+        with self._lock:
+            stages = list(self._stages.items())
+        elapsed = (time.perf_counter() - self.started) * 1000
+        return ", ".join(
+            [f"{stage};dur={seconds * 1000:.1f}" for stage, (seconds, _) in stages]
+            + [f"total;dur={elapsed:.1f}"]
+        )
+
+    def breakdown(self) -> dict:
+        with self._lock:
+            return {
+                "total_ms": round((time.perf_counter() - self.started) * 1000, 1),
+                "stages": {
+                    stage: {"ms": round(seconds * 1000, 1), "count": count}
+                    for stage, (seconds, count) in self._stages.items()
+                },
+                "request_ids": list(self._request_ids),
+            }
+
+
+@contextmanager
+def collect() -> Iterator[RequestTimings]:
+    """Collect the stages run inside the block, as for one request."""
+    timings = RequestTimings()
+    token = _current.set(timings)
+    try:
+        yield timings
+    finally:
+        _current.reset(token)
+
+
+def record(stage: str, seconds: float):
+    """Add a stage duration to the request being served, if any."""
+    timings = _current.get()
+    if timings is not None:
+        timings.add(stage, seconds)
+
+
+def record_request_id(upstream: str, request_id: Optional[str]):
+    timings = _current.get()
+    if timings is not None and request_id:
+        timings.add_request_id(upstream, request_id)
+
+
+def _debug_requested(scope) -> bool:
+    query = parse_qs(scope.get("query_string", b"").decode("latin-1"))
+    return query.get("debug", [""])[-1].lower() in ("1", "true")
+
+
+class ServerTimingMiddleware:
+    """Send the stage breakdown of every request in a Server-Timing header.
+
+    With `?debug=true`, JSON object bodies also get a `debug` field with the
+    breakdown and the upstream request ids. Those responses are sent
+    uncompressed so the body can be extended. Stages still running when a
+    streamed response starts are left out of its header.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with collect() as timings:
+            if _debug_requested(scope):
+                await self._debug(scope, receive, send, timings)
+            else:
+                await self.app(scope, receive, self._with_header(send, timings))
+
+    @staticmethod
+    def _with_header(send, timings: RequestTimings):
+        async def send_with_header(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers", [])) + [
+                    (b"server-timing", timings.header().encode("latin-1"))
+                ]
+            await send(message)
+
+        return send_with_header
+
+    async def _debug(self, scope, receive, send, timings: RequestTimings):
+        scope = dict(scope)
+        scope["headers"] = [
+            (name, value)
+            for name, value in scope["headers"]
+            if name.lower() != b"accept-encoding"
+        ]
+        send = self._with_header(send, timings)
+        start = None
+        chunks = []
+
+        async def send_buffered(message):
+            nonlocal start
+            if message["type"] == "http.response.start":
+                headers = dict(message.get("headers", []))
+                content_type = headers.get(b"content-type", b"")
+                if content_type.startswith(b"application/json"):
+                    start = message
+                    return
+            elif start is not None and message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+                if message.get("more_body", False):
+                    return
+                await self._send_with_breakdown(send, start, b"".join(chunks), timings)
+                return
+            await send(message)
+
+        await self.app(scope, receive, send_buffered)
+
+    @staticmethod
+    async def _send_with_breakdown(send, start, body: bytes, timings: RequestTimings):
+        try:
+            content = orjson.loads(body)
+        except orjson.JSONDecodeError:
+            content = None
+        if isinstance(content, dict):
+            content["debug"] = timings.breakdown()
+            body = orjson.dumps(content)
+
+        start["headers"] = [
+            (name, value)
+            for name, value in start.get("headers", [])
+            if name.lower() != b"content-length"
+        ] + [(b"content-length", str(len(body)).encode("latin-1"))]
+        await send(start)
+        await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,228 @@
+"""Content-addressed store for uploaded files.
+
+Each distinct file is stored once under its SHA-256 in `blobs/`, and every
+session uploading it gets a hard link to it in `sessions/<session_id>/`, so
+the path handed out reads like any other file. Anything derived from a file,
+such as its ingested index, is kept in `artifacts/<kind>/<sha256>` and
+evicted with it. The modification time of a blob records when it was last
+used.
+"""
+
+import asyncio
+import logging
+import os
+import shutil
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+from src.config.config import (
+    UPLOAD_DIR,
+    UPLOAD_QUOTA,
+    UPLOAD_RESUMABLE_TTL,
+    UPLOAD_SWEEP_INTERVAL,
+    UPLOAD_TTL,
+)
+from src.services import metrics
+
+logger = logging.getLogger(__name__)
+
+BLOBS = "blobs"
+SESSIONS = "sessions"
+ARTIFACTS = "artifacts"
+
+_prepared = False
+
+
+def store_path(*parts: str) -> str:
+    """Return a path in the store, creating its directories on first use."""
+    global _prepared
+    if not _prepared:
+        for directory in (BLOBS, SESSIONS, ARTIFACTS):
+            os.makedirs(os.path.join(UPLOAD_DIR, directory), exist_ok=True)
+        _prepared = True
+    return os.path.join(UPLOAD_DIR, *parts)
+
+
+def blob_path(sha256: str) -> str:
+    return store_path(BLOBS, sha256[:2], sha256)
+
+
+def artifact_path(sha256: str, kind: str) -> str:
+    """Return where the `kind` artifact derived from a stored file is kept."""
+    directory = store_path(ARTIFACTS, kind)
+    os.makedirs(directory, exist_ok=True)
+    return os.path.join(directory, sha256)
+
+
+def has_artifact(sha256: str, kind: str, name: str) -> bool:
+    """Check for an artifact by one of its files, and mark its blob as used."""
+    found = os.path.exists(os.path.join(artifact_path(sha256, kind), name))
+    metrics.UPLOAD_STORE_ARTIFACTS.inc(kind=kind, result="hit" if found else "miss")
+    if found:
+        touch(sha256)
+    return found
+
+
+def touch(sha256: str):
+    try:
+        os.utime(blob_path(sha256))
+    except FileNotFoundError:
+        pass
+
+
+def add(path: str, sha256: str, session_id: str, extension: str = "") -> str:
+    """Move a received file into the store and return the session's link to it.
+
+    When the same bytes are already stored, `path` is removed instead.
+    """
+    blob = blob_path(sha256)
+    reference = store_path(SESSIONS, session_id, sha256 + extension)
+
+    while True:
+        os.makedirs(os.path.dirname(blob), exist_ok=True)
+        os.makedirs(os.path.dirname(reference), exist_ok=True)
+        try:
+            os.link(path, blob)
+            stored = True
+        except FileExistsError:
+            stored = False
+        try:
+            os.link(blob, reference)
+        except FileExistsError:
+            pass
+        except FileNotFoundError:
+            # A sweep evicted the blob or removed the empty session
+            # directory in between, so try again.
+            continue
+        break
+
+    size = os.path.getsize(path)
+    os.remove(path)
+    if stored:
+        metrics.UPLOAD_STORE_UPLOADS.inc(result="stored")
+    else:
+        touch(sha256)
+        metrics.UPLOAD_STORE_UPLOADS.inc(result="deduplicated")
+        metrics.UPLOAD_STORE_SAVED_BYTES.inc(size)
+    return reference
+
+
+def _tree_size(path: str) -> int:
+    if not os.path.isdir(path):
+        return os.path.getsize(path)
+    return sum(
+        os.path.getsize(os.path.join(root, name))
+        for root, _, names in os.walk(path)
+        for name in names
+    )
+
+
+def _remove(path: str):
+    try:
+        if os.path.isdir(path) and not os.path.islink(path):
+            shutil.rmtree(path)
+        else:
+            os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def _scan(directory: str) -> List[os.DirEntry]:
+    try:
+        return list(os.scandir(directory))
+    except FileNotFoundError:
+        return []
+
+
+def sweep(now: Optional[float] = None) -> dict:
+    """Evict stored files unused for UPLOAD_TTL seconds, then the least
+    recently used ones until the store fits in UPLOAD_QUOTA bytes.
+
+    A file is evicted with its session links and artifacts. Temporary files
+    of uploads untouched for UPLOAD_RESUMABLE_TTL seconds are removed too.
+    Sweeps in several workers may overlap, so every removal tolerates the
+    file being gone already. Returns the usage after the sweep.
+    """
+    now = time.time() if now is None else now
+    store_path()
+
+    temporary = 0
+    for entry in _scan(UPLOAD_DIR):
+        if entry.name.startswith(".") and entry.is_file():
+            stat = entry.stat()
+            if now - stat.st_mtime > UPLOAD_RESUMABLE_TTL:
+                _remove(entry.path)
+            else:
+                temporary += stat.st_size
+
+    blobs = {}
+    for directory in _scan(store_path(BLOBS)):
+        for entry in _scan(directory.path):
+            stat = entry.stat()
+            blobs[entry.name] = (stat.st_mtime, stat.st_size)
+
+    references: Dict[str, List[str]] = defaultdict(list)
+    for session in _scan(store_path(SESSIONS)):
+        for entry in _scan(session.path):
+            references[entry.name[:64]].append(entry.path)
+
+    artifacts: Dict[str, List[str]] = defaultdict(list)
+    artifact_bytes: Dict[str, int] = defaultdict(int)
+    for kind in _scan(store_path(ARTIFACTS)):
+        for entry in _scan(kind.path):
+            # Artifacts being written have hidden names.
+            if not entry.name.startswith("."):
+                artifacts[entry.name].append(entry.path)
+                artifact_bytes[entry.name] += _tree_size(entry.path)
+
+    # Links and artifacts left by a blob evicted during an upload.
+    for sha256 in (set(references) | set(artifacts)) - set(blobs):
+        for path in references.pop(sha256, []) + artifacts.pop(sha256, []):
+            _remove(path)
+        artifact_bytes.pop(sha256, None)
+
+    used = sum(size for _, size in blobs.values())
+    derived = sum(artifact_bytes.values())
+    for sha256, (mtime, size) in sorted(blobs.items(), key=lambda item: item[1][0]):
+        if now - mtime > UPLOAD_TTL:
+            reason = "ttl"
+        elif used + derived + temporary > UPLOAD_QUOTA:
+            reason = "quota"
+        else:
+            break
+        for path in [blob_path(sha256)] + references[sha256] + artifacts[sha256]:
+            _remove(path)
+        used -= size
+        derived -= artifact_bytes[sha256]
+        del blobs[sha256]
+        metrics.UPLOAD_STORE_EVICTIONS.inc(reason=reason)
+
+    for session in _scan(store_path(SESSIONS)):
+        try:
+            os.rmdir(session.path)
+        except OSError:
+            pass
+
+    metrics.UPLOAD_STORE_BYTES.set(used, kind="blobs")
+    metrics.UPLOAD_STORE_BYTES.set(derived, kind="artifacts")
+    metrics.UPLOAD_STORE_BYTES.set(temporary, kind="temporary")
+    metrics.UPLOAD_STORE_FILES.set(len(blobs))
+    metrics.UPLOAD_STORE_QUOTA.set(UPLOAD_QUOTA)
+    return {
+        "files": len(blobs),
+        "blob_bytes": used,
+        "artifact_bytes": derived,
+        "temporary_bytes": temporary,
+    }
+
+
+async def sweeper():
+    """Sweep the store every UPLOAD_SWEEP_INTERVAL seconds."""
+    loop = asyncio.get_running_loop()
+    while True:
+        try:
+            await loop.run_in_executor(None, sweep)
+        except Exception:
+            logger.exception("Upload store sweep failed")
+        await asyncio.sleep(UPLOAD_SWEEP_INTERVAL)
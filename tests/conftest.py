@@ -0,0 +1,143 @@
+"""Shared setup for the test suite.
+
+`src.config` reads `.secrets/secrets.toml` from the working directory when it
+is imported, so the tests run from a scratch directory holding a copy of the
+dev template rather than from a checkout's real secrets.
+"""
+
+import os
+import shutil
+import tempfile
+
+import pytest
+from redis.exceptions import LockNotOwnedError
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+WORKDIR = tempfile.mkdtemp(prefix="tiangong-tests-")
+
+
+def pytest_configure(config):
+    # Runs after the test paths are resolved and before any test module,
+    # and so `src.config`, is imported.
+    os.makedirs(os.path.join(WORKDIR, ".secrets"))
+    shutil.copy(
+        os.path.join(ROOT, ".secrets", "secrets_dev.toml"),
+        os.path.join(WORKDIR, ".secrets", "secrets.toml"),
+    )
+    os.chdir(WORKDIR)
+
+
+def pytest_unconfigure(config):
+    os.chdir(ROOT)
+    shutil.rmtree(WORKDIR, ignore_errors=True)
+
+
+def _encode(value) -> bytes:
+    return value if isinstance(value, bytes) else str(value).encode()
+
+
+class FakeRedis:
+    """The async Redis calls the app makes, kept in a dict."""
+
+    def __init__(self):
+        self.data = {}
+        self.locks = {}
+
+    async def mget(self, keys):
+        return [self.data.get(key) for key in keys]
+
+    async def set(self, key, value, ex=None):
+        self.data[key] = _encode(value)
+
+    async def hset(self, key, mapping):
+        fields = self.data.setdefault(key, {})
+        fields.update({_encode(k): _encode(v) for k, v in mapping.items()})
+
+    async def hsetnx(self, key, field, value):
+        fields = self.data.setdefault(key, {})
+        if _encode(field) in fields:
+            return 0
+        fields[_encode(field)] = _encode(value)
+        return 1
+
+    async def hdel(self, key, *names):
+        fields = self.data.get(key, {})
+        return sum(fields.pop(_encode(name), None) is not None for name in names)
+
+    async def hgetall(self, key):
+        return dict(self.data.get(key, {}))
+
+    async def sadd(self, key, *members):
+        self.data.setdefault(key, set()).update(map(_encode, members))
+
+    async def smembers(self, key):
+        return set(self.data.get(key, set()))
+
+    async def expire(self, key, seconds):
+        return key in self.data
+
+    async def delete(self, *keys):
+        return sum(self.data.pop(key, None) is not None for key in keys)
+
+    def lock(self, name, timeout=None, blocking=True):
+        return FakeLock(self, name)
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+
+class FakePipeline:
+    """Queues commands and runs them in order on `execute`."""
+
+    def __init__(self, redis: FakeRedis):
+        self.redis = redis
+        self.commands = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+    def __getattr__(self, name):
+        def queue(*args, **kwargs):
+            self.commands.append((getattr(self.redis, name), args, kwargs))
+
+        return queue
+
+    async def execute(self):
+        commands, self.commands = self.commands, []
+        return [await command(*args, **kwargs) for command, args, kwargs in commands]
+
+
+class FakeLock:
+    """Non-blocking lock owned by whoever acquired it, without expiry."""
+
+    def __init__(self, redis: FakeRedis, name: str):
+        self.redis = redis
+        self.name = name
+
+    async def acquire(self):
+        return self.redis.locks.setdefault(self.name, self) is self
+
+    async def reacquire(self):
+        if self.redis.locks.get(self.name) is not self:
+            raise LockNotOwnedError("Lock is not owned")
+
+    async def release(self):
+        await self.reacquire()
+        del self.redis.locks[self.name]
+
+
+@pytest.fixture
+def fake_redis(monkeypatch):
+    """Point the two-tier caches at an in-memory Redis."""
+    from types import SimpleNamespace
+
+    from src.services import tiered_cache
+
+    redis = FakeRedis()
+    monkeypatch.setattr(
+        tiered_cache, "get_clients", lambda: SimpleNamespace(redis=redis)
+    )
+    return redis
@@ -0,0 +1,48 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from src.services import embeddings
+from src.services.embeddings import EmbeddingCache, normalize_query
+
+
+@pytest.mark.parametrize(
+    "query, expected",
+    [
+        ("  Carbon   Emissions\n", "carbon emissions"),
+        ("ＧＢ／Ｔ　２４０４０", "gb/t 24040"),
+        ("碳排放　核算", "碳排放 核算"),
+        ("ｶｰﾎﾞﾝ", "カーボン"),
+        ("STRASSE", "strasse"),
+        ("Straße", "strasse"),
+    ],
+)
+def test_normalize_query(query, expected):
+    assert normalize_query(query) == expected
+
+
+def test_equivalent_queries_share_a_cache_key():
+    model = "text-embedding-3-small"
+    assert EmbeddingCache.key(model, "ＣＯ２ Emissions") == (
+        EmbeddingCache.key(model, "co2  emissions")
+    )
+
+
+def test_queries_are_embedded_as_written(fake_redis, monkeypatch):
+    sent = []
+
+    async def embed(texts, model):
+        sent.append(texts)
+        return [[float(len(text))] for text in texts]
+
+    monkeypatch.setattr(embeddings, "batcher", SimpleNamespace(embed=embed))
+    monkeypatch.setattr(embeddings, "cache", EmbeddingCache())
+
+    vectors = asyncio.run(
+        embeddings.embed_queries(["ＣＯ２ Emissions", "co2  emissions", "Carbon"])
+    )
+
+    assert sent == [["ＣＯ２ Emissions", "Carbon"]]
+    assert vectors == [[13.0], [13.0], [6.0]]
+    assert asyncio.run(embeddings.embed_query("CO2 EMISSIONS")) == [13.0]
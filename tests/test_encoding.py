@@ -0,0 +1,69 @@
+import gzip
+
+import orjson
+import pytest
+from pydantic import BaseModel
+
+from src.routers import encoding
+from src.routers.encoding import _tokens, encoded_response
+
+
+class Page(BaseModel):
+    result: list
+    next_cursor: str = None
+
+
+def test_tokens_drop_refused_values():
+    assert _tokens("gzip;q=0.5, br;q=0, Deflate") == ["gzip", "deflate"]
+    assert _tokens(None) == []
+
+
+def test_json_without_unset_fields():
+    response = encoded_response(Page(result=[1, 2]))
+    assert response.media_type == "application/json"
+    assert orjson.loads(response.body) == {"result": [1, 2]}
+    assert response.headers["Vary"] == "Accept, Accept-Encoding"
+    assert "Content-Encoding" not in response.headers
+
+
+def test_small_bodies_are_not_compressed(monkeypatch):
+    monkeypatch.setattr(encoding, "RESPONSE_COMPRESS_MIN_SIZE", 1024)
+    response = encoded_response({"result": "x"}, accept_encoding="gzip")
+    assert "Content-Encoding" not in response.headers
+
+
+def test_gzip_when_accepted(monkeypatch):
+    monkeypatch.setattr(encoding, "RESPONSE_COMPRESS_MIN_SIZE", 16)
+    monkeypatch.setattr(encoding, "brotli", None)
+    content = {"result": ["text"] * 100}
+    response = encoded_response(content, accept_encoding="br, gzip")
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert orjson.loads(gzip.decompress(response.body)) == content
+
+
+def test_refused_gzip_is_not_used(monkeypatch):
+    monkeypatch.setattr(encoding, "RESPONSE_COMPRESS_MIN_SIZE", 16)
+    response = encoded_response({"result": ["text"] * 100}, accept_encoding="gzip;q=0")
+    assert "Content-Encoding" not in response.headers
+
+
+@pytest.mark.skipif(encoding.brotli is None, reason="brotli is not installed")
+def test_brotli_preferred_when_accepted(monkeypatch):
+    monkeypatch.setattr(encoding, "RESPONSE_COMPRESS_MIN_SIZE", 16)
+    content = {"result": ["text"] * 100}
+    response = encoded_response(content, accept_encoding="gzip, br")
+    assert response.headers["Content-Encoding"] == "br"
+    assert orjson.loads(encoding.brotli.decompress(response.body)) == content
+
+
+@pytest.mark.skipif(encoding.msgpack is None, reason="msgpack is not installed")
+def test_msgpack_when_accepted():
+    response = encoded_response({"result": [1]}, accept="application/msgpack")
+    assert response.media_type == "application/msgpack"
+    assert encoding.msgpack.unpackb(response.body) == {"result": [1]}
+
+
+def test_json_when_msgpack_unavailable(monkeypatch):
+    monkeypatch.setattr(encoding, "msgpack", None)
+    response = encoded_response({"result": [1]}, accept="application/msgpack")
+    assert response.media_type == "application/json"
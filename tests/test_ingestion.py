@@ -0,0 +1,74 @@
+import os
+
+import numpy as np
+import pytest
+
+from src.services import extraction, ingestion, upload_store
+
+
+@pytest.fixture
+def stores(tmp_path, monkeypatch):
+    monkeypatch.setattr(upload_store, "UPLOAD_DIR", str(tmp_path / "store"))
+    monkeypatch.setattr(upload_store, "_prepared", False)
+    monkeypatch.setattr(ingestion, "INGEST_DIR", str(tmp_path / "sessions"))
+    ingestion._loaded.clear()
+    yield tmp_path
+    ingestion._loaded.clear()
+
+
+def index_document(sha256: str, vectors: list, texts: list):
+    chunks = [{"text": text, "page": 1} for text in texts]
+    ingestion.write_document(sha256, "job", np.asarray(vectors, np.float32), chunks)
+
+
+def test_session_search_spans_its_documents(stores):
+    index_document("a" * 64, [[1, 0, 0], [0, 1, 0]], ["east", "north"])
+    index_document("b" * 64, [[0, 0, 1]], ["up"])
+    ingestion.link_document("s1", "a" * 64)
+    ingestion.link_document("s1", "b" * 64)
+    ingestion.link_document("s2", "b" * 64)
+
+    hits = ingestion.search_session("s1", [0.1, 0.2, 0.9], 2)
+    assert [hit["text"] for hit in hits] == ["up", "north"]
+    assert [hit["text"] for hit in ingestion.search_session("s2", [1, 0, 0], 5)] == [
+        "up"
+    ]
+    assert ingestion.search_session("s3", [1, 0, 0], 5) == []
+
+
+def test_index_of_the_same_bytes_is_written_once(stores):
+    sha256 = "c" * 64
+    index_document(sha256, [[1, 0]], ["first"])
+    index_document(sha256, [[0, 1]], ["second"])
+    artifacts = os.listdir(os.path.dirname(upload_store.artifact_path(sha256, "index")))
+    assert artifacts == [sha256]
+    ingestion.link_document("s1", sha256)
+    assert ingestion.search_session("s1", [1, 0], 1)[0]["text"] == "first"
+
+
+def test_evicted_documents_are_unlinked(stores):
+    sha256 = "d" * 64
+    index_document(sha256, [[1, 0]], ["gone"])
+    ingestion.link_document("s1", sha256)
+    upload_store._remove(upload_store.artifact_path(sha256, "index"))
+
+    assert ingestion.search_session("s1", [1, 0], 1) == []
+    assert os.listdir(ingestion.session_dir("s1")) == []
+
+
+@pytest.mark.parametrize("session_id", ["", "..", "a/b"])
+def test_invalid_session_ids_are_rejected(session_id):
+    with pytest.raises(ValueError):
+        ingestion.session_dir(session_id)
+
+
+def test_text_is_chunked_by_page(tmp_path):
+    path = tmp_path / "report.txt"
+    path.write_text("first   page\fsecond page " + "word " * 50, encoding="utf-8")
+
+    result = extraction.extract_chunks(str(path), chunk_size=100, chunk_overlap=0)
+
+    assert result["pages"] == 2
+    assert result["chunks"][0] == {"text": "first page", "page": 1}
+    assert {chunk["page"] for chunk in result["chunks"][1:]} == {2}
+    assert all(len(chunk["text"]) <= 100 for chunk in result["chunks"])
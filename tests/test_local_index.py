@@ -0,0 +1,67 @@
+import json
+
+import numpy as np
+import pytest
+
+from src.services.local_index import LocalIndex, write_snapshot
+
+
+@pytest.fixture
+def vectors():
+    rng = np.random.default_rng(1)
+    return rng.normal(size=(300, 16)).astype(np.float32)
+
+
+@pytest.mark.parametrize(
+    "dtype, nlist",
+    [("float16", 0), ("int8", 0), ("float16", 8)],
+)
+def test_nearest_vectors_are_found(tmp_path, vectors, dtype, nlist):
+    ids = [f"doc{i}_0" for i in range(len(vectors))]
+    metadata = [{"text": f"chunk {i}"} for i in range(len(vectors))]
+    write_snapshot(str(tmp_path), "sci", ids, vectors, metadata, dtype, nlist)
+    # Probe every partition, so IVF gives exact results too.
+    index = LocalIndex(str(tmp_path), nprobe=nlist or 1)
+
+    response = index.query(vectors[42].tolist(), top_k=3, include_metadata=True)
+
+    assert len(index) == 300
+    assert response.namespace == "sci"
+    assert response.matches[0]["id"] == "doc42_0"
+    assert response.matches[0]["metadata"] == {"text": "chunk 42"}
+    assert response.matches[0]["score"] == pytest.approx(1.0, abs=0.02)
+    scores = [match["score"] for match in response.matches]
+    assert scores == sorted(scores, reverse=True)
+
+
+def test_top_k_larger_than_the_index(tmp_path, vectors):
+    write_snapshot(str(tmp_path), "sci", ["a", "b"], vectors[:2], [{}, {}])
+    rows, scores = LocalIndex(str(tmp_path)).search(vectors[1].tolist(), 10)
+    assert rows.tolist() == [1, 0]
+    assert len(scores) == 2
+
+
+def test_ids_and_metadata_are_read_by_row(tmp_path, vectors):
+    ids = [f"doc{i}_0" for i in range(3)]
+    metadata = [{"text": "碳排放"}, {}, {"text": "line\nbreak", "page": 2}]
+    write_snapshot(str(tmp_path), "sci", ids, vectors[:3], metadata)
+    index = LocalIndex(str(tmp_path))
+
+    assert len(index.ids) == 3
+    assert index.ids[-1] == "doc2_0"
+    assert list(index.metadata) == metadata
+    with pytest.raises(IndexError):
+        index.metadata[3]
+
+
+def test_snapshot_with_whole_file_sidecars(tmp_path, vectors):
+    write_snapshot(str(tmp_path), "sci", ["a", "b"], vectors[:2], [{}, {"k": 1}])
+    for name, values in [("ids", ["a", "b"]), ("metadata", [{}, {"k": 1}])]:
+        (tmp_path / f"{name}.jsonl").unlink()
+        (tmp_path / f"{name}.json").write_text(json.dumps(values))
+
+    response = LocalIndex(str(tmp_path)).query(
+        vectors[1].tolist(), top_k=1, include_metadata=True
+    )
+    assert response.matches[0]["id"] == "b"
+    assert response.matches[0]["metadata"] == {"k": 1}
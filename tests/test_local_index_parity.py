@@ -0,0 +1,131 @@
+import asyncio
+
+import numpy as np
+import pytest
+from pinecone.core.client.models import QueryResponse, ScoredVector
+
+from src.services import clients as clients_module
+from src.services import local_index
+
+NAMESPACE = "sci"
+TOP_K = 10
+
+
+class BruteForceIndex:
+    """Pinecone index with the cosine metric, scoring every vector exactly.
+
+    Filters support the `{"field": {"$eq": value}}` form only.
+    """
+
+    metric = "cosine"
+
+    def __init__(self, ids, vectors, metadata):
+        self.ids = ids
+        self.vectors = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+        self.metadata = metadata
+        self.calls = 0
+
+    def query(self, namespace, vector, top_k, filter=None, include_metadata=False):
+        self.calls += 1
+        query = np.asarray(vector, dtype=np.float32)
+        scores = self.vectors @ (query / np.linalg.norm(query))
+        rows = [
+            row
+            for row in np.argsort(-scores, kind="stable")
+            if not filter
+            or all(
+                self.metadata[row].get(field) == condition["$eq"]
+                for field, condition in filter.items()
+            )
+        ][:top_k]
+        matches = [
+            ScoredVector(
+                id=self.ids[row],
+                score=float(scores[row]),
+                values=[],
+                metadata=self.metadata[row] if include_metadata else None,
+                _check_type=False,
+            )
+            for row in rows
+        ]
+        return QueryResponse(matches=matches, namespace=namespace, _check_type=False)
+
+
+@pytest.fixture
+def corpus():
+    rng = np.random.default_rng(7)
+    vectors = rng.normal(size=(500, 32)).astype(np.float32)
+    ids = [f"10.1000/doc{i}_0" for i in range(len(vectors))]
+    metadata = [
+        {"text": f"chunk {i}", "journal": "A" if i % 3 else "B"}
+        for i in range(len(vectors))
+    ]
+    queries = rng.normal(size=(20, 32)).astype(np.float32)
+    return ids, vectors, metadata, queries
+
+
+@pytest.fixture
+def clients(tmp_path, monkeypatch, corpus):
+    ids, vectors, metadata, _ = corpus
+    local_index.write_snapshot(
+        str(tmp_path / NAMESPACE), NAMESPACE, ids, vectors, metadata, "float16"
+    )
+    monkeypatch.setattr(local_index, "LOCAL_INDEX_DIR", str(tmp_path))
+    monkeypatch.setattr(local_index, "LOCAL_INDEX_NAMESPACES", [NAMESPACE])
+    monkeypatch.setattr(local_index, "_indexes", {})
+
+    clients = clients_module.Clients()
+    clients._index = BruteForceIndex(ids, vectors, metadata)
+    yield clients
+    clients.executor.shutdown(wait=True)
+
+
+def _query(clients, vector, **kwargs):
+    return asyncio.run(
+        clients.query(
+            namespace=NAMESPACE,
+            vector=vector.tolist(),
+            top_k=TOP_K,
+            include_metadata=True,
+            **kwargs,
+        )
+    )
+
+
+def test_local_replica_matches_pinecone(clients, corpus):
+    ids, vectors, _, queries = corpus
+    pinecone = clients._index
+    assert pinecone.metric == "cosine"
+
+    for vector in queries:
+        local = _query(clients, vector)
+        expected = pinecone.query(NAMESPACE, vector.tolist(), TOP_K, None, True)
+
+        assert [m["id"] for m in local.matches] == [m["id"] for m in expected.matches]
+        assert [m["metadata"] for m in local.matches] == [
+            m["metadata"] for m in expected.matches
+        ]
+        # Cosine similarity, whatever the norms of the stored and query vectors.
+        row = ids.index(local.matches[0]["id"])
+        cosine = vectors[row] @ vector
+        cosine /= np.linalg.norm(vectors[row]) * np.linalg.norm(vector)
+        assert local.matches[0]["score"] == pytest.approx(cosine, abs=2e-3)
+        assert [m["score"] for m in local.matches] == pytest.approx(
+            [m["score"] for m in expected.matches], abs=2e-3
+        )
+    assert pinecone.calls == len(queries)
+
+
+def test_filtered_queries_go_to_pinecone(clients, corpus):
+    *_, queries = corpus
+    pinecone = clients._index
+    filter = {"journal": {"$eq": "B"}}
+
+    for vector in queries:
+        response = _query(clients, vector, filter=filter)
+        expected = pinecone.query(NAMESPACE, vector.tolist(), TOP_K, filter, True)
+        assert [m["id"] for m in response.matches] == [
+            m["id"] for m in expected.matches
+        ]
+        assert all(m["metadata"]["journal"] == "B" for m in response.matches)
+    assert pinecone.calls == 2 * len(queries)
@@ -0,0 +1,62 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from src.config import config
+from src.services import context_windows, documents, metadata_cache, pagination
+from src.services.metadata_cache import MetadataCache, fetch_records
+
+
+def test_key_depends_on_database_and_columns():
+    key = MetadataCache.key("db1", "journals", ["doi", "title"], "10.1/x")
+    assert key == MetadataCache.key("db1", "journals", ["title", "doi"], "10.1/x")
+    assert key != MetadataCache.key("db2", "journals", ["doi", "title"], "10.1/x")
+    assert key != MetadataCache.key("db1", "journals", ["doi"], "10.1/x")
+    assert key.startswith("metadata:journals:") and key.endswith(":10.1/x")
+
+
+def test_records_are_cached_per_column_set(fake_redis, monkeypatch):
+    queries = []
+
+    async def xata_query(db_url, table, payload):
+        queries.append((db_url, payload["columns"]))
+        ids = payload["filter"]["doi"]["$any"]
+        return {
+            "records": [
+                {c: id if c == "doi" else f"{c} of {id}" for c in payload["columns"]}
+                for id in ids
+                if id != "gone"
+            ]
+        }
+
+    monkeypatch.setattr(
+        metadata_cache, "get_clients", lambda: SimpleNamespace(xata_query=xata_query)
+    )
+    monkeypatch.setattr(metadata_cache, "cache", MetadataCache())
+
+    def fetch(db_url, columns):
+        return asyncio.run(
+            fetch_records(db_url, "journals", "doi", ["a", "gone"], columns)
+        )
+
+    assert fetch("db1", ["doi"]) == {"a": {"doi": "a"}}
+    assert fetch("db1", ["doi", "title"]) == {"a": {"doi": "a", "title": "title of a"}}
+    assert fetch("db2", ["doi"]) == {"a": {"doi": "a"}}
+    # Cached records and misses are served without another query.
+    assert fetch("db1", ["title", "doi"])["a"]["title"] == "title of a"
+    assert queries == [("db1", ["doi"]), ("db1", ["doi", "title"]), ("db2", ["doi"])]
+
+
+@pytest.mark.parametrize(
+    "cache, ttl, negative_ttl",
+    [
+        (metadata_cache.cache, "METADATA_CACHE_TTL", "METADATA_CACHE_NEGATIVE_TTL"),
+        (context_windows.cache, "CONTEXT_CACHE_TTL", "CONTEXT_CACHE_NEGATIVE_TTL"),
+        (documents.cache, "DOCUMENT_CACHE_TTL", "DOCUMENT_CACHE_NEGATIVE_TTL"),
+        (pagination.cache, "SEARCH_CURSOR_TTL", "SEARCH_CURSOR_TTL"),
+    ],
+)
+def test_each_cache_has_its_own_ttls(cache, ttl, negative_ttl):
+    assert cache._ttl({"text": "found"}) == getattr(config, ttl)
+    assert cache._ttl({}) == getattr(config, negative_ttl)
@@ -0,0 +1,69 @@
+import asyncio
+import base64
+
+import pytest
+
+from src.services import pagination
+from src.services.pagination import CursorCache
+
+
+def _cursor(raw: str) -> str:
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def test_cursor_round_trip():
+    cursor = pagination._encode("token", 32)
+    assert "=" not in cursor
+    assert pagination._decode(cursor) == ("token", 32)
+
+
+@pytest.mark.parametrize(
+    "cursor",
+    [
+        "not base64!",
+        _cursor("token"),
+        _cursor("token:abc"),
+        _cursor("token:-1"),
+        _cursor("token:+3"),
+        _cursor("token: 3"),
+        _cursor("token:1.5"),
+        _cursor("token:٣"),
+    ],
+)
+def test_malformed_cursor_is_rejected(cursor):
+    with pytest.raises(ValueError, match="Invalid cursor"):
+        pagination._decode(cursor)
+
+
+def test_pages_follow_cursors(fake_redis, monkeypatch):
+    monkeypatch.setattr(pagination, "cache", CursorCache(maxsize=8, ttl=60))
+    results = [{"id": i} for i in range(5)]
+
+    async def walk():
+        page = await pagination.first_page(results, 2)
+        pages = [page]
+        while page["next_cursor"]:
+            page = await pagination.next_page(page["next_cursor"])
+            pages.append(page)
+        return pages
+
+    pages = asyncio.run(walk())
+    assert [[r["id"] for r in page["result"]] for page in pages] == [
+        [0, 1],
+        [2, 3],
+        [4],
+    ]
+    assert pages[-1]["next_cursor"] is None
+
+
+def test_single_page_is_not_cached(fake_redis, monkeypatch):
+    monkeypatch.setattr(pagination, "cache", CursorCache(maxsize=8, ttl=60))
+    page = asyncio.run(pagination.first_page([{"id": 0}], 2))
+    assert page == {"result": [{"id": 0}], "next_cursor": None}
+    assert fake_redis.data == {}
+
+
+def test_expired_results_return_none(fake_redis, monkeypatch):
+    monkeypatch.setattr(pagination, "cache", CursorCache(maxsize=8, ttl=60))
+    cursor = pagination._encode("unknown", 2)
+    assert asyncio.run(pagination.next_page(cursor)) is None
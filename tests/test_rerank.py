@@ -0,0 +1,53 @@
+from src.services import rerank
+from src.services.rerank import bm25_scores, rerank_hits, tokenize
+
+
+def test_cjk_text_is_split_into_bigrams():
+    assert tokenize("碳排放") == ["碳排", "排放"]
+
+
+def test_lone_cjk_character_is_a_token():
+    assert tokenize("水 water") == ["water", "水"]
+
+
+def test_compound_words_are_kept_with_their_parts():
+    tokens = tokenize("GB/T 24040-2008")
+    assert {"gb", "t", "24040", "2008", "gb/t", "24040-2008"} <= set(tokens)
+
+
+def test_full_width_and_case_are_folded():
+    assert tokenize("ＧＢ／Ｔ Steel") == tokenize("gb/t steel")
+
+
+def test_bm25_scores_cjk_matches():
+    scores = bm25_scores(
+        "碳排放核算",
+        ["企业碳排放核算方法", "水资源管理", "碳排放"],
+    )
+    assert scores[0] > scores[2] > 0
+    assert scores[1] == 0
+
+
+def test_bm25_word_terms_do_not_match_inside_words():
+    scores = bm25_scores("steel", ["steelmaking", "stainless steel"])
+    assert scores[0] == 0
+    assert scores[1] > 0
+
+
+def test_bm25_without_query_terms_scores_zero():
+    assert bm25_scores("", ["a", "b"]) == [0.0, 0.0]
+    assert bm25_scores("query", []) == []
+
+
+def test_rerank_promotes_lexical_matches(monkeypatch):
+    monkeypatch.setattr(rerank, "RERANK_RRF_K", 60)
+    hits = ["风能发电", "太阳能电池", "碳排放核算指南", "水污染"]
+    assert rerank_hits("碳排放核算", hits, lambda hit: hit, 2) == [
+        "碳排放核算指南",
+        "风能发电",
+    ]
+
+
+def test_rerank_keeps_dense_order_without_matches():
+    hits = ["first", "second", "third"]
+    assert rerank_hits("unrelated", hits, lambda hit: hit, 3) == hits
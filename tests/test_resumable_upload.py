@@ -0,0 +1,21 @@
+import pytest
+
+from src.services.standalone.resumable_upload import coverage
+
+
+@pytest.mark.parametrize(
+    "ranges, expected",
+    [
+        ([], (0, 0)),
+        ([(0, 10)], (10, 10)),
+        ([(10, 20)], (0, 10)),
+        ([(10, 20), (0, 10)], (20, 20)),
+        ([(0, 10), (5, 15)], (15, 15)),
+        ([(0, 10), (0, 10)], (10, 10)),
+        ([(0, 10), (20, 30)], (10, 20)),
+        ([(20, 30), (0, 5), (5, 25)], (30, 30)),
+        ([(0, 4), (2, 3), (8, 12), (10, 16)], (4, 12)),
+    ],
+)
+def test_coverage(ranges, expected):
+    assert coverage(ranges) == expected
@@ -0,0 +1,117 @@
+import asyncio
+import threading
+import time
+
+import pytest
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.testclient import TestClient
+
+from src.routers import health_router, runnable_routes
+from src.routers.runnable_routes import LazyRunnableRoutes, add_lazy_routes
+
+# Seconds /health may take while no runnable is built.
+HEALTH_BOUND = 0.5
+
+builds = []
+release = threading.Event()
+
+
+def slow_runnable():
+    """Runnable factory standing in for one that takes long to import and build."""
+    builds.append(time.perf_counter())
+    release.wait(timeout=5)
+    return None
+
+
+async def authorize(request: Request):
+    if request.headers.get("Authorization") != "Bearer token":
+        raise HTTPException(status_code=401, detail="Invalid or missing token")
+
+
+@pytest.fixture
+def app():
+    app = FastAPI()
+    route = LazyRunnableRoutes(app, "/chain", "module:factory", authorize)
+
+    def add_routes(app, runnable, path):
+        app.add_api_route(
+            path + "/invoke", lambda: {"output": runnable}, methods=["POST"]
+        )
+
+    route._load = lambda: (add_routes, "built")
+    app.router.routes.append(route)
+    app.state.route = route
+    return app
+
+
+def test_unauthorized_request_does_not_build(app):
+    client = TestClient(app)
+    response = client.post("/chain/invoke")
+    assert response.status_code == 401
+    assert response.json() == {"detail": "Invalid or missing token"}
+    assert not app.state.route.ready
+
+
+def test_authorized_request_builds_and_is_served(app):
+    client = TestClient(app)
+    response = client.post("/chain/invoke", headers={"Authorization": "Bearer token"})
+    assert response.json() == {"output": "built"}
+    assert app.state.route.ready
+    assert app.state.route not in app.router.routes
+
+
+def test_other_paths_are_not_matched(app):
+    assert TestClient(app).get("/chainsaw").status_code == 404
+
+
+@pytest.fixture
+def server(monkeypatch):
+    """App with the health route and one lazy runnable, like main's."""
+    monkeypatch.setattr(runnable_routes, "_routes", [])
+    builds.clear()
+    release.clear()
+    app = FastAPI()
+    app.include_router(health_router.router)
+    add_lazy_routes(
+        app, "/chain", "tests.test_runnable_routes:slow_runnable", authorize
+    )
+    yield app
+    release.set()
+
+
+async def _start_warm_up():
+    return asyncio.create_task(runnable_routes.warm_up())
+
+
+def _timed_health(client):
+    started = time.perf_counter()
+    response = client.get("/health")
+    return time.perf_counter() - started, response
+
+
+def test_health_answers_before_any_build(server):
+    with TestClient(server) as client:
+        seconds, response = _timed_health(client)
+        assert response.status_code == 200
+        assert seconds < HEALTH_BOUND
+        assert response.json()["runnables"] == {
+            "ready": 0,
+            "total": 1,
+            "build_seconds": {},
+        }
+
+        response = client.post("/chain/invoke")
+        assert response.status_code == 401
+        assert builds == []
+        assert runnable_routes.status()["ready"] == 0
+
+        # A build in progress, as started with the app, does not hold up the
+        # loop either.
+        warming = client.portal.call(_start_warm_up)
+        while not builds:
+            time.sleep(0.01)
+        seconds, response = _timed_health(client)
+        assert seconds < HEALTH_BOUND
+        assert response.json()["runnables"]["ready"] == 0
+        client.portal.call(warming.cancel)
+        release.set()
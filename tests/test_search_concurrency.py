@@ -0,0 +1,42 @@
+import asyncio
+import time
+
+import pytest
+
+from benchmarks.fake_upstreams import Latency, install
+from src.services import clients as clients_module
+from src.services.standalone import search_academic_db
+
+LATENCY_MS = 100
+SEARCHES = 8
+
+
+@pytest.fixture
+def slow_upstreams(monkeypatch):
+    """Shared clients whose Pinecone, Xata and OpenAI each take a fixed delay."""
+    clients = clients_module.Clients()
+    latency = Latency(LATENCY_MS)
+    install(clients, pinecone=latency, xata=latency, openai=latency)
+    monkeypatch.setattr(clients_module, "_clients", clients)
+    yield clients
+    clients.executor.shutdown(wait=True)
+
+
+def test_concurrent_searches_overlap(slow_upstreams):
+    async def timed(queries):
+        start = time.perf_counter()
+        results = await asyncio.gather(
+            *(search_academic_db.search(query) for query in queries)
+        )
+        return time.perf_counter() - start, results
+
+    # Distinct queries, so no search is answered from the embedding or
+    # metadata caches filled by another.
+    single, (docs,) = asyncio.run(timed(["life cycle assessment baseline"]))
+    assert docs
+    assert single >= 3 * LATENCY_MS / 1000
+
+    queries = [f"life cycle assessment {n}" for n in range(SEARCHES)]
+    elapsed, results = asyncio.run(timed(queries))
+    assert all(results)
+    assert elapsed < SEARCHES * single / 3
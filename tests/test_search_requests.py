@@ -0,0 +1,31 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from src.config.config import SEARCH_MAX_TOP_K
+from src.routers import search_academic_db_router, search_all_router
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+    app.include_router(search_academic_db_router.router)
+    app.include_router(search_all_router.router)
+    return TestClient(app)
+
+
+@pytest.mark.parametrize(
+    "path, body",
+    [
+        ("/search_academic_db", {"query": "carbon", "top_k": None}),
+        ("/search_academic_db", {"query": "carbon", "top_k": 0}),
+        ("/search_academic_db", {"query": "carbon", "top_k": SEARCH_MAX_TOP_K + 1}),
+        ("/search_academic_db/batch", {"queries": ["carbon"], "top_k": None}),
+        ("/search_all", {"query": "carbon", "top_k": None}),
+        ("/search_all", {"query": "carbon", "top_k": {"academic": None}}),
+    ],
+)
+def test_invalid_top_k_is_rejected(client, path, body):
+    response = client.post(path, json=body)
+    assert response.status_code == 422
+    assert response.json()["detail"][0]["loc"][:2] == ["body", "top_k"]
@@ -0,0 +1,30 @@
+import asyncio
+
+import pytest
+
+from benchmarks.fake_upstreams import Latency, install
+from src.services import clients as clients_module
+from src.services.lc.tools.search_academic_db_tool import SearchAcademicDb
+from src.services.lc.tools.search_patent_db_tool import SearchPatentDb
+from src.services.lc.tools.search_standard_tool import SearchStandardDb
+
+
+@pytest.fixture
+def upstreams(monkeypatch):
+    clients = clients_module.Clients()
+    install(clients, pinecone=Latency(0), xata=Latency(0), openai=Latency(0))
+    monkeypatch.setattr(clients_module, "_clients", clients)
+    yield clients
+    clients.executor.shutdown(wait=True)
+
+
+@pytest.mark.parametrize("tool", [SearchAcademicDb, SearchPatentDb, SearchStandardDb])
+def test_sync_and_async_runs_agree(upstreams, tool):
+    query = f"carbon footprint {tool.__name__}"
+    # The async run fills the embedding cache the sync run then reads, since
+    # the stand-ins have no blocking OpenAI client.
+    expected = str(asyncio.run(tool()._arun(query, 5)))
+    result = str(tool()._run(query, 5))
+    assert result == expected
+    assert result.startswith("[{'content': ")
+    assert result.count("'source': ") == 5
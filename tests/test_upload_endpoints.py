@@ -0,0 +1,177 @@
+import hashlib
+import time
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from benchmarks.fake_upstreams import FakeAsyncOpenAI, Latency, fake_embedding
+from src.routers import ingest_router, resumable_upload_router, upload_file_router
+from src.services import clients as clients_module
+from src.services import ingestion, upload_store
+
+from .conftest import FakeRedis
+
+TEXT = "Life cycle assessment of steel production in China. " * 3
+
+
+def make_pdf(text: str) -> bytes:
+    """One-page PDF showing `text` in Helvetica."""
+    content = f"BT /F1 12 Tf 72 720 Td ({text}) Tj ET".encode()
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792]"
+        b" /Resources << /Font << /F1 5 0 R >> >> /Contents 4 0 R >>",
+        b"<< /Length %d >>\nstream\n%s\nendstream" % (len(content), content),
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    pdf = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(pdf))
+        pdf += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+    xref = len(pdf)
+    pdf += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    pdf += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    pdf += b"trailer\n<< /Size %d /Root 1 0 R >>\n" % (len(objects) + 1)
+    pdf += b"startxref\n%d\n%%%%EOF\n" % xref
+    return bytes(pdf)
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    """Upload and ingest routes on an in-memory Redis and stand-in embeddings.
+
+    Extraction runs in the real process pool.
+    """
+    monkeypatch.setattr(upload_store, "UPLOAD_DIR", str(tmp_path / "store"))
+    monkeypatch.setattr(upload_store, "_prepared", False)
+    monkeypatch.setattr(ingestion, "INGEST_DIR", str(tmp_path / "sessions"))
+    ingestion._loaded.clear()
+
+    clients = clients_module.Clients()
+    clients.redis = FakeRedis()
+    clients.openai = FakeAsyncOpenAI(Latency(0))
+    monkeypatch.setattr(clients_module, "_clients", clients)
+
+    app = FastAPI()
+    app.include_router(upload_file_router.router)
+    app.include_router(resumable_upload_router.router)
+    app.include_router(ingest_router.router)
+    with TestClient(app) as client:
+        yield client
+    ingestion.shutdown_pool()
+    clients.executor.shutdown(wait=True)
+    ingestion._loaded.clear()
+
+
+def wait_for_ingestion(client, ingest_id: str, timeout: float = 60) -> dict:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = client.get(f"/ingest/{ingest_id}").json()
+        if job["status"] in ("done", "failed"):
+            return job
+        time.sleep(0.05)
+    raise AssertionError(f"Ingestion {ingest_id} did not finish: {job}")
+
+
+def session_hits(session_id: str, text: str) -> list:
+    vector = fake_embedding(text, 1536).tolist()
+    return ingestion.search_session(session_id, vector, 1)
+
+
+def test_uploaded_file_is_ingested_for_its_session(client):
+    content = TEXT.encode()
+    response = client.post(
+        "/upload_file",
+        data={"session_id": "s1"},
+        files={"file": ("report.txt", content, "text/plain")},
+    )
+    assert response.status_code == 200
+    upload = response.json()
+    assert upload["sha256"] == hashlib.sha256(content).hexdigest()
+    assert upload["size"] == len(content)
+    with open(upload["file_path"], "rb") as f:
+        assert f.read() == content
+
+    job = wait_for_ingestion(client, upload["ingest_id"])
+    assert job["status"] == "done", job
+    assert job["session_id"] == "s1"
+    assert job["chunks"] == job["embedded"] == 1
+
+    hits = session_hits("s1", TEXT.strip())
+    assert hits[0]["text"] == TEXT.strip()
+    assert hits[0]["file"] == job["file"]
+    assert session_hits("s2", TEXT) == []
+
+
+def test_resumable_pdf_upload_is_ingested_and_reused(client):
+    content = make_pdf("Carbon footprint of cement")
+    half = len(content) // 2
+    response = client.post(
+        "/uploads",
+        json={
+            "session_id": "s1",
+            "size": len(content),
+            "content_type": "application/pdf",
+        },
+    )
+    assert response.status_code == 201
+    upload_id = response.json()["upload_id"]
+    assert response.headers["Location"] == f"/uploads/{upload_id}"
+
+    # The second half arrives first, as after a dropped connection.
+    response = client.patch(
+        f"/uploads/{upload_id}",
+        content=content[half:],
+        headers={"Upload-Offset": str(half)},
+    )
+    assert response.json()["offset"] == 0
+    assert client.post(f"/uploads/{upload_id}/finalize").status_code == 409
+    response = client.patch(
+        f"/uploads/{upload_id}",
+        content=content[:half],
+        headers={"Upload-Offset": "0"},
+    )
+    assert response.headers["Upload-Offset"] == str(len(content))
+
+    sha256 = hashlib.sha256(content).hexdigest()
+    response = client.post(f"/uploads/{upload_id}/finalize", json={"sha256": sha256})
+    assert response.status_code == 200
+    upload = response.json()
+    assert upload["sha256"] == sha256
+    assert upload["file_path"].endswith(".pdf")
+    assert client.get(f"/uploads/{upload_id}").status_code == 404
+
+    job = wait_for_ingestion(client, upload["ingest_id"])
+    assert job["status"] == "done", job
+    assert job["pages"] == 1
+    assert job["reused"] is None
+    assert session_hits("s1", "Carbon footprint of cement")[0]["page"] == 1
+
+    # The same bytes uploaded in another session reuse the index.
+    response = client.post(
+        "/upload_file",
+        data={"session_id": "s2"},
+        files={"file": ("copy.pdf", content, "application/pdf")},
+    )
+    job = wait_for_ingestion(client, response.json()["ingest_id"])
+    assert job["status"] == "done", job
+    assert job["reused"] is True
+    assert session_hits("s2", "Carbon footprint of cement")
+
+
+def test_mismatched_sha256_is_rejected(client):
+    response = client.post("/uploads", json={"session_id": "s1", "size": 3})
+    upload_id = response.json()["upload_id"]
+    client.patch(
+        f"/uploads/{upload_id}", content=b"abc", headers={"Upload-Offset": "0"}
+    )
+    response = client.post(f"/uploads/{upload_id}/finalize", json={"sha256": "0" * 64})
+    assert response.status_code == 422
+    assert client.get(f"/uploads/{upload_id}").status_code == 404
+
+
+def test_unknown_ingest_job_is_not_found(client):
+    assert client.get("/ingest/missing").status_code == 404
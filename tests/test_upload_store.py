@@ -0,0 +1,121 @@
+import hashlib
+import os
+
+import pytest
+
+from src.services import upload_store
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    monkeypatch.setattr(upload_store, "UPLOAD_DIR", str(tmp_path))
+    monkeypatch.setattr(upload_store, "_prepared", False)
+    monkeypatch.setattr(upload_store, "UPLOAD_TTL", 1000)
+    monkeypatch.setattr(upload_store, "UPLOAD_RESUMABLE_TTL", 100)
+    monkeypatch.setattr(upload_store, "UPLOAD_QUOTA", 10**9)
+    return tmp_path
+
+
+def receive(content: bytes, name: str = ".received.part") -> tuple:
+    path = upload_store.store_path(name)
+    with open(path, "wb") as f:
+        f.write(content)
+    return path, hashlib.sha256(content).hexdigest()
+
+
+def add(content: bytes, session_id: str, mtime: float = None) -> tuple:
+    path, sha256 = receive(content)
+    reference = upload_store.add(path, sha256, session_id, ".pdf")
+    if mtime is not None:
+        os.utime(upload_store.blob_path(sha256), (mtime, mtime))
+    return reference, sha256
+
+
+def test_same_content_is_stored_once(store):
+    first, sha256 = add(b"report", "a")
+    second, _ = add(b"report", "b")
+
+    blob = upload_store.blob_path(sha256)
+    assert first != second
+    assert os.path.samefile(first, blob)
+    assert os.path.samefile(second, blob)
+    assert os.stat(blob).st_nlink == 3
+    assert os.path.basename(first) == sha256 + ".pdf"
+    assert not os.path.exists(upload_store.store_path(".received.part"))
+
+
+def test_same_session_upload_keeps_one_link(store):
+    first, sha256 = add(b"report", "a")
+    second, _ = add(b"report", "a")
+    assert first == second
+    assert os.stat(upload_store.blob_path(sha256)).st_nlink == 2
+
+
+def test_sweep_evicts_unused_files_with_links_and_artifacts(store):
+    reference, sha256 = add(b"old", "a", mtime=0)
+    artifact = upload_store.artifact_path(sha256, "index")
+    os.makedirs(artifact)
+    with open(os.path.join(artifact, "vectors"), "wb") as f:
+        f.write(b"0" * 10)
+    kept, kept_sha256 = add(b"new", "b", mtime=1500)
+
+    usage = upload_store.sweep(now=1600)
+
+    assert not os.path.exists(upload_store.blob_path(sha256))
+    assert not os.path.exists(reference)
+    assert not os.path.exists(artifact)
+    assert not os.path.exists(os.path.dirname(reference))
+    assert os.path.exists(kept)
+    assert usage == {
+        "files": 1,
+        "blob_bytes": 3,
+        "artifact_bytes": 0,
+        "temporary_bytes": 0,
+    }
+
+
+def test_sweep_evicts_least_recently_used_over_quota(store, monkeypatch):
+    monkeypatch.setattr(upload_store, "UPLOAD_QUOTA", 25)
+    oldest, _ = add(b"a" * 10, "a", mtime=100)
+    middle, _ = add(b"b" * 10, "a", mtime=300)
+    newest, _ = add(b"c" * 10, "a", mtime=200)
+
+    usage = upload_store.sweep(now=400)
+
+    assert not os.path.exists(oldest)
+    assert os.path.exists(middle)
+    assert os.path.exists(newest)
+    assert usage["blob_bytes"] == 20
+
+
+def test_artifact_hit_marks_the_file_as_used(store):
+    _, sha256 = add(b"report", "a", mtime=0)
+    os.makedirs(upload_store.artifact_path(sha256, "index"))
+    with open(os.path.join(upload_store.artifact_path(sha256, "index"), "meta"), "w"):
+        pass
+
+    assert upload_store.has_artifact(sha256, "index", "meta")
+    assert not upload_store.has_artifact(sha256, "index", "missing")
+    assert os.stat(upload_store.blob_path(sha256)).st_mtime > 0
+
+
+def test_sweep_removes_stale_temporary_files(store):
+    stale, _ = receive(b"partial", ".stale.upload")
+    fresh, _ = receive(b"partial", ".fresh.upload")
+    os.utime(stale, (0, 0))
+    os.utime(fresh, (950, 950))
+
+    usage = upload_store.sweep(now=1000)
+
+    assert not os.path.exists(stale)
+    assert os.path.exists(fresh)
+    assert usage["temporary_bytes"] == len(b"partial")
+
+
+def test_sweep_removes_links_to_missing_files(store):
+    reference, sha256 = add(b"report", "a")
+    os.remove(upload_store.blob_path(sha256))
+
+    upload_store.sweep()
+
+    assert not os.path.exists(reference)
@@ -0,0 +1,51 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from src.config.config import CLIENT_ID, CLIENT_SECRET
+from src.routers import wix_oauth_router
+from src.services import clients as clients_module
+
+from .conftest import FakeRedis
+
+
+@pytest.fixture
+def redis(monkeypatch):
+    clients = clients_module.Clients()
+    clients.redis = FakeRedis()
+    monkeypatch.setattr(clients_module, "_clients", clients)
+    yield clients.redis
+    clients.executor.shutdown(wait=True)
+
+
+@pytest.fixture
+def client(redis):
+    app = FastAPI()
+    app.include_router(wix_oauth_router.router)
+    return TestClient(app)
+
+
+def authorize(client, code: str):
+    return client.post(
+        "/authorization/",
+        data={"client_id": CLIENT_ID, "client_secret": CLIENT_SECRET, "code": code},
+    )
+
+
+def test_prefixed_code_is_redeemed(client, redis):
+    redis.data[wix_oauth_router.code_key("abc")] = b"3600"
+    response = authorize(client, "abc")
+    assert response.status_code == 200
+    assert response.json()["expires_in"] == 3600
+
+
+def test_legacy_code_is_redeemed_during_migration(client, redis, monkeypatch):
+    redis.data["abc"] = b"3600"
+    assert authorize(client, "abc").json()["expires_in"] == 3600
+
+    monkeypatch.setattr(wix_oauth_router, "WIX_LEGACY_CODE_KEYS", False)
+    assert authorize(client, "abc").status_code == 401
+
+
+def test_unknown_code_is_rejected(client):
+    assert authorize(client, "missing").status_code == 401